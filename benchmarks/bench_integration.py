@@ -0,0 +1,179 @@
+"""Benchmark the integration against a local fake API with synthetic fleets.
+
+Run from the repository root with the packages in
+benchmarks/requirements.txt installed:
+
+    python -m benchmarks.bench_integration --fleets 10 100 1000 10000 \\
+        --output bench_output.json
+
+For each fleet size, this measures the time to set up a config entry, the
+latency of a coordinator refresh as a fraction of the devices move, the
+cost of a state write per entity for each platform, and the peak memory
+allocated while setting up and refreshing.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.loader import DATA_CUSTOM_COMPONENTS
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+    mock_storage,
+)
+
+from custom_components.copenhagen_trackers.const import DOMAIN
+
+from .fake_api import FakeFleet, start_server
+
+async def _async_setup(hass: HomeAssistant) -> tuple[MockConfigEntry, float]:
+    """Set up a config entry, returning it and the time it took."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_EMAIL: "bench@example.com", CONF_PASSWORD: "bench"},
+    )
+    entry.add_to_hass(hass)
+    start = time.perf_counter()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry, time.perf_counter() - start
+
+def _measure_state_writes(hass: HomeAssistant) -> dict[str, float]:
+    """Return the mean cost of a state write per entity in microseconds."""
+    results = {}
+    for platform in async_get_platforms(hass, DOMAIN):
+        entities = list(platform.entities.values())
+        if not entities:
+            continue
+        start = time.perf_counter()
+        for entity in entities:
+            entity.async_write_ha_state()
+        results[platform.domain] = (
+            (time.perf_counter() - start) / len(entities) * 1e6
+        )
+    return results
+
+async def _async_run_fleet(
+    size: int, refreshes: int, fraction: float, seed: int
+) -> dict[str, Any]:
+    """Return the measurements for one fleet size."""
+    fleet = FakeFleet(size, seed)
+    runner, endpoint = await start_server(fleet)
+    try:
+        with patch(
+            "custom_components.copenhagen_trackers.api.API_ENDPOINT", endpoint
+        ), patch(
+            # Every refresh must reach the server
+            "custom_components.copenhagen_trackers.registry."
+            "REFRESH_COALESCE_WINDOW",
+            0,
+        ):
+            # Fresh storage, so no snapshot of an earlier run is loaded
+            with mock_storage():
+                async with async_test_home_assistant() as hass:
+                    hass.data.pop(DATA_CUSTOM_COMPONENTS, None)
+                    entry, setup_time = await _async_setup(hass)
+                    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+                    latencies = []
+                    for _ in range(refreshes):
+                        fleet.move(fraction)
+                        start = time.perf_counter()
+                        await coordinator.async_refresh()
+                        await hass.async_block_till_done()
+                        latencies.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    unchanged_latency = time.perf_counter() - start
+
+                    state_writes = _measure_state_writes(hass)
+                    entities = sum(
+                        len(platform.entities)
+                        for platform in async_get_platforms(hass, DOMAIN)
+                    )
+                    await hass.config_entries.async_unload(entry.entry_id)
+
+            # Measured apart, as tracing allocations slows everything down
+            tracemalloc.start()
+            with mock_storage():
+                async with async_test_home_assistant() as hass:
+                    hass.data.pop(DATA_CUSTOM_COMPONENTS, None)
+                    entry, _ = await _async_setup(hass)
+                    fleet.move(fraction)
+                    await hass.data[DOMAIN][entry.entry_id].async_refresh()
+                    await hass.async_block_till_done()
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                    await hass.config_entries.async_unload(entry.entry_id)
+            tracemalloc.stop()
+    finally:
+        await runner.cleanup()
+
+    return {
+        "devices": size,
+        "entities": entities,
+        "payload_bytes": len(fleet.body),
+        "setup_ms": setup_time * 1000,
+        "setup_us_per_entity": setup_time / entities * 1e6,
+        "refresh_ms": {
+            "changed_fraction": fraction,
+            "mean": statistics.fmean(latencies) * 1000,
+            "median": statistics.median(latencies) * 1000,
+            "max": max(latencies) * 1000,
+            "unchanged": unchanged_latency * 1000,
+        },
+        "state_write_us": state_writes,
+        "peak_memory_bytes": peak_memory,
+        "requests": dict(runner.app["stats"]),
+    }
+
+def main() -> None:
+    """Run the benchmark and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--fleets", type=int, nargs="+", default=[10, 100, 1000, 10000]
+    )
+    parser.add_argument("--refreshes", type=int, default=10)
+    parser.add_argument(
+        "--changed",
+        type=float,
+        default=0.1,
+        help="fraction of the devices moving between refreshes",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", type=argparse.FileType("w"), default=sys.stdout
+    )
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(
+            _async_run_fleet(size, args.refreshes, args.changed, args.seed)
+        )
+        for size in args.fleets
+    ]
+    json.dump(
+        {
+            "benchmark": "integration",
+            "python": sys.version.split()[0],
+            "results": results,
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+
+if __name__ == "__main__":
+    main()
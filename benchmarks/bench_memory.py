@@ -0,0 +1,158 @@
+"""Benchmark the memory retained for the devices of synthetic fleets.
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.bench_memory --fleets 100 1000 10000
+
+For each fleet size, this measures the memory retained by the decoded
+`/devices` response, by its projection, and by the parsed devices with
+and without interning repeated strings.
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Any, Callable
+from unittest.mock import patch
+
+from custom_components.copenhagen_trackers import models
+from custom_components.copenhagen_trackers.const import (
+    ATTR_DATA,
+    ATTR_DESCRIPTION,
+    ATTR_ID,
+)
+from custom_components.copenhagen_trackers.models import (
+    ATTR_ACCURACY,
+    ATTR_BATTERY_PERCENTAGE,
+    ATTR_CAN_UPDATE,
+    ATTR_CITY,
+    ATTR_COUNTRY,
+    ATTR_DETAILS,
+    ATTR_DEVICE_INFO,
+    ATTR_DEVICE_TYPE,
+    ATTR_FIRMWARE_VERSION,
+    ATTR_FIX_TIME,
+    ATTR_LATITUDE,
+    ATTR_LOCATION,
+    ATTR_LONGITUDE,
+    ATTR_NAME,
+    ATTR_NUM_SATS,
+    ATTR_PROFILE,
+    ATTR_ROAD,
+    ATTR_SHOULD_UPDATE,
+    ATTR_SIGNAL,
+    ATTR_SIG_STRENGTH,
+    ATTR_TIME_TO_FIX,
+    ATTR_TRANS,
+    ATTR_UPDATED_AT,
+    parse_devices,
+)
+
+from .fake_api import FakeFleet
+
+# Fields of the `/devices` response read by the models
+PROFILE_FIELDS = (ATTR_NAME, ATTR_DESCRIPTION, ATTR_UPDATED_AT)
+DETAILS_FIELDS = (ATTR_LATITUDE, ATTR_LONGITUDE, ATTR_ACCURACY)
+DEVICE_INFO_FIELDS = (
+    ATTR_SIG_STRENGTH,
+    ATTR_TRANS,
+    ATTR_TIME_TO_FIX,
+    ATTR_FIX_TIME,
+    ATTR_NUM_SATS,
+)
+LOCATION_FIELDS = (ATTR_ROAD, ATTR_CITY, ATTR_COUNTRY, ATTR_SIGNAL)
+DEVICE_FIELDS = (
+    ATTR_ID,
+    ATTR_NAME,
+    ATTR_DEVICE_TYPE,
+    ATTR_FIRMWARE_VERSION,
+    ATTR_BATTERY_PERCENTAGE,
+    ATTR_UPDATED_AT,
+    ATTR_CAN_UPDATE,
+    ATTR_SHOULD_UPDATE,
+)
+
+def _project(data: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    """Return the given fields of a response object."""
+    if not isinstance(data, dict):
+        return {}
+    return {field: data[field] for field in fields if field in data}
+
+def _project_device(data: dict[str, Any]) -> dict[str, Any]:
+    """Return the fields of a device that the models read."""
+    device = _project(data, DEVICE_FIELDS)
+    if profile := data.get(ATTR_PROFILE):
+        device[ATTR_PROFILE] = _project(profile, PROFILE_FIELDS)
+    if location := data.get(ATTR_LOCATION):
+        projected = _project(location, LOCATION_FIELDS)
+        projected[ATTR_DETAILS] = _project(
+            location.get(ATTR_DETAILS), DETAILS_FIELDS
+        )
+        projected[ATTR_DEVICE_INFO] = _project(
+            location.get(ATTR_DEVICE_INFO), DEVICE_INFO_FIELDS
+        )
+        device[ATTR_LOCATION] = projected
+    return device
+
+def project_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Return a `/devices` response with only the fields the models read.
+
+    The projection still parses with `parse_devices`, and shows how much
+    of the retained response the models never read.
+    """
+    return {
+        ATTR_DATA: [_project_device(device) for device in payload[ATTR_DATA]]
+    }
+
+def _retained(build: Callable[[], Any]) -> int:
+    """Return the bytes still allocated for the result of a build."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+def run(size: int, seed: int) -> dict[str, int]:
+    """Return the retained memory for one fleet size."""
+    body = FakeFleet(size, seed).body
+    projected = project_payload(json.loads(body))
+
+    with patch.object(models, "_intern", lambda value: value):
+        records = _retained(lambda: parse_devices(json.loads(body)))
+
+    return {
+        "devices": size,
+        "payload_bytes": len(body),
+        "decoded": _retained(lambda: json.loads(body)),
+        "projected": _retained(lambda: project_payload(json.loads(body))),
+        "projected_bytes": len(json.dumps(projected).encode()),
+        "records": records,
+        "records_interned": _retained(
+            lambda: parse_devices(json.loads(body))
+        ),
+    }
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--fleets", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", type=argparse.FileType("w"), default=sys.stdout
+    )
+    args = parser.parse_args()
+
+    results = [run(size, args.seed) for size in args.fleets]
+    json.dump({"benchmark": "memory", "results": results}, args.output, indent=2)
+    args.output.write("\n")
+
+if __name__ == "__main__":
+    main()
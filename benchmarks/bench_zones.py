@@ -0,0 +1,99 @@
+"""Benchmark zone lookups with the spatial index against a linear scan.
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.bench_zones --zones 10 100 1000 5000
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import time
+
+from custom_components.copenhagen_trackers.geo import haversine_distance
+from custom_components.copenhagen_trackers.zones import Zone, ZoneIndex
+
+# Zones and trackers are spread over greater Copenhagen
+CENTER = (55.676, 12.568)
+SPREAD = 0.5
+
+def make_zones(count: int, rng: random.Random) -> list[Zone]:
+    """Return zones with realistic radii around the center."""
+    return [
+        Zone(
+            f"zone.bench_{index}",
+            CENTER[0] + rng.uniform(-SPREAD, SPREAD),
+            CENTER[1] + rng.uniform(-SPREAD, SPREAD),
+            rng.choice((50, 100, 250, 1000)),
+        )
+        for index in range(count)
+    ]
+
+def linear_lookup(
+    zones: list[Zone], latitude: float, longitude: float, accuracy: float
+) -> frozenset[str]:
+    """Return the zones containing a location by measuring every zone."""
+    return frozenset(
+        zone.entity_id
+        for zone in zones
+        if haversine_distance(latitude, longitude, zone.latitude, zone.longitude)
+        - accuracy
+        < zone.radius
+    )
+
+def run(zone_count: int, lookups: int, seed: int) -> dict[str, float | int]:
+    """Return the timings for one number of zones."""
+    rng = random.Random(seed)
+    zones = make_zones(zone_count, rng)
+    points = [
+        (
+            CENTER[0] + rng.uniform(-SPREAD, SPREAD),
+            CENTER[1] + rng.uniform(-SPREAD, SPREAD),
+            rng.choice((20, 50, 200)),
+        )
+        for _ in range(lookups)
+    ]
+
+    start = time.perf_counter()
+    index = ZoneIndex(zones)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.lookup(*point) for point in points]
+    indexed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = [linear_lookup(zones, *point) for point in points]
+    linear_time = time.perf_counter() - start
+
+    if indexed != linear:
+        raise AssertionError("Indexed and linear lookups disagree")
+
+    return {
+        "zones": zone_count,
+        "lookups": lookups,
+        "build_ms": build * 1000,
+        "indexed_us_per_lookup": indexed_time / lookups * 1e6,
+        "linear_us_per_lookup": linear_time / lookups * 1e6,
+        "speedup": linear_time / indexed_time,
+    }
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--zones", type=int, nargs="+", default=[10, 100, 1000, 5000]
+    )
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
+    args = parser.parse_args()
+
+    results = [run(count, args.lookups, args.seed) for count in args.zones]
+    json.dump({"benchmark": "zones", "results": results}, args.output, indent=2)
+    args.output.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Local stand-in for the Copenhagen Trackers API serving synthetic fleets."""
+
+from __future__ import annotations
+import base64
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import random
+import time
+from typing import Any
+
+from aiohttp import hdrs, web
+
+DEVICE_TYPE_COBBLESTONE = 1
+DEVICE_TYPE_GEMSTONE = 5
+
+CITIES = ("København", "Aarhus", "Odense", "Aalborg")
+TOKEN_LIFETIME = 3600
+
+def _timestamp(value: datetime) -> str:
+    """Return a timestamp formatted like the API."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+def make_device(index: int, rng: random.Random, now: datetime) -> dict[str, Any]:
+    """Return a Cobblestone or Gemstone device as served by `/devices`."""
+    device_type = rng.choice((DEVICE_TYPE_COBBLESTONE, DEVICE_TYPE_GEMSTONE))
+    if device_type == DEVICE_TYPE_COBBLESTONE:
+        device_info = {
+            "sig_strength": str(rng.randint(5, 30)),
+            "fixt": str(rng.randint(5, 60)),
+            "num_sats": str(rng.randint(3, 12)),
+            "volt": "3.9",
+        }
+    else:
+        device_info = {
+            "trans": str(rng.randint(5, 30)),
+            "ttf": str(rng.randint(5, 60)),
+        }
+    return {
+        "id": f"bench{index:05d}",
+        "name": f"Bike {index}",
+        "device_type": device_type,
+        "firmware_version": "1.2.3",
+        "battery_percentage": rng.randint(1, 100),
+        "updated_at": _timestamp(now),
+        "can_update": False,
+        "should_update": rng.random() < 0.1,
+        "profile": {
+            "name": "Standard",
+            "description": "Default profile",
+            "updated_at": "2024-01-01T00:00:00.000Z",
+            "interval": 600,
+        },
+        "location": {
+            "road": f"Vej {index}",
+            "city": rng.choice(CITIES),
+            "country": "Denmark",
+            "signal": rng.randint(0, 4),
+            "created_at": _timestamp(now),
+            "details": {
+                "lat": str(55.5 + rng.random() * 0.5),
+                "lon": str(12.2 + rng.random() * 0.5),
+                "acc": str(rng.choice((1.5, 2.5, 10))),
+            },
+            "device_info": device_info,
+        },
+    }
+
+class FakeFleet:
+    """A synthetic fleet whose devices move between refreshes."""
+
+    def __init__(self, size: int, seed: int = 0) -> None:
+        """Initialize."""
+        self._rng = random.Random(seed)
+        self._now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.devices = [
+            make_device(index, self._rng, self._now) for index in range(size)
+        ]
+        self._encode()
+
+    def _encode(self) -> None:
+        """Serialize the fleet once, like a server caching its response."""
+        self.body = json.dumps({"data": self.devices}).encode()
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=8).hexdigest()}"'
+
+    def move(self, fraction: float) -> None:
+        """Report a new location for a fraction of the devices."""
+        self._now += timedelta(minutes=1)
+        for device in self._rng.sample(
+            self.devices, round(len(self.devices) * fraction)
+        ):
+            details = device["location"]["details"]
+            for key in ("lat", "lon"):
+                details[key] = str(
+                    float(details[key]) + self._rng.uniform(-0.01, 0.01)
+                )
+            device["updated_at"] = _timestamp(self._now)
+        self._encode()
+
+def _make_token() -> str:
+    """Return an unsigned JWT carrying an expiry, like the login endpoint."""
+    claims = json.dumps({"exp": int(time.time()) + TOKEN_LIFETIME}).encode()
+    payload = base64.urlsafe_b64encode(claims).rstrip(b"=").decode()
+    return f"e30.{payload}.signature"
+
+def create_app(fleet: FakeFleet) -> web.Application:
+    """Return an application serving `/login` and `/devices`."""
+    stats = {"login": 0, "devices": 0, "not_modified": 0}
+
+    async def login(request: web.Request) -> web.Response:
+        stats["login"] += 1
+        return web.json_response({"access_token": _make_token()})
+
+    async def devices(request: web.Request) -> web.Response:
+        stats["devices"] += 1
+        if not request.headers.get(hdrs.AUTHORIZATION, "").startswith("Bearer "):
+            raise web.HTTPUnauthorized
+        if request.headers.get(hdrs.IF_NONE_MATCH) == fleet.etag:
+            stats["not_modified"] += 1
+            return web.Response(status=304)
+        return web.Response(
+            body=fleet.body,
+            content_type="application/json",
+            headers={hdrs.ETAG: fleet.etag},
+        )
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post("/v2/login", login)
+    app.router.add_get("/v2/devices", devices)
+    return app
+
+async def start_server(fleet: FakeFleet) -> tuple[web.AppRunner, str]:
+    """Start the fake API on a free local port, returning its endpoint."""
+    runner = web.AppRunner(create_app(fleet))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}/v2"
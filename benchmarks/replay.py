@@ -0,0 +1,115 @@
+"""Replay a recording of API responses through the integration.
+
+Turn on "Record API responses" in the options of a config entry to record
+`<config>/copenhagen_trackers.<account>.ndjson.gz`, then run from the
+repository root with the packages in benchmarks/requirements.txt installed:
+
+    python -m benchmarks.replay copenhagen_trackers.1234.ndjson.gz \\
+        --speed 0 --output replay_output.json
+
+The refreshes are spaced as they were recorded, divided by the speed, so a
+speed of zero replays the recording as fast as possible. The first response
+is used to set up the config entry, and each later one is fetched by a
+coordinator refresh.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.loader import DATA_CUSTOM_COMPONENTS
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+    mock_storage,
+)
+
+from custom_components.copenhagen_trackers.const import DOMAIN
+from custom_components.copenhagen_trackers.recording import (
+    ReplayTransport,
+    load_recording,
+)
+
+async def _async_replay(
+    records: list[dict[str, Any]], speed: float
+) -> dict[str, Any]:
+    """Return the measurements of a replay."""
+    transport = ReplayTransport(records, speed)
+    with patch(
+        "custom_components.copenhagen_trackers.api.CopenhagenTrackersTransport",
+        lambda session, **kwargs: transport,
+    ), patch(
+        # Every refresh must reach the recording
+        "custom_components.copenhagen_trackers.registry.REFRESH_COALESCE_WINDOW",
+        0,
+    ):
+        # Fresh storage, so no snapshot of an earlier run is loaded
+        with mock_storage():
+            async with async_test_home_assistant() as hass:
+                hass.data.pop(DATA_CUSTOM_COMPONENTS, None)
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    data={CONF_EMAIL: "replay@example.com", CONF_PASSWORD: "replay"},
+                )
+                entry.add_to_hass(hass)
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+                coordinator = hass.data[DOMAIN][entry.entry_id]
+
+                async def _async_refresh() -> None:
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+
+                durations = await transport.async_replay(_async_refresh)
+                metrics = coordinator.account.metrics.as_dict()
+                await hass.config_entries.async_unload(entry.entry_id)
+
+    return {
+        "responses": len(records),
+        "refreshes": len(durations),
+        "refresh_ms": {
+            "mean": statistics.fmean(durations) * 1000 if durations else None,
+            "median": statistics.median(durations) * 1000 if durations else None,
+            "max": max(durations) * 1000 if durations else None,
+        },
+        "metrics": metrics,
+    }
+
+def main() -> None:
+    """Replay the recording and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="replay speed relative to the recording, or 0 for no delays",
+    )
+    parser.add_argument(
+        "--output", type=argparse.FileType("w"), default=sys.stdout
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        _async_replay(load_recording(args.recording), args.speed)
+    )
+    json.dump(
+        {
+            "benchmark": "replay",
+            "python": sys.version.split()[0],
+            "speed": args.speed,
+            "results": results,
+        },
+        args.output,
+        indent=2,
+    )
+    args.output.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,33 @@
 """Copenhagen Trackers integration for Home Assistant."""
 
 from __future__ import annotations
-from datetime import timedelta
 import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONF_EMAIL,
-    CONF_PASSWORD,
     Platform,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.helpers.typing import ConfigType
 
-from .api import CopenhagenTrackersAPI
 from .const import (
     BRAND,
     DOMAIN,
-    CONF_ACCESS_TOKEN,
+    DEFAULT_SCAN_INTERVAL,
 )
 from .coordinator import CopenhagenTrackersDataUpdateCoordinator
+from .registry import (
+    async_get_registry,
+    get_account_id,
+    get_account_store,
+    get_battery_store,
+    get_history_store,
+)
+from .services import async_setup_services
+from .webhook import async_unregister_webhook, async_update_webhook
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,33 +38,89 @@ PLATFORMS: list[Platform] = [
     Platform.DEVICE_TRACKER
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Copenhagen Trackers services."""
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Copenhagen Trackers from a config entry."""
-    session = async_get_clientsession(hass)
-    
-    api = CopenhagenTrackersAPI(
-        session,
-        entry.data[CONF_EMAIL],
-        entry.data[CONF_PASSWORD],
-        entry.data.get(CONF_ACCESS_TOKEN),
-    )
-
+    registry = async_get_registry(hass)
     coordinator = CopenhagenTrackersDataUpdateCoordinator(
         hass,
         _LOGGER,
-        api,
+        registry.async_acquire(entry),
         name=BRAND,
-        update_interval=timedelta(hours=1),
+        update_interval=DEFAULT_SCAN_INTERVAL,
     )
+    coordinator.async_set_options(entry.options)
+
+    try:
+        if await coordinator.async_load_snapshot():
+            # Start from the last known devices and go live in the background
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+            )
+        else:
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        registry.async_release(entry)
+        raise
 
-    await coordinator.async_config_entry_first_refresh()
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(coordinator.async_shutdown)
+    entry.async_on_unload(coordinator.async_track_zones())
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    hass.data[DOMAIN][entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    async_update_webhook(hass, entry, coordinator)
+    entry.async_on_unload(lambda: async_unregister_webhook(hass, coordinator))
+
     return True
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the entry.
+
+    Saving a new access token updates the entry too, so this must be cheap
+    when the options did not change.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_get_registry(hass).async_set_budget_limit(entry)
+    async_update_webhook(hass, entry, coordinator)
+    if coordinator.async_set_options(entry.options):
+        await coordinator.async_request_refresh()
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok
\ No newline at end of file
+        async_get_registry(hass).async_release(entry)
+    return unload_ok
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: DeviceEntry
+) -> bool:
+    """Allow removing a device that is no longer reported by the API."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return not any(
+        identifier[0] == DOMAIN
+        and (
+            identifier[1] in coordinator.devices
+            or identifier[1] == coordinator.account.account_id
+        )
+        for identifier in device_entry.identifiers
+    )
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the saved data, unless another entry uses the account."""
+    account_id = get_account_id(entry.data[CONF_EMAIL])
+    if not any(
+        get_account_id(other.data[CONF_EMAIL]) == account_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        await get_account_store(hass, account_id).async_remove()
+        await get_history_store(hass, account_id).async_remove()
+        await get_battery_store(hass, account_id).async_remove()
\ No newline at end of file
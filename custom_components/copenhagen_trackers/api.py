@@ -1,13 +1,32 @@
 """API Client for Copenhagen Trackers."""
 
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+
 import aiohttp
 
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from .const import (
     API_ENDPOINT,
     CONF_ACCESS_TOKEN
 )
+from .budget import RequestBudget
+from .metrics import Metrics
+from .recording import ResponseRecorder
+from .transport import CircuitOpenError, CopenhagenTrackersTransport
+
+# Refresh tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
+_LOGGER = logging.getLogger(__name__)
+
+class NotModifiedError(Exception):
+    """Error to indicate devices were not modified, but none are cached."""
 
 class CopenhagenTrackersAPI:
     """Copenhagen Trackers API client."""
@@ -18,46 +37,165 @@ class CopenhagenTrackersAPI:
         email: str,
         password: str,
         access_token: Optional[str] = None,
+        token_callback: Optional[Callable[[str], None]] = None,
+        request_limit: Optional[asyncio.Semaphore] = None,
+        metrics: Optional[Metrics] = None,
+        budget: Optional[RequestBudget] = None,
     ) -> None:
         """Initialize."""
-        self._session = session
+        self._transport = CopenhagenTrackersTransport(
+            session, budget=budget, request_limit=request_limit
+        )
         self._email = email
         self._password = password
         self._access_token = access_token
+        self._token_expires_at = self._get_token_expiry(access_token)
+        self._token_callback = token_callback
+        self._token_lock = asyncio.Lock()
+        self.metrics = metrics or Metrics()
+        self.recorder: Optional[ResponseRecorder] = None
+        self._devices_digest: Optional[bytes] = None
+        self._devices_etag: Optional[str] = None
+        self._devices_last_modified: Optional[str] = None
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Return the current access token."""
+        return self._access_token
 
-    async def _async_fetch_access_token(self):
-        """Get access token."""
-        response = await self._session.post(
-            f"{API_ENDPOINT}/login",
-            json={"email": self._email, "password": self._password},
+    @property
+    def circuit_state(self) -> str:
+        """Return the state of the circuit breaker."""
+        return self._transport.breaker.state
+
+    @staticmethod
+    def _get_token_expiry(access_token: Optional[str]) -> Optional[float]:
+        """Return the expiry of a JWT access token, if it carries one."""
+        try:
+            payload = access_token.split(".")[1]
+            claims = json.loads(
+                base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+            )
+            return float(claims["exp"])
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _token_expiring(self) -> bool:
+        """Return if the access token is about to expire."""
+        return (
+            self._token_expires_at is not None
+            and time.time() >= self._token_expires_at - TOKEN_REFRESH_MARGIN
         )
-        response.raise_for_status()
-        data = await response.json()
-        self._access_token = data[CONF_ACCESS_TOKEN]
+
+    async def _async_fetch_access_token(self, stale_token: Optional[str]):
+        """Replace a stale access token, logging in once for concurrent callers."""
+        async with self._token_lock:
+            if self._access_token != stale_token and not self._token_expiring():
+                # Another caller already logged in while we were waiting
+                return
+
+            response = await self._transport.async_request(
+                aiohttp.hdrs.METH_POST,
+                f"{API_ENDPOINT}/login",
+                json={"email": self._email, "password": self._password},
+            )
+            response.raise_for_status()
+            data = await response.json()
+            self._access_token = data[CONF_ACCESS_TOKEN]
+            self.metrics.logins += 1
+            self._token_expires_at = self._get_token_expiry(self._access_token)
+
+        if self._token_callback:
+            self._token_callback(self._access_token)
 
     async def async_ensure_token(self) -> None:
         """Ensure a valid access token exists."""
-        if not self._access_token:
-            await self._async_fetch_access_token()
+        if not self._access_token or self._token_expiring():
+            await self._async_fetch_access_token(self._access_token)
 
-    async def async_get_devices_with_auth(self) -> Dict[str, Any]:
-        """Get devices data."""
+    async def async_get_devices_with_auth(
+        self, conditional: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Get devices data.
+
+        With `conditional`, the caller has a copy of the devices, and None is
+        returned if they have not changed since the last request. Without
+        it, a not modified response raises NotModifiedError.
+        """
         await self.async_ensure_token()
-        
+        access_token = self._access_token
+
         try:
-            return await self._async_get_devices()
+            return await self._async_get_devices(conditional)
         except aiohttp.ClientResponseError as error:
             if error.status in (401, 403):
                 # Token invalid/expired, get a new one and retry
-                await self._async_fetch_access_token()
-                return await self._async_get_devices()
+                await self._async_fetch_access_token(access_token)
+                return await self._async_get_devices(conditional)
             raise
-    
-    async def _async_get_devices(self) -> Dict[str, Any]:
+
+    async def _async_get_devices(self, conditional: bool) -> Optional[Dict[str, Any]]:
         """Get devices data."""
-        response = await self._session.get(
-            f"{API_ENDPOINT}/devices",
-            headers={"Authorization": f"Bearer {self._access_token}"},
-        )
-        response.raise_for_status()
-        return await response.json()
\ No newline at end of file
+        headers = {"Authorization": f"Bearer {self._access_token}"}
+        if conditional:
+            if self._devices_etag:
+                headers[aiohttp.hdrs.IF_NONE_MATCH] = self._devices_etag
+            if self._devices_last_modified:
+                headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = self._devices_last_modified
+
+        metrics = self.metrics
+        metrics.requests += 1
+        start = time.perf_counter()
+        try:
+            response = await self._transport.async_request(
+                aiohttp.hdrs.METH_GET,
+                f"{API_ENDPOINT}/devices",
+                headers=headers,
+            )
+            if response.status == 304:
+                # Servers may answer so even without validators
+                response.release()
+                if not conditional:
+                    raise NotModifiedError(
+                        "Devices not modified, but no copy of them is cached"
+                    )
+                body = None
+            else:
+                response.raise_for_status()
+                body = await response.read()
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            CircuitOpenError,
+            NotModifiedError,
+        ):
+            metrics.request_failures += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.request_latency.record(elapsed)
+
+        if self.recorder:
+            try:
+                await self.recorder.async_record(
+                    response.status, elapsed, response.headers, body
+                )
+            except OSError as error:
+                _LOGGER.warning("Error recording the devices: %s", error)
+        if body is None:
+            return None
+
+        self._devices_etag = response.headers.get(aiohttp.hdrs.ETAG)
+        self._devices_last_modified = response.headers.get(aiohttp.hdrs.LAST_MODIFIED)
+
+        # Servers that ignore the validators still send identical bodies
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if conditional and digest == self._devices_digest:
+            return None
+        self._devices_digest = digest
+        metrics.payload_bytes = len(body)
+        metrics.payload_bytes_total += len(body)
+        start = time.perf_counter()
+        payload = json.loads(body)
+        metrics.decode_time.record(time.perf_counter() - start)
+        return payload
@@ -0,0 +1,103 @@
+"""Battery drain estimation for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from typing import Any
+
+# Tuning
+CHARGE_THRESHOLD = 3
+RATE_SMOOTHING = 0.3
+
+# Storage keys
+STORAGE_ANCHOR_AT = "anchor_at"
+STORAGE_ANCHOR_PERCENTAGE = "anchor_percentage"
+STORAGE_CHARGED_AT = "charged_at"
+STORAGE_PERCENTAGE = "percentage"
+STORAGE_RATE = "rate"
+STORAGE_UPDATED_AT = "updated_at"
+
+class BatteryModel:
+    """Online estimate of the discharge rate of one tracker.
+
+    Batteries are reported in whole percentages, so the slope is measured
+    from the last change of the level to the next drop, and smoothed with
+    an exponentially weighted moving average. A rise beyond the charge
+    threshold means the tracker was charged, which starts a new estimate.
+    """
+
+    __slots__ = (
+        "_anchor_at",
+        "_anchor_percentage",
+        "_updated_at",
+        "percentage",
+        "rate",
+        "charged_at",
+    )
+
+    def __init__(self) -> None:
+        """Initialize."""
+        # Time and level of the last change of the level
+        self._anchor_at: float | None = None
+        self._anchor_percentage: float | None = None
+        self._updated_at: float | None = None
+        self.percentage: float | None = None
+        # Discharge rate in percent per hour
+        self.rate: float | None = None
+        self.charged_at: float | None = None
+
+    def update(self, timestamp: float, percentage: float) -> bool:
+        """Add a level reported at a POSIX timestamp."""
+        if self._updated_at is not None and timestamp <= self._updated_at:
+            return False
+        self._updated_at = timestamp
+        self.percentage = percentage
+
+        if self._anchor_at is None:
+            self._anchor_at = timestamp
+            self._anchor_percentage = percentage
+        elif percentage >= self._anchor_percentage + CHARGE_THRESHOLD:
+            self._anchor_at = timestamp
+            self._anchor_percentage = percentage
+            self.rate = None
+            self.charged_at = timestamp
+        elif percentage < self._anchor_percentage:
+            slope = (self._anchor_percentage - percentage) / (
+                (timestamp - self._anchor_at) / 3600
+            )
+            if self.rate is None:
+                self.rate = slope
+            else:
+                self.rate += RATE_SMOOTHING * (slope - self.rate)
+            self._anchor_at = timestamp
+            self._anchor_percentage = percentage
+        # Smaller rises are rounding noise, and keep the anchor
+        return True
+
+    @property
+    def empty_at(self) -> float | None:
+        """Return the POSIX timestamp the battery is predicted to run out."""
+        if not self.rate or self.percentage is None:
+            return None
+        return self._updated_at + self.percentage / self.rate * 3600
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the model for storage."""
+        return {
+            STORAGE_ANCHOR_AT: self._anchor_at,
+            STORAGE_ANCHOR_PERCENTAGE: self._anchor_percentage,
+            STORAGE_UPDATED_AT: self._updated_at,
+            STORAGE_PERCENTAGE: self.percentage,
+            STORAGE_RATE: self.rate,
+            STORAGE_CHARGED_AT: self.charged_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> BatteryModel:
+        """Restore a model saved by `to_dict`."""
+        model = cls()
+        model._anchor_at = data[STORAGE_ANCHOR_AT]
+        model._anchor_percentage = data[STORAGE_ANCHOR_PERCENTAGE]
+        model._updated_at = data[STORAGE_UPDATED_AT]
+        model.percentage = data[STORAGE_PERCENTAGE]
+        model.rate = data[STORAGE_RATE]
+        model.charged_at = data[STORAGE_CHARGED_AT]
+        return model
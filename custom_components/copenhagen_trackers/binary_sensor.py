@@ -1,65 +1,141 @@
 """Binary sensor platform for Copenhagen Trackers integration."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
+    BinarySensorEntityDescription,
     BinarySensorDeviceClass,
 )
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.util import dt as dt_util
 
-from .const import (
-    DOMAIN,
-    ATTR_DATA as ATTR_DATA,
-    ATTR_ID as ATTR_ID
+from .const import DOMAIN, ENTITY_GROUP_FIRMWARE, ENTITY_GROUP_MOVEMENT
+from .entity import (
+    CopenhagenTrackersEntity,
+    CopenhagenTrackersEntityDescription,
+    CopenhagenTrackersHistoryEntity,
 )
-from .entity import CopenhagenTrackersEntity
+from .models import TrackerDevice
 
 # API response keys
 ATTR_CAN_UPDATE = "can_update"
 ATTR_SHOULD_UPDATE = "should_update"
 
+# State attributes
+ATTR_TRIP_DISTANCE = "trip_distance"
+ATTR_TRIP_STARTED_AT = "trip_started_at"
+
 # Entities
 SUFFIX_CAN_UPDATE = ATTR_CAN_UPDATE
 SUFFIX_SHOULD_UPDATE = ATTR_SHOULD_UPDATE
+SUFFIX_MOVING = "moving"
 TRANSLATION_KEY_CAN_UPDATE = ATTR_CAN_UPDATE
 TRANSLATION_KEY_SHOULD_UPDATE = ATTR_SHOULD_UPDATE
+TRANSLATION_KEY_MOVING = SUFFIX_MOVING
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Copenhagen Trackers binary sensors based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
     
-    entities = []
-    for device in coordinator.data[ATTR_DATA]:
-        entities.extend((
-            CanUpdateBinarySensor(coordinator, device[ATTR_ID]),
-            ShouldUpdateBinarySensor(coordinator, device[ATTR_ID]),
-        ))
-    
-    async_add_entities(entities)
+    @callback
+    def _async_add_devices(
+        device_ids: set[str], groups: set[str | None]
+    ) -> None:
+        entities = []
+        for device_id in device_ids:
+            entities.extend(
+                CopenhagenTrackersBinarySensor(coordinator, device_id, description)
+                for description in BINARY_SENSORS
+                if description.group in groups
+            )
+            if MOVING_BINARY_SENSOR.group in groups:
+                entities.append(
+                    MovingBinarySensor(coordinator, device_id, MOVING_BINARY_SENSOR)
+                )
+        async_add_entities(entities)
+
+    entry.async_on_unload(
+        coordinator.async_add_devices_listener(_async_add_devices)
+    )
+
+@dataclass(frozen=True, kw_only=True)
+class CopenhagenTrackersBinarySensorEntityDescription(
+    CopenhagenTrackersEntityDescription, BinarySensorEntityDescription
+):
+    """Describes a Copenhagen Trackers binary sensor."""
+
+@dataclass(frozen=True, kw_only=True)
+class DeviceBinarySensorEntityDescription(
+    CopenhagenTrackersBinarySensorEntityDescription
+):
+    """Describes a binary sensor reading a flag of the device."""
+
+    is_on_fn: Callable[[TrackerDevice], bool]
+
+BINARY_SENSORS: tuple[DeviceBinarySensorEntityDescription, ...] = (
+    DeviceBinarySensorEntityDescription(
+        key=SUFFIX_CAN_UPDATE,
+        translation_key=TRANSLATION_KEY_CAN_UPDATE,
+        device_class=BinarySensorDeviceClass.UPDATE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:cloud-download",
+        group=ENTITY_GROUP_FIRMWARE,
+        is_on_fn=lambda device: device.can_update,
+    ),
+    DeviceBinarySensorEntityDescription(
+        key=SUFFIX_SHOULD_UPDATE,
+        translation_key=TRANSLATION_KEY_SHOULD_UPDATE,
+        device_class=BinarySensorDeviceClass.UPDATE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:cloud-alert",
+        group=ENTITY_GROUP_FIRMWARE,
+        is_on_fn=lambda device: device.should_update,
+    ),
+)
+
+MOVING_BINARY_SENSOR = CopenhagenTrackersBinarySensorEntityDescription(
+    key=SUFFIX_MOVING,
+    translation_key=TRANSLATION_KEY_MOVING,
+    device_class=BinarySensorDeviceClass.MOVING,
+    group=ENTITY_GROUP_MOVEMENT,
+)
 
-class CanUpdateBinarySensor(CopenhagenTrackersEntity, BinarySensorEntity):
-    """Binary sensor for device update capability."""
+class CopenhagenTrackersBinarySensor(
+    CopenhagenTrackersEntity, BinarySensorEntity
+):
+    """Binary sensor for a flag of the device."""
 
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_icon = "mdi:cloud-download"
-    _attr_device_class = BinarySensorDeviceClass.UPDATE
-    _attr_translation_key = TRANSLATION_KEY_CAN_UPDATE
-    SUFFIX = SUFFIX_CAN_UPDATE
+    entity_description: DeviceBinarySensorEntityDescription
 
     @property
-    def is_on(self):
+    def is_on(self) -> bool | None:
         """Return true if the binary sensor is on."""
-        return bool(self.device_data.get(ATTR_CAN_UPDATE, False))
+        if (device := self.device) is None:
+            return None
+        return self.entity_description.is_on_fn(device)
 
-class ShouldUpdateBinarySensor(CopenhagenTrackersEntity, BinarySensorEntity):
-    """Binary sensor for device update recommendation."""
-
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_icon = "mdi:cloud-alert"
-    _attr_device_class = BinarySensorDeviceClass.UPDATE
-    _attr_translation_key = TRANSLATION_KEY_SHOULD_UPDATE
-    SUFFIX = SUFFIX_SHOULD_UPDATE
+class MovingBinarySensor(CopenhagenTrackersHistoryEntity, BinarySensorEntity):
+    """Binary sensor for whether the device is on a trip."""
 
     @property
     def is_on(self):
-        """Return true if the binary sensor is on."""
-        return bool(self.device_data.get(ATTR_SHOULD_UPDATE, False))
\ No newline at end of file
+        """Return true if the device is on a trip."""
+        if history := self.history:
+            return history.moving
+        return False
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        history = self.history
+        if history is None or not history.moving:
+            return None
+        return {
+            ATTR_TRIP_STARTED_AT: dt_util.utc_from_timestamp(
+                history.trip_started_at
+            ).isoformat(),
+            ATTR_TRIP_DISTANCE: round(history.trip_distance / 1000, 2),
+        }
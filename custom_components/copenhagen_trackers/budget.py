@@ -0,0 +1,170 @@
+"""Request budget for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+import heapq
+from itertools import count
+from math import ceil
+
+# Priorities, lowest first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# Share of the budget only interactive requests may use
+INTERACTIVE_RESERVE = 0.2
+
+# Priority of the requests sent from the current context
+request_priority: ContextVar[int] = ContextVar(
+    "request_priority", default=PRIORITY_BACKGROUND
+)
+
+class RequestBudget:
+    """Limit the requests to the API within a sliding window.
+
+    Requests beyond the budget wait in a queue ordered by priority, and
+    background requests leave a reserve of the budget to interactive ones.
+    The priority of the requests of a task can be raised while they wait.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        """Initialize with `limit` requests per `window` seconds."""
+        self._limit = limit
+        self._window = window
+        self._granted: deque[float] = deque()
+        self._waiters: list[
+            tuple[int, int, asyncio.Future[None], asyncio.Task | None]
+        ] = []
+        self._task_priorities: dict[asyncio.Task, int] = {}
+        self._order = count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._listeners: list[Callable[[], None]] = []
+        self.deferred = 0
+
+    @property
+    def limit(self) -> int:
+        """Return the number of requests per window."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: int) -> None:
+        """Change the number of requests per window."""
+        self._limit = limit
+        self._process()
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of requests left in the window."""
+        self._prune(asyncio.get_running_loop().time())
+        return max(0, self._limit - len(self._granted))
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for the budget."""
+        return sum(not future.done() for _, _, future, _ in self._waiters)
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call back whenever the remaining budget or the queue changes."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self) -> None:
+        """Call the listeners."""
+        for listener in list(self._listeners):
+            listener()
+
+    def _prune(self, now: float) -> None:
+        """Forget the requests that left the window."""
+        while self._granted and self._granted[0] <= now - self._window:
+            self._granted.popleft()
+
+    def _allows(self, priority: int) -> bool:
+        """Return if a request of a priority fits the budget."""
+        limit = self._limit
+        if priority != PRIORITY_INTERACTIVE:
+            limit = max(1, limit - ceil(limit * INTERACTIVE_RESERVE))
+        return len(self._granted) < limit
+
+    async def async_acquire(self, priority: int | None = None) -> None:
+        """Wait until a request of a priority fits the budget, and count it."""
+        if priority is None:
+            priority = request_priority.get()
+        task = asyncio.current_task()
+        priority = min(priority, self._task_priorities.get(task, priority))
+        loop = asyncio.get_running_loop()
+        self._prune(loop.time())
+        if not self._waiters and self._allows(priority):
+            self._granted.append(loop.time())
+            self._notify()
+            return
+
+        self.deferred += 1
+        future: asyncio.Future[None] = loop.create_future()
+        heapq.heappush(
+            self._waiters, (priority, next(self._order), future, task)
+        )
+        self._process()
+        self._notify()
+        try:
+            await future
+        finally:
+            if not future.done():
+                future.cancel()
+            # Cancelled waiters may have held up the ones behind them
+            self._process()
+
+    def prioritize(self, task: asyncio.Task, priority: int) -> None:
+        """Raise the priority of the requests of a task, waiting or later."""
+        if task.done():
+            return
+        if task not in self._task_priorities:
+            task.add_done_callback(self._task_priorities.pop)
+        priority = min(priority, self._task_priorities.get(task, priority))
+        self._task_priorities[task] = priority
+        self._waiters = [
+            (
+                min(waiter_priority, priority)
+                if waiter_task is task
+                else waiter_priority,
+                order,
+                future,
+                waiter_task,
+            )
+            for waiter_priority, order, future, waiter_task in self._waiters
+        ]
+        heapq.heapify(self._waiters)
+        self._process()
+
+    def _process(self) -> None:
+        """Admit the waiting requests that fit, in the order of priority."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._prune(loop.time())
+
+        admitted = False
+        while self._waiters:
+            priority, _, future, _ = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._allows(priority):
+                break
+            heapq.heappop(self._waiters)
+            self._granted.append(loop.time())
+            future.set_result(None)
+            admitted = True
+
+        if self._waiters and self._granted:
+            # Check again once the oldest request leaves the window
+            self._timer = loop.call_at(
+                self._granted[0] + self._window, self._process
+            )
+        if admitted:
+            self._notify()
@@ -6,12 +6,61 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.components import webhook
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_WEBHOOK_ID
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.network import NoURLAvailableError
+from homeassistant.helpers.selector import (
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+)
 
-from .const import DOMAIN
+from .const import (
+    CONF_ACCESS_TOKEN,
+    CONF_DISABLED_GROUPS,
+    CONF_FORCE_REFRESH_WINDOW,
+    CONF_IGNORED_TRACKERS,
+    CONF_JITTER_FILTER,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_RECORD_RESPONSES,
+    CONF_REQUEST_BUDGET,
+    CONF_STALENESS_BUDGET,
+    DEFAULT_FORCE_REFRESH_WINDOW,
+    DEFAULT_JITTER_FILTER,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_RECORD_RESPONSES,
+    DEFAULT_REQUEST_BUDGET,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALENESS_BUDGET,
+    DOMAIN,
+    ENTITY_GROUPS,
+    MIN_SCAN_INTERVAL,
+)
 from .api import CopenhagenTrackersAPI
+from .budget import PRIORITY_INTERACTIVE, request_priority
+from .registry import async_get_registry
+
+# Translation keys
+TRANSLATION_KEY_ENTITY_GROUPS = "entity_groups"
+
+# Bounds of the intervals in minutes
+MAX_INTERVAL_MINUTES = 24 * 60
+MAX_STALENESS_BUDGET_MINUTES = 7 * 24 * 60
+
+# Bound of the force refresh window in seconds
+MAX_FORCE_REFRESH_WINDOW = 60
+
+# Bounds of the request budget per hour
+MAX_REQUEST_BUDGET = 3600
+MIN_REQUEST_BUDGET = 10
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,6 +69,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -27,20 +84,28 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
+            await self.async_set_unique_id(user_input[CONF_EMAIL].casefold())
+            self._abort_if_unique_id_configured()
+
             try:
                 session = async_get_clientsession(self.hass)
                 api = CopenhagenTrackersAPI(
                     session,
                     user_input[CONF_EMAIL],
                     user_input[CONF_PASSWORD],
+                    budget=async_get_registry(self.hass).budget,
                 )
                 
                 # Test the credentials by getting an access token
-                await api.async_ensure_token()
+                priority = request_priority.set(PRIORITY_INTERACTIVE)
+                try:
+                    await api.async_ensure_token()
+                finally:
+                    request_priority.reset(priority)
 
                 return self.async_create_entry(
                     title=user_input[CONF_EMAIL],
-                    data=user_input,
+                    data={**user_input, CONF_ACCESS_TOKEN: api.access_token},
                 )
             except Exception:
                 _LOGGER.exception(f"Failed to connect to {DOMAIN}")
@@ -55,4 +120,171 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 }
             ),
             errors=errors,
-        )
\ No newline at end of file
+        )
+
+def _minutes(minutes: int) -> NumberSelector:
+    """Return a selector for a number of minutes."""
+    return NumberSelector(
+        NumberSelectorConfig(
+            min=1,
+            max=minutes,
+            step=1,
+            mode=NumberSelectorMode.BOX,
+            unit_of_measurement="min",
+        )
+    )
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of Copenhagen Trackers."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._webhook_id: str | None = None
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors = {}
+        if self._webhook_id is None:
+            # Kept while push is off, so the webhook URL stays the same
+            self._webhook_id = (
+                self.config_entry.options.get(CONF_WEBHOOK_ID)
+                or webhook.async_generate_id()
+            )
+        webhook_id = self._webhook_id
+
+        if user_input is not None:
+            if (
+                user_input[CONF_MIN_SCAN_INTERVAL]
+                > user_input[CONF_MAX_SCAN_INTERVAL]
+            ):
+                errors["base"] = "invalid_scan_interval"
+            else:
+                return self.async_create_entry(
+                    title="", data={**user_input, CONF_WEBHOOK_ID: webhook_id}
+                )
+
+        options = {**self.config_entry.options, **(user_input or {})}
+        devices = self._get_devices()
+        trackers = [
+            SelectOptionDict(value=device_id, label=device.name)
+            for device_id, device in devices.items()
+        ]
+        # Keep ignored trackers selectable after they left the account
+        trackers.extend(
+            SelectOptionDict(value=device_id, label=device_id)
+            for device_id in options.get(CONF_IGNORED_TRACKERS, [])
+            if device_id not in devices
+        )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MIN_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_MIN_SCAN_INTERVAL,
+                            MIN_SCAN_INTERVAL.total_seconds() // 60,
+                        ),
+                    ): _minutes(MAX_INTERVAL_MINUTES),
+                    vol.Required(
+                        CONF_MAX_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_SCAN_INTERVAL,
+                            DEFAULT_SCAN_INTERVAL.total_seconds() // 60,
+                        ),
+                    ): _minutes(MAX_INTERVAL_MINUTES),
+                    vol.Required(
+                        CONF_STALENESS_BUDGET,
+                        default=options.get(
+                            CONF_STALENESS_BUDGET,
+                            DEFAULT_STALENESS_BUDGET.total_seconds() // 60,
+                        ),
+                    ): _minutes(MAX_STALENESS_BUDGET_MINUTES),
+                    vol.Required(
+                        CONF_REQUEST_BUDGET,
+                        default=options.get(
+                            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=MIN_REQUEST_BUDGET,
+                            max=MAX_REQUEST_BUDGET,
+                            step=1,
+                            mode=NumberSelectorMode.BOX,
+                            unit_of_measurement="requests/h",
+                        )
+                    ),
+                    vol.Required(
+                        CONF_FORCE_REFRESH_WINDOW,
+                        default=options.get(
+                            CONF_FORCE_REFRESH_WINDOW,
+                            DEFAULT_FORCE_REFRESH_WINDOW,
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=0,
+                            max=MAX_FORCE_REFRESH_WINDOW,
+                            step=1,
+                            mode=NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        )
+                    ),
+                    vol.Required(
+                        CONF_JITTER_FILTER,
+                        default=options.get(
+                            CONF_JITTER_FILTER, DEFAULT_JITTER_FILTER
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_IGNORED_TRACKERS,
+                        default=options.get(CONF_IGNORED_TRACKERS, []),
+                    ): SelectSelector(
+                        SelectSelectorConfig(options=trackers, multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_DISABLED_GROUPS,
+                        default=options.get(CONF_DISABLED_GROUPS, []),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=list(ENTITY_GROUPS),
+                            multiple=True,
+                            translation_key=TRANSLATION_KEY_ENTITY_GROUPS,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_PUSH_UPDATES,
+                        default=options.get(
+                            CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_RECORD_RESPONSES,
+                        default=options.get(
+                            CONF_RECORD_RESPONSES, DEFAULT_RECORD_RESPONSES
+                        ),
+                    ): bool,
+                }
+            ),
+            errors=errors,
+            description_placeholders={
+                "webhook_url": self._get_webhook_url(webhook_id)
+            },
+        )
+
+    def _get_webhook_url(self, webhook_id: str) -> str:
+        """Return the URL to push devices to."""
+        try:
+            return webhook.async_generate_url(self.hass, webhook_id)
+        except NoURLAvailableError:
+            return webhook.async_generate_path(webhook_id)
+
+    def _get_devices(self) -> dict[str, Any]:
+        """Return all devices of the account, including ignored ones."""
+        if coordinator := self.hass.data.get(DOMAIN, {}).get(
+            self.config_entry.entry_id
+        ):
+            return coordinator.account.devices
+        return {}
@@ -6,7 +6,54 @@ API_ENDPOINT = "https://api.cphtrackers.com/v2"
 ATTR_DATA = "data"
 ATTR_DESCRIPTION = "description"
 ATTR_ID = "id"
+BATTERY_SAVE_DELAY = 60
 BRAND = "Copenhagen Trackers"
 CONF_ACCESS_TOKEN = "access_token"
+CONF_DISABLED_GROUPS = "disabled_groups"
+CONF_FORCE_REFRESH_WINDOW = "force_refresh_window"
+CONF_IGNORED_TRACKERS = "ignored_trackers"
+CONF_JITTER_FILTER = "jitter_filter"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_PUSH_UPDATES = "push_updates"
+CONF_RECORD_RESPONSES = "record_responses"
+CONF_REQUEST_BUDGET = "request_budget"
+CONF_STALENESS_BUDGET = "staleness_budget"
+DATA_REGISTRY = "registry"
+DEFAULT_FORCE_REFRESH_WINDOW = 5
+DEFAULT_JITTER_FILTER = True
+DEFAULT_PUSH_UPDATES = False
+DEFAULT_RECORD_RESPONSES = False
+DEFAULT_REQUEST_BUDGET = 120
 DEFAULT_SCAN_INTERVAL = timedelta(hours=1)
-DOMAIN = "copenhagen_trackers"
\ No newline at end of file
+DEFAULT_STALENESS_BUDGET = timedelta(hours=3)
+DOMAIN = "copenhagen_trackers"
+ENTITY_GROUP_CELLULAR_SIGNAL = "cellular_signal"
+ENTITY_GROUP_FIRMWARE = "firmware"
+ENTITY_GROUP_FORCE_REFRESH = "force_refresh"
+ENTITY_GROUP_GPS_SIGNAL = "gps_signal"
+ENTITY_GROUP_MOVEMENT = "movement"
+ENTITY_GROUP_PROFILE = "profile"
+ENTITY_GROUPS = (
+    ENTITY_GROUP_CELLULAR_SIGNAL,
+    ENTITY_GROUP_FIRMWARE,
+    ENTITY_GROUP_FORCE_REFRESH,
+    ENTITY_GROUP_GPS_SIGNAL,
+    ENTITY_GROUP_MOVEMENT,
+    ENTITY_GROUP_PROFILE,
+)
+EVENT_ZONE_ENTER = "copenhagen_trackers_zone_enter"
+EVENT_ZONE_EXIT = "copenhagen_trackers_zone_exit"
+FORCE_REFRESH_BURST = 3
+FORCE_REFRESH_INTERVAL = 60
+HISTORY_SAVE_DELAY = 60
+MAX_CONCURRENT_REQUESTS = 4
+MIN_SCAN_INTERVAL = timedelta(minutes=1)
+MISSING_DEVICE_SYNCS = 3
+PUSH_SCAN_INTERVAL = timedelta(hours=6)
+REFRESH_COALESCE_WINDOW = 10
+REQUEST_BUDGET_WINDOW = 3600
+SCAN_INTERVAL_JITTER = 0.1
+SNAPSHOT_SAVE_DELAY = 10
+STALE_RETRY_INTERVAL = timedelta(minutes=1)
+STORAGE_VERSION = 1
@@ -1,16 +1,68 @@
 """Coordinator for the Copenhagen Trackers integration."""
 
 from __future__ import annotations
-from datetime import datetime, timedelta, timezone
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
 import logging
+import time
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.components.zone import DOMAIN as ZONE_DOMAIN
+from homeassistant.components.zone.const import ATTR_RADIUS
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE, ATTR_NAME
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    TrackStates,
+    async_call_later,
+    async_track_state_change_filtered,
+)
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_DISABLED_GROUPS,
+    CONF_FORCE_REFRESH_WINDOW,
+    CONF_IGNORED_TRACKERS,
+    CONF_JITTER_FILTER,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_RECORD_RESPONSES,
+    CONF_STALENESS_BUDGET,
+    DEFAULT_FORCE_REFRESH_WINDOW,
+    DEFAULT_JITTER_FILTER,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_RECORD_RESPONSES,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALENESS_BUDGET,
+    DOMAIN,
+    ENTITY_GROUPS,
+    EVENT_ZONE_ENTER,
+    EVENT_ZONE_EXIT,
+    FORCE_REFRESH_BURST,
+    FORCE_REFRESH_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    PUSH_SCAN_INTERVAL,
+    STALE_RETRY_INTERVAL,
+)
+from .battery import BatteryModel
+from .budget import PRIORITY_INTERACTIVE, request_priority
+from .history import LocationHistory
+from .models import TrackerDevice
+from .ratelimit import TokenBucket
+from .recording import ResponseRecorder
+from .registry import CopenhagenTrackersAccount
+from .scheduler import AdaptivePollScheduler
+from .zones import Zone, ZoneIndex
 
-from .api import CopenhagenTrackersAPI
+# Event data
+ATTR_TRACKER_ID = "tracker_id"
+ATTR_ZONE = "zone"
 
 class CopenhagenTrackersDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Copenhagen Trackers data."""
@@ -19,9 +71,12 @@ class CopenhagenTrackersDataUpdateCoordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         logger: logging.Logger,
-        api: CopenhagenTrackersAPI,
+        account: CopenhagenTrackersAccount,
         name: str,
         update_interval: timedelta,
+        force_refresh_window: float = DEFAULT_FORCE_REFRESH_WINDOW,
+        jitter_filter: bool = DEFAULT_JITTER_FILTER,
+        staleness_budget: timedelta = DEFAULT_STALENESS_BUDGET,
     ) -> None:
         """Initialize."""
         super().__init__(
@@ -29,19 +84,573 @@ class CopenhagenTrackersDataUpdateCoordinator(DataUpdateCoordinator):
             logger,
             name=name,
             update_interval=update_interval,
+            # Listeners are only notified if the payload changed
+            always_update=False,
         )
-        self.api = api
+        self.account = account
+        self.api = account.api
+        # Ignore location changes within the accuracy radius of the tracker
+        self.jitter_filter = jitter_filter
+        # How long the last devices are served while the API fails
+        self.staleness_budget = staleness_budget
+        # Polling only reconciles while devices are pushed to a webhook
+        self.push_updates = False
+        self.webhook_id: str | None = None
+        self._stale_retries = 0
+        self._revision = 0
+        self._stale = False
+        self.scheduler = AdaptivePollScheduler(max_interval=update_interval)
+        self._changed_devices: set[str] = set()
+        self._suppressed_writes = 0
         self._last_sync_time = None
+        self._force_refresh_bucket = TokenBucket(
+            FORCE_REFRESH_BURST, FORCE_REFRESH_INTERVAL
+        )
+        self._force_refresh_debouncer = Debouncer(
+            hass,
+            logger,
+            cooldown=force_refresh_window,
+            immediate=False,
+            function=self._async_force_refresh,
+        )
+        self._force_refresh_devices: set[str] = set()
+        self._force_refresh_unsub: CALLBACK_TYPE | None = None
+        self._coalesced_refreshes = 0
+        # Set while a requested refresh runs, which must reach the API
+        self._force_fetch = False
+        # Built lazily, and dropped whenever a zone changes
+        self._zone_index: ZoneIndex | None = None
+        self._zones: dict[str, frozenset[str]] = {}
+        self._zone_changes: set[str] = set()
+        # Devices the platforms have created entities for
+        self._device_ids: set[str] = set()
+        # Entity metadata shared by all entities of a device, keyed by id
+        self.device_metadata: dict[str, Any] = {}
+        self._device_listeners: list[
+            Callable[[set[str], set[str | None]], None]
+        ] = []
+        self._refresh_listeners: list[CALLBACK_TYPE] = []
+        self.ignored_devices: frozenset[str] = frozenset()
+        self.disabled_groups: frozenset[str] = frozenset()
 
-    async def _async_update_data(self):
+    async def _async_update_data(self) -> dict[str, TrackerDevice]:
         """Update data via library."""
+        start = time.perf_counter()
         try:
-            data = await self.api.async_get_devices_with_auth()
-            self._last_sync_time = datetime.now(timezone.utc)
-            self.logger.debug("Data fetched: %s", data)
-            return data
+            revision, devices = await self.account.async_get_devices(
+                force=self._force_fetch
+            )
+            devices = self._filter_devices(devices)
+            if revision == self._revision:
+                # Not modified since the last sync, the snapshot is reused
+                self._changed_devices = set()
+                self.logger.debug("Devices not modified since the last sync")
+            else:
+                self._changed_devices = self._diff_devices(devices)
+                self._revision = revision
+                self.logger.debug(
+                    "%d of %d devices changed",
+                    len(self._changed_devices),
+                    len(devices),
+                )
+            if not self.last_update_success:
+                # Entities went unavailable, so all of them must write state
+                self._changed_devices = set(devices)
+            self._update_zones(devices)
+            self._changed_devices |= self._zone_changes
+            # Listeners must learn that the snapshot was replaced by live data,
+            # and that zones changed or devices are gone even if the devices
+            # did not change
+            self.always_update = (
+                self._stale
+                or bool(self._zone_changes)
+                or self._has_gone_devices(devices)
+            )
+            self.update_interval = self.scheduler.next_interval(
+                devices, dt_util.now()
+            )
+            if self.push_updates:
+                self.update_interval = max(
+                    self.update_interval, PUSH_SCAN_INTERVAL
+                )
+            self._last_sync_time = self.account.last_sync_time
+            self._stale = False
+            self._stale_retries = 0
+            self.logger.debug("Next poll in %s", self.update_interval)
+            return devices
         except Exception as exception:
-            raise UpdateFailed(exception) from exception
+            self.account.metrics.update_failures += 1
+            if (retry_in := self._get_stale_retry_interval()) is None:
+                raise UpdateFailed(exception) from exception
+            self.logger.warning(
+                "Serving devices from %s, retrying in %s: %s",
+                self.last_update_time,
+                retry_in,
+                exception,
+            )
+            self._stale = True
+            self._stale_retries += 1
+            self._changed_devices = set()
+            # Only the entities reporting the staleness need to write state
+            self.always_update = True
+            self.update_interval = retry_in
+            return self.data
+        finally:
+            self.account.metrics.refresh_duration.record(
+                time.perf_counter() - start
+            )
+
+    def _diff_devices(self, devices: dict[str, TrackerDevice]) -> set[str]:
+        """Return the ids of the devices that differ from the current ones.
+
+        Devices missing from the new devices count as changed, so their
+        entities become unavailable until the device returns or is removed.
+        """
+        changed = {
+            device_id
+            for device_id, device in devices.items()
+            if self.devices.get(device_id) != device
+        }
+        return changed | (self.devices.keys() - devices.keys())
+
+    @callback
+    def async_push_devices(self, payload: dict[str, Any]) -> int:
+        """Apply devices pushed in the shape of a `/devices` response.
+
+        Returns the number of devices that changed.
+        """
+        if not (changed := self.account.async_push_devices(payload)):
+            return 0
+        devices = self._filter_devices(self.account.devices)
+        self._changed_devices = self._diff_devices(devices)
+        if not self.last_update_success:
+            self._changed_devices = set(devices)
+        self._revision = self.account.revision
+        self._update_zones(devices)
+        self._changed_devices |= self._zone_changes
+        self.logger.debug("%d pushed devices changed", changed)
+        # Unlike async_set_updated_data, this leaves the next poll alone,
+        # so reconciling is not postponed by every push
+        self.data = devices
+        self.last_update_success = True
+        self.last_exception = None
+        self.async_update_listeners()
+        return changed
+
+    def _get_stale_retry_interval(self) -> timedelta | None:
+        """Return when to retry while serving stale devices, if still allowed.
+
+        Retries back off exponentially from a short interval, but never
+        beyond the end of the staleness budget.
+        """
+        if self.data is None or self.last_update_time is None:
+            return None
+        remaining = self.staleness_budget - self.age
+        if remaining <= timedelta(0):
+            return None
+        return max(
+            min(
+                STALE_RETRY_INTERVAL * 2 ** self._stale_retries,
+                self.scheduler.max_interval,
+                remaining,
+            ),
+            STALE_RETRY_INTERVAL,
+        )
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh the data, then call back the listeners of every refresh."""
+        await super()._async_refresh(*args, **kwargs)
+        for listener in list(self._refresh_listeners):
+            listener()
+
+    @callback
+    def async_add_refresh_listener(
+        self, listener: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Call back after every refresh, even if the devices did not change.
+
+        Regular listeners are only updated when the devices change, while
+        the metrics and sync time change with every request.
+        """
+        self._refresh_listeners.append(listener)
+
+        @callback
+        def _async_remove_listener() -> None:
+            self._refresh_listeners.remove(listener)
+
+        return _async_remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing the fan-out."""
+        start = time.perf_counter()
+        self._async_update_device_ids()
+        super().async_update_listeners()
+        self.account.metrics.fan_out_time.record(time.perf_counter() - start)
+
+    @callback
+    def async_add_devices_listener(
+        self, add_devices: Callable[[set[str], set[str | None]], None]
+    ) -> CALLBACK_TYPE:
+        """Call back with devices and entity groups to create entities for.
+
+        The listener is called with the current devices right away, with
+        new devices after a refresh, and with all devices once entity
+        groups are enabled. Entities outside any group have group None.
+        """
+        self._device_listeners.append(add_devices)
+        add_devices(set(self._device_ids), self.enabled_groups)
+
+        @callback
+        def _async_remove_listener() -> None:
+            self._device_listeners.remove(add_devices)
+
+        return _async_remove_listener
+
+    def _has_gone_devices(self, devices: dict[str, TrackerDevice]) -> bool:
+        """Return if a device with entities is gone from the account."""
+        return any(
+            self.account.is_gone(device_id)
+            for device_id in self._device_ids - devices.keys()
+        )
+
+    @callback
+    def _async_update_device_ids(self) -> None:
+        """Add entities for new devices and remove the ones of gone devices.
+
+        Devices missing from a sync stay unavailable until the account
+        considers them gone, while ignored devices are removed at once.
+        """
+        devices = self.devices
+        if devices.keys() == self._device_ids:
+            return
+        added = devices.keys() - self._device_ids
+        removed = {
+            device_id
+            for device_id in self._device_ids - devices.keys()
+            if device_id in self.ignored_devices
+            or self.account.is_gone(device_id)
+        }
+        if not added and not removed:
+            return
+        self._device_ids = (self._device_ids | added) - removed
+
+        if added:
+            self.logger.debug("Adding %d devices", len(added))
+            for add_devices in list(self._device_listeners):
+                add_devices(added, self.enabled_groups)
+
+        for device_id in removed:
+            self.device_metadata.pop(device_id, None)
+
+        if removed and self.config_entry is not None:
+            self.logger.debug("Removing %d devices", len(removed))
+            device_registry = dr.async_get(self.hass)
+            for device_id in removed:
+                if device := device_registry.async_get_device(
+                    identifiers={(DOMAIN, device_id)}
+                ):
+                    # Removes the entities of the device as well
+                    device_registry.async_update_device(
+                        device.id,
+                        remove_config_entry_id=self.config_entry.entry_id,
+                    )
+
+    @callback
+    def async_set_options(self, options: Mapping[str, Any]) -> bool:
+        """Apply the options of the config entry.
+
+        Returns if a refresh is needed for the options to take effect.
+        """
+        self.jitter_filter = options.get(
+            CONF_JITTER_FILTER, DEFAULT_JITTER_FILTER
+        )
+        self.staleness_budget = timedelta(
+            minutes=options.get(
+                CONF_STALENESS_BUDGET,
+                DEFAULT_STALENESS_BUDGET.total_seconds() / 60,
+            )
+        )
+        self._force_refresh_debouncer.cooldown = options.get(
+            CONF_FORCE_REFRESH_WINDOW, DEFAULT_FORCE_REFRESH_WINDOW
+        )
+
+        if not options.get(CONF_RECORD_RESPONSES, DEFAULT_RECORD_RESPONSES):
+            self.api.recorder = None
+        elif self.api.recorder is None:
+            self.api.recorder = ResponseRecorder(
+                self.hass,
+                self.hass.config.path(
+                    f"{DOMAIN}.{self.account.account_id}.ndjson.gz"
+                ),
+            )
+
+        refresh = False
+        push_updates = options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES)
+        if push_updates != self.push_updates:
+            self.push_updates = push_updates
+            # Apply the new poll interval right away
+            refresh = True
+
+        min_interval = timedelta(
+            minutes=options.get(
+                CONF_MIN_SCAN_INTERVAL, MIN_SCAN_INTERVAL.total_seconds() / 60
+            )
+        )
+        max_interval = timedelta(
+            minutes=options.get(
+                CONF_MAX_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL.total_seconds() / 60
+            )
+        )
+        if (min_interval, max_interval) != self.scheduler.bounds:
+            self.scheduler.set_bounds(min_interval, max_interval)
+            refresh = True
+
+        ignored_devices = frozenset(options.get(CONF_IGNORED_TRACKERS, ()))
+        if ignored_devices != self.ignored_devices:
+            self.ignored_devices = ignored_devices
+            refresh = True
+
+        disabled_groups = frozenset(options.get(CONF_DISABLED_GROUPS, ()))
+        enabled = self.disabled_groups - disabled_groups
+        disabled = disabled_groups - self.disabled_groups
+        self.disabled_groups = disabled_groups
+        if enabled:
+            for add_devices in list(self._device_listeners):
+                add_devices(set(self._device_ids), set(enabled))
+        if disabled:
+            # Entities of disabled groups remove themselves when notified
+            self.async_update_listeners()
+        return refresh
+
+    def _filter_devices(
+        self, devices: dict[str, TrackerDevice]
+    ) -> dict[str, TrackerDevice]:
+        """Return the devices that are not ignored."""
+        if not self.ignored_devices:
+            return devices
+        return {
+            device_id: device
+            for device_id, device in devices.items()
+            if device_id not in self.ignored_devices
+        }
+
+    @callback
+    def async_track_zones(self) -> CALLBACK_TYPE:
+        """Rebuild the zone index whenever a zone changes."""
+
+        @callback
+        def _async_zone_changed(event: Event) -> None:
+            self._zone_index = None
+
+        # Only state changes of zones reach the callback
+        return async_track_state_change_filtered(
+            self.hass,
+            TrackStates(False, set(), {ZONE_DOMAIN}),
+            _async_zone_changed,
+        ).async_remove
+
+    def _build_zone_index(self) -> ZoneIndex:
+        """Return an index of the zones of Home Assistant."""
+        zones = []
+        for state in self.hass.states.async_all(ZONE_DOMAIN):
+            try:
+                zones.append(
+                    Zone(
+                        state.entity_id,
+                        float(state.attributes[ATTR_LATITUDE]),
+                        float(state.attributes[ATTR_LONGITUDE]),
+                        float(state.attributes[ATTR_RADIUS]),
+                    )
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.logger.debug("Indexed %d zones", len(zones))
+        return ZoneIndex(zones)
+
+    @callback
+    def _update_zones(self, devices: dict[str, TrackerDevice]) -> None:
+        """Update the zones of the devices and fire enter and exit events."""
+        if self._zone_index is None:
+            self._zone_index = self._build_zone_index()
+            device_ids = set(devices)
+        else:
+            # Missing devices count as changed, but have no location
+            device_ids = self._changed_devices & devices.keys()
+
+        for device_id in self._zones.keys() - devices.keys():
+            del self._zones[device_id]
+
+        self._zone_changes = set()
+        for device_id in device_ids:
+            device = devices[device_id]
+            location = device.location
+            if (
+                location is None
+                or location.latitude is None
+                or location.longitude is None
+            ):
+                zones = frozenset()
+            else:
+                zones = self._zone_index.lookup(
+                    location.latitude,
+                    location.longitude,
+                    location.accuracy_meters,
+                )
+            previous = self._zones.get(device_id)
+            self._zones[device_id] = zones
+            if previous is None or previous == zones:
+                # The first lookup only sets a baseline
+                continue
+            self._zone_changes.add(device_id)
+            for event_type, changed_zones in (
+                (EVENT_ZONE_EXIT, previous - zones),
+                (EVENT_ZONE_ENTER, zones - previous),
+            ):
+                for zone in changed_zones:
+                    self.hass.bus.async_fire(
+                        event_type,
+                        {
+                            ATTR_TRACKER_ID: device_id,
+                            ATTR_NAME: device.name,
+                            ATTR_ZONE: zone,
+                        },
+                    )
+
+    async def async_load_snapshot(self) -> bool:
+        """Serve the last saved devices until the first live sync."""
+        if not (snapshot := await self.account.async_load_snapshot()):
+            return False
+        self._revision, devices, self._last_sync_time = snapshot
+        self.data = self._filter_devices(devices)
+        self._changed_devices = set(self.data)
+        self._device_ids = set(self.data)
+        self._stale = True
+        return True
+
+    async def async_request_device_refresh(self, device_id: str) -> None:
+        """Request a refresh of a device from the servers.
+
+        Requests within the refresh window are merged into one, and merged
+        refreshes are rate limited by a token bucket.
+        """
+        if self._force_refresh_devices:
+            self._coalesced_refreshes += 1
+        self._force_refresh_devices.add(device_id)
+        await self._force_refresh_debouncer.async_call()
+
+    async def _async_force_refresh(self) -> None:
+        """Run a requested refresh, or postpone it until the rate allows."""
+        if self._force_refresh_unsub:
+            return
+        if not self._force_refresh_bucket.try_acquire():
+            self._force_refresh_unsub = async_call_later(
+                self.hass,
+                self._force_refresh_bucket.time_until_available(),
+                self._async_postponed_force_refresh,
+            )
+            return
+
+        # The API has no per-device endpoint, so one sync serves all devices
+        self.logger.debug(
+            "Refreshing on request for %s", ", ".join(self._force_refresh_devices)
+        )
+        self._force_refresh_devices.clear()
+        priority = request_priority.set(PRIORITY_INTERACTIVE)
+        self._force_fetch = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._force_fetch = False
+            request_priority.reset(priority)
+
+    async def _async_postponed_force_refresh(self, _now: datetime) -> None:
+        """Run a refresh postponed by the rate limit."""
+        self._force_refresh_unsub = None
+        await self._async_force_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending refreshes."""
+        await super().async_shutdown()
+        self._force_refresh_debouncer.async_shutdown()
+        if self._force_refresh_unsub:
+            self._force_refresh_unsub()
+            self._force_refresh_unsub = None
+
+    @property
+    def coalesced_refreshes(self) -> int:
+        """Return the number of refresh requests merged into another one."""
+        return self._coalesced_refreshes
+
+    @property
+    def devices(self) -> dict[str, TrackerDevice]:
+        """Return the devices of the last successful sync, keyed by id."""
+        return self.data or {}
+
+    def get_device(self, device_id: str) -> TrackerDevice | None:
+        """Return a single device, if it is still present."""
+        return self.devices.get(device_id)
+
+    def get_battery(self, device_id: str) -> BatteryModel | None:
+        """Return the battery model of a device."""
+        return self.account.batteries.get(device_id)
+
+    def get_history(self, device_id: str) -> LocationHistory | None:
+        """Return the location history of a device."""
+        return self.account.histories.get(device_id)
+
+    def get_zones(self, device_id: str) -> frozenset[str]:
+        """Return the zones a device is in."""
+        return self._zones.get(device_id, frozenset())
+
+    def zones_changed(self, device_id: str) -> bool:
+        """Return if the zones of a device changed in the last update."""
+        return device_id in self._zone_changes
+
+    def device_changed(self, device_id: str) -> bool:
+        """Return if the device changed in the last successful sync."""
+        return device_id in self._changed_devices
+
+    def record_suppressed_write(self) -> None:
+        """Count a state write skipped because the device was unchanged."""
+        self._suppressed_writes += 1
+
+    @property
+    def suppressed_writes(self) -> int:
+        """Return the number of state writes skipped for unchanged devices."""
+        return self._suppressed_writes
+
+    @property
+    def is_stale(self) -> bool:
+        """Return if the devices predate a failed or pending sync."""
+        return self._stale
+
+    @property
+    def enabled_groups(self) -> set[str | None]:
+        """Return the entity groups to create entities for."""
+        return {None, *ENTITY_GROUPS} - self.disabled_groups
+
+    @property
+    def last_update_time(self) -> datetime | None:
+        """Return when the devices were last known to be current.
+
+        Pushed devices are as current as a sync, so while pushes arrive the
+        staleness budget only runs out if they stop as well.
+        """
+        if self.push_updates and (
+            pushed := self.account.last_push_time
+        ) is not None:
+            if self._last_sync_time is None:
+                return pushed
+            return max(self._last_sync_time, pushed)
+        return self._last_sync_time
+
+    @property
+    def age(self) -> timedelta:
+        """Return the time since the devices were last known to be current."""
+        if (last_update_time := self.last_update_time) is None:
+            return timedelta(0)
+        return dt_util.utcnow() - last_update_time
 
     @property
     def last_sync_time(self) -> datetime.datetime:
@@ -1,22 +1,19 @@
 """Device tracker platform for Copenhagen Trackers integration."""
 
 from homeassistant.components.device_tracker import SourceType, TrackerEntity
+from homeassistant.core import callback
 
-from .const import (
-    DOMAIN,
-    ATTR_DATA,
-    ATTR_ID
+from .const import DOMAIN
+from .entity import (
+    CopenhagenTrackersEntity,
+    CopenhagenTrackersEntityDescription,
 )
-from .entity import CopenhagenTrackersEntity
+from .geo import haversine_distance
+from .models import DEFAULT_ACCURACY, TrackerLocation
 
-# API response keys
-ATTR_ACCURACY = "acc"
-ATTR_CITY = "city"
-ATTR_COUNTRY = "country"
-ATTR_DETAILS = "details"
-ATTR_LATITUDE = "lat"
-ATTR_LONGITUDE = "lon"
-ATTR_ROAD = "road"
+# State attributes
+ATTR_ABSORBED_UPDATES = "absorbed_updates"
+ATTR_ZONES = "zones"
 
 # Entities
 SUFFIX_LOCATION = "location"
@@ -26,31 +23,76 @@ async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Copenhagen Trackers device tracker based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities = []
-    for device in coordinator.data[ATTR_DATA]:
-        entities.append(DeviceTracker(coordinator, device[ATTR_ID]))
+    @callback
+    def _async_add_devices(
+        device_ids: set[str], groups: set[str | None]
+    ) -> None:
+        if DEVICE_TRACKER.group in groups:
+            async_add_entities(
+                DeviceTracker(coordinator, device_id, DEVICE_TRACKER)
+                for device_id in device_ids
+            )
 
-    async_add_entities(entities)
+    entry.async_on_unload(
+        coordinator.async_add_devices_listener(_async_add_devices)
+    )
 
+DEVICE_TRACKER = CopenhagenTrackersEntityDescription(
+    key=SUFFIX_LOCATION,
+    translation_key=TRANSLATION_KEY_LOCATION,
+    icon="mdi:map-marker",
+)
 
 class DeviceTracker(CopenhagenTrackersEntity, TrackerEntity):
-    """Copenhagen Trackers Device Tracker."""
-
-    _attr_icon = "mdi:map-marker"
-    _attr_entity_category = None
-    _attr_translation_key = TRANSLATION_KEY_LOCATION
-    SUFFIX = SUFFIX_LOCATION
-    
-    def get_location_details(self, key: str) -> float | None:
-        """Get a location detail"""
-        if location := self.get_location():
-            if details := location.get(ATTR_DETAILS):
-                if key in details:
-                    try:
-                        return float(details[key])
-                    except (TypeError, ValueError):
-                        pass
-        return None
+    """Copenhagen Trackers Device Tracker.
+
+    The reported location is anchored, and only moves once the tracker
+    reports a location outside the accuracy radius of the anchor. Comparing
+    against the anchor instead of the previous report keeps a parked tracker
+    from drifting or flapping between nearby fixes.
+    """
+
+    _unrecorded_attributes = frozenset({ATTR_ABSORBED_UPDATES})
+
+    def __init__(self, coordinator, device_id, description) -> None:
+        """Initialize the device tracker."""
+        super().__init__(coordinator, device_id, description)
+        self._anchor: TrackerLocation | None = self.location
+        self._absorbed_updates = 0
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the tracker moved beyond its accuracy."""
+        if (
+            self.coordinator.last_update_success
+            and self.coordinator.device_changed(self._device_id)
+            and not self.coordinator.zones_changed(self._device_id)
+            and self._is_jitter(self.location)
+        ):
+            self._absorbed_updates += 1
+            return
+        self._anchor = self.location
+        super()._handle_coordinator_update()
+
+    def _is_jitter(self, location: TrackerLocation | None) -> bool:
+        """Return if a location is within the accuracy radius of the anchor."""
+        anchor = self._anchor
+        if (
+            not self.coordinator.jitter_filter
+            or anchor is None
+            or location is None
+            or None in (
+                anchor.latitude,
+                anchor.longitude,
+                location.latitude,
+                location.longitude,
+            )
+        ):
+            return False
+        distance = haversine_distance(
+            anchor.latitude, anchor.longitude, location.latitude, location.longitude
+        )
+        return distance <= max(anchor.accuracy_meters, location.accuracy_meters)
 
     @property
     def source_type(self):
@@ -60,26 +102,35 @@ class DeviceTracker(CopenhagenTrackersEntity, TrackerEntity):
     @property
     def latitude(self) -> float | None:
         """Return latitude value of the device."""
-        return self.get_location_details(ATTR_LATITUDE)
+        if anchor := self._anchor:
+            return anchor.latitude
+        return None
 
     @property
     def longitude(self) -> float | None:
         """Return longitude value of the device."""
-        return self.get_location_details(ATTR_LONGITUDE)
+        if anchor := self._anchor:
+            return anchor.longitude
+        return None
 
     @property
     def location_accuracy(self) -> float | None:
         """Return the location accuracy of the device."""
-        accuracy = self.get_location_details(ATTR_ACCURACY)
-        return accuracy * 10 if accuracy else 20
+        if anchor := self._anchor:
+            return anchor.accuracy_meters
+        return DEFAULT_ACCURACY
 
     @property
     def location_name(self) -> str | None:
         """Return the location name."""
-        location = self.get_location()
-        location_parts = [
-            part
-            for part in [location.get(ATTR_ROAD), location.get(ATTR_CITY), location.get(ATTR_COUNTRY)]
-            if part
-        ]
-        return ", ".join(location_parts) if location_parts else None
+        if anchor := self._anchor:
+            return anchor.name
+        return None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            ATTR_ABSORBED_UPDATES: self._absorbed_updates,
+            ATTR_ZONES: sorted(self.coordinator.get_zones(self._device_id)),
+        }
@@ -0,0 +1,51 @@
+"""Diagnostics support for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCESS_TOKEN, DOMAIN
+
+TO_REDACT = {
+    CONF_ACCESS_TOKEN,
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    CONF_WEBHOOK_ID,
+    "title",
+    "unique_id",
+}
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    account = coordinator.account
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "last_sync_time": coordinator.last_sync_time,
+            "stale": coordinator.is_stale,
+            "push_updates": coordinator.webhook_id is not None,
+            "devices": len(coordinator.devices),
+            "suppressed_writes": coordinator.suppressed_writes,
+            "coalesced_refreshes": coordinator.coalesced_refreshes,
+        },
+        "account": {
+            "entries": len(account.entry_ids),
+            "circuit_breaker": coordinator.api.circuit_state,
+            "metrics": account.metrics.as_dict(),
+        },
+        "request_budget": {
+            "limit": account.budget.limit,
+            "remaining": account.budget.remaining,
+            "queue_depth": account.budget.queue_depth,
+            "deferred": account.budget.deferred,
+        },
+    }
@@ -1,35 +1,86 @@
 """Entity base for Copenhagen Trackers integration."""
 
 from __future__ import annotations
-from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
 
-from homeassistant.helpers.entity import generate_entity_id
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity import EntityCategory, EntityDescription
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util, slugify
 
 from .const import (
     BRAND,
     DOMAIN,
-    ATTR_DATA,
-    ATTR_ID
 )
 from .coordinator import CopenhagenTrackersDataUpdateCoordinator
-    
-class CopenhagenTrackersEntity(CoordinatorEntity):
-    """Defines a base Copenhagen Trackers entity."""
+from .history import LocationHistory
+from .models import TrackerDevice, TrackerLocation
+
+DEVICE_TYPE_MAP = {
+    1: "Cobblestone",
+    5: "Gemstone"
+}
+
+# Entity IDs
+PREFIX = "cphtrackers"
+
+@dataclass(frozen=True, kw_only=True)
+class CopenhagenTrackersEntityDescription(EntityDescription):
+    """Describes a Copenhagen Trackers entity.
+
+    The key is the suffix of the entity id and unique id.
+    """
+
+    # Entity group that can be disabled in the options, if any
+    group: str | None = None
+    # Entities that do not depend on the device payload, and write their
+    # state after every refresh instead of when the device changed
+    update_on_every_refresh: bool = False
+
+@dataclass(frozen=True, slots=True)
+class DeviceMetadata:
+    """Metadata shared by all entities of a device."""
+
+    entity_id_base: str
+    device_info: DeviceInfo
+
+    @classmethod
+    def from_device(cls, device: TrackerDevice) -> DeviceMetadata:
+        """Create the metadata of a device."""
+        model = DEVICE_TYPE_MAP.get(
+            device.device_type, f"Unknown model ({device.device_type})"
+        )
+        return cls(
+            # The entity registry makes the final entity id unique
+            entity_id_base=f"{DOMAIN}.{PREFIX}_{slugify(device.name)}",
+            device_info=DeviceInfo(
+                identifiers={(DOMAIN, device.id)},
+                name=f"{device.name} Tracker",
+                manufacturer=BRAND,
+                model=model,
+                sw_version=device.firmware_version,
+            ),
+        )
 
-    DEVICE_TYPE_MAP = {
-        1: "Cobblestone",
-        5: "Gemstone"
-    }
+@callback
+def async_get_device_metadata(
+    coordinator: CopenhagenTrackersDataUpdateCoordinator, device_id: str
+) -> DeviceMetadata:
+    """Return the metadata of a device, creating it once for all entities."""
+    if (metadata := coordinator.device_metadata.get(device_id)) is None:
+        metadata = coordinator.device_metadata[device_id] = (
+            DeviceMetadata.from_device(coordinator.get_device(device_id))
+        )
+    return metadata
 
-    # API response keys
-    DEVICE_TYPE = "device_type"
-    FIRMWARE_VERSION = "firmware_version"
-    LOCATION = "location"
-    NAME = "name"
+class CopenhagenTrackersEntity(CoordinatorEntity):
+    """Defines a base Copenhagen Trackers entity."""
 
-    # Entity IDs
-    PREFIX = "cphtrackers"
+    entity_description: CopenhagenTrackersEntityDescription
 
     _attr_has_entity_name = True
 
@@ -37,47 +88,147 @@ class CopenhagenTrackersEntity(CoordinatorEntity):
         self,
         coordinator: CopenhagenTrackersDataUpdateCoordinator,
         device_id: str,
+        description: CopenhagenTrackersEntityDescription,
     ) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
+        self.entity_description = description
         self._device_id = device_id
 
-        self.entity_id = generate_entity_id(
-            f"{DOMAIN}.{self.PREFIX}_" + "{}_" + self.SUFFIX,
-            self.device_data[self.NAME],
-            hass=coordinator.hass)
-        
-        device_type = self.device_data[self.DEVICE_TYPE]
-        model = self.DEVICE_TYPE_MAP.get(device_type, f"Unknown model ({device_type})")
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, device_id)},
-            "name": f"{self.device_data[self.NAME]} Tracker",
-            "manufacturer": BRAND,
-            "model": model,
-            "sw_version": self.device_data[self.FIRMWARE_VERSION],
-        }
-
-    def get_location(self) -> dict | None:
-        """Get a location detail"""
-        if device_data := self.device_data:
-            if location := device_data.get(self.LOCATION):
-                return location
-        return None
-        
+        metadata = async_get_device_metadata(coordinator, device_id)
+        self.entity_id = f"{metadata.entity_id_base}_{description.key}"
+        self._attr_unique_id = f"{PREFIX}_{device_id}_{description.key}"
+        self._attr_device_info = metadata.device_info
+
     @property
-    @abstractmethod
-    def SUFFIX(self):
-        """Return the suffix of the entity."""
-    
+    def location(self) -> TrackerLocation | None:
+        """Return the last reported location of the device."""
+        if device := self.device:
+            return device.location
+        return None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to every refresh, if the entity writes state on each."""
+        await super().async_added_to_hass()
+        if self.entity_description.update_on_every_refresh:
+            self.async_on_remove(
+                self.coordinator.async_add_refresh_listener(
+                    self.async_write_ha_state
+                )
+            )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the device changed since the last sync."""
+        if self.entity_description.group in self.coordinator.disabled_groups:
+            er.async_get(self.hass).async_remove(self.entity_id)
+            return
+        if self.entity_description.update_on_every_refresh:
+            # Written by the refresh listener
+            return
+        if (
+            self.coordinator.last_update_success
+            and not self.coordinator.device_changed(self._device_id)
+        ):
+            self.coordinator.record_suppressed_write()
+            return
+        super()._handle_coordinator_update()
+
     @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.PREFIX}_{self._device_id}_{self.SUFFIX}"
+    def available(self) -> bool:
+        """Return if the device is still reported by the API."""
+        return super().available and self.device is not None
 
     @property
-    def device_data(self):
+    def device(self) -> TrackerDevice | None:
         """Return device data."""
-        return next(
-            device for device in self.coordinator.data[ATTR_DATA]
-            if device[ATTR_ID] == self._device_id
-        )
\ No newline at end of file
+        return self.coordinator.get_device(self._device_id)
+
+class CopenhagenTrackersHistoryEntity(CopenhagenTrackersEntity):
+    """Defines an entity reading the location history of a device.
+
+    A parked tracker may stop reporting, so the state is written again once
+    its trip expires instead of waiting for a stationary location.
+    """
+
+    _expiry_unsub: CALLBACK_TYPE | None = None
+
+    @property
+    def history(self) -> LocationHistory | None:
+        """Return the location history of the device."""
+        return self.coordinator.get_history(self._device_id)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, and schedule a write for when the trip expires."""
+        super().async_write_ha_state()
+        if self._expiry_unsub is not None:
+            self._expiry_unsub()
+            self._expiry_unsub = None
+        if (history := self.history) is None or (
+            expires_at := history.movement_expires_at
+        ) is None:
+            return
+        self._expiry_unsub = async_track_point_in_utc_time(
+            self.hass,
+            self._async_expire,
+            dt_util.utc_from_timestamp(expires_at),
+        )
+
+    @callback
+    def _async_expire(self, now: datetime) -> None:
+        """End the trip of the device and write the state."""
+        self._expiry_unsub = None
+        if history := self.history:
+            history.expire(now.timestamp())
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the scheduled write."""
+        await super().async_will_remove_from_hass()
+        if self._expiry_unsub is not None:
+            self._expiry_unsub()
+            self._expiry_unsub = None
+
+class CopenhagenTrackersHubEntity(CoordinatorEntity):
+    """Defines an entity of the hub device of an account."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: CopenhagenTrackersDataUpdateCoordinator,
+        description: EntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        account_id = coordinator.account.account_id
+        self.entity_id = f"{DOMAIN}.{PREFIX}_account_{description.key}"
+        self._attr_unique_id = f"{PREFIX}_{account_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, account_id)},
+            name=f"{BRAND} Account",
+            manufacturer=BRAND,
+            model="Account",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Write state after every refresh, as the metrics change with each."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_refresh_listener(
+                self.async_write_ha_state
+            )
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Do nothing, as the refresh listener writes the state."""
+
+    @property
+    def available(self) -> bool:
+        """Return True, as the metrics matter most while the API fails."""
+        return True
@@ -0,0 +1,136 @@
+"""Track export for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
+import os
+from typing import IO
+from xml.sax.saxutils import escape
+
+from .history import LocationHistory
+
+FORMAT_GEOJSON = "geojson"
+FORMAT_GPX = "gpx"
+FORMATS = (FORMAT_GPX, FORMAT_GEOJSON)
+
+@dataclass(frozen=True, slots=True)
+class Track:
+    """Locations of one tracker to export."""
+
+    tracker_id: str
+    name: str
+    # A copy, as the history of the tracker changes while exporting
+    history: LocationHistory
+
+def _isoformat(timestamp: float) -> str:
+    """Return a POSIX timestamp in ISO 8601 format."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+def count_points(
+    track: Track, start: float | None, end: float | None, limit: int
+) -> int:
+    """Return the points of a track within a time range, up to a limit."""
+    points = 0
+    for _ in track.history.between(start, end):
+        points += 1
+        if points >= limit:
+            break
+    return points
+
+def _write_gpx(
+    file: IO[str],
+    tracks: Iterable[Track],
+    start: float | None,
+    end: float | None,
+) -> int:
+    """Write the tracks as GPX, returning the number of points."""
+    points = 0
+    file.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="Copenhagen Trackers" '
+        'xmlns="http://www.topografix.com/GPX/1/1">\n'
+    )
+    for track in tracks:
+        file.write(f"<trk><name>{escape(track.name)}</name><trkseg>\n")
+        for timestamp, latitude, longitude, _ in track.history.between(
+            start, end
+        ):
+            file.write(
+                f'<trkpt lat="{latitude}" lon="{longitude}">'
+                f"<time>{_isoformat(timestamp)}</time></trkpt>\n"
+            )
+            points += 1
+        file.write("</trkseg></trk>\n")
+    file.write("</gpx>\n")
+    return points
+
+def _write_geojson(
+    file: IO[str],
+    tracks: Iterable[Track],
+    start: float | None,
+    end: float | None,
+) -> int:
+    """Write the tracks as GeoJSON, returning the number of points.
+
+    Each tracker is a LineString, with the time and accuracy of each point
+    in the `coordinateProperties` of the feature.
+    """
+    points = 0
+    file.write('{"type":"FeatureCollection","features":[\n')
+    for index, track in enumerate(tracks):
+        if index:
+            file.write(",\n")
+        properties = json.dumps(
+            {"tracker_id": track.tracker_id, "name": track.name}
+        )
+        file.write(
+            '{"type":"Feature","properties":'
+            f'{properties[:-1]},"coordinateProperties":{{"times":['
+        )
+        # One pass per column keeps the memory bounded
+        for offset, (timestamp, *_) in enumerate(
+            track.history.between(start, end)
+        ):
+            file.write(f'{"," if offset else ""}"{_isoformat(timestamp)}"')
+        file.write('],"accuracies":[')
+        for offset, (*_, accuracy) in enumerate(
+            track.history.between(start, end)
+        ):
+            file.write(f'{"," if offset else ""}{accuracy}')
+        file.write(']}},"geometry":{"type":"LineString","coordinates":[')
+        for offset, (_, latitude, longitude, _) in enumerate(
+            track.history.between(start, end)
+        ):
+            file.write(f'{"," if offset else ""}[{longitude},{latitude}]')
+            points += 1
+        file.write("]}}")
+    file.write("\n]}\n")
+    return points
+
+def export_tracks(
+    path: str,
+    file_format: str,
+    tracks: Iterable[Track],
+    start: float | None = None,
+    end: float | None = None,
+) -> int:
+    """Write the locations of trackers within a time range to a file.
+
+    The file is streamed point by point, and only replaces an existing file
+    once complete. The directory of the file is created if needed. Returns
+    the number of points written.
+    """
+    write = _write_gpx if file_format == FORMAT_GPX else _write_geojson
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "w", encoding="utf-8") as file:
+            points = write(file, tracks, start, end)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return points
@@ -0,0 +1,29 @@
+"""Geodesic helpers for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from math import asin, atan2, cos, degrees, radians, sin, sqrt
+
+EARTH_RADIUS_M = 6371008.8
+
+def haversine_distance(
+    lat1: float, lon1: float, lat2: float, lon2: float
+) -> float:
+    """Return the great-circle distance between two points in meters."""
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    a = (
+        sin((phi2 - phi1) / 2) ** 2
+        + cos(phi1) * cos(phi2) * sin(radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * asin(min(1.0, sqrt(a)))
+
+def initial_bearing(
+    lat1: float, lon1: float, lat2: float, lon2: float
+) -> float:
+    """Return the initial bearing from the first to the second point in degrees."""
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    delta_lambda = radians(lon2 - lon1)
+    x = sin(delta_lambda) * cos(phi2)
+    y = cos(phi1) * sin(phi2) - sin(phi1) * cos(phi2) * cos(delta_lambda)
+    return (degrees(atan2(x, y)) + 360) % 360
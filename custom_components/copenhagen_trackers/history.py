@@ -0,0 +1,283 @@
+"""Location history for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from array import array
+import base64
+from collections.abc import Iterator
+from datetime import date
+from typing import Any
+
+from .geo import haversine_distance, initial_bearing
+
+# Tuning
+HISTORY_CAPACITY = 1440
+TRIP_END_IDLE = 300
+
+# Storage keys
+STORAGE_ACCURACIES = "accuracies"
+STORAGE_DAY = "day"
+STORAGE_DISTANCE_TODAY = "distance_today"
+STORAGE_HEADING = "heading"
+STORAGE_LATITUDES = "latitudes"
+STORAGE_LAST_MOVED_AT = "last_moved_at"
+STORAGE_LONGITUDES = "longitudes"
+STORAGE_SPEED = "speed"
+STORAGE_TIMESTAMPS = "timestamps"
+STORAGE_TRIP_DISTANCE = "trip_distance"
+STORAGE_TRIP_STARTED_AT = "trip_started_at"
+
+def _encode(values: array) -> str:
+    """Encode an array compactly for storage."""
+    return base64.b64encode(values.tobytes()).decode()
+
+def _decode(typecode: str, value: str) -> array:
+    """Decode an array encoded by `_encode`."""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(value))
+    return values
+
+class LocationHistory:
+    """Bounded ring buffer of the locations reported by one tracker.
+
+    Locations are kept in typed columns, and the movement statistics are
+    updated incrementally as locations are appended.
+    """
+
+    __slots__ = (
+        "_capacity",
+        "_timestamps",
+        "_latitudes",
+        "_longitudes",
+        "_accuracies",
+        "_start",
+        "speed",
+        "heading",
+        "distance_today",
+        "trip_started_at",
+        "trip_distance",
+        "_day",
+        "_last_moved_at",
+    )
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        """Initialize."""
+        self._capacity = capacity
+        self._timestamps = array("d")
+        self._latitudes = array("d")
+        self._longitudes = array("d")
+        self._accuracies = array("f")
+        # Index of the oldest location once the buffer is full
+        self._start = 0
+        self.speed: float | None = None
+        self.heading: float | None = None
+        self.distance_today = 0.0
+        self.trip_started_at: float | None = None
+        self.trip_distance = 0.0
+        self._day: int | None = None
+        self._last_moved_at: float | None = None
+
+    def __len__(self) -> int:
+        """Return the number of locations."""
+        return len(self._timestamps)
+
+    def get_distance_on(self, day: date) -> float:
+        """Return the distance travelled on a local day in meters."""
+        return self.distance_today if day.toordinal() == self._day else 0.0
+
+    @property
+    def moving(self) -> bool:
+        """Return if the tracker is on a trip."""
+        return self.trip_started_at is not None
+
+    @property
+    def movement_expires_at(self) -> float | None:
+        """Return the POSIX timestamp a trip ends if no movement follows."""
+        if self.trip_started_at is None and not self.speed:
+            return None
+        if self._last_moved_at is None:
+            return None
+        return self._last_moved_at + TRIP_END_IDLE
+
+    def expire(self, now: float) -> bool:
+        """End the trip if the tracker has not moved for a while.
+
+        Trackers may stop reporting once parked, so the trip cannot rely
+        on a stationary location to end. Returns if the trip ended.
+        """
+        expires_at = self.movement_expires_at
+        if expires_at is None or now < expires_at:
+            return False
+        self.speed = 0.0
+        self.trip_started_at = None
+        return True
+
+    def _last_index(self) -> int:
+        """Return the index of the newest location."""
+        return (self._start - 1) % len(self._timestamps)
+
+    def append(
+        self,
+        timestamp: float,
+        latitude: float,
+        longitude: float,
+        accuracy: float,
+        day: date,
+    ) -> bool:
+        """Add a location reported at a POSIX timestamp on a local day."""
+        if self._timestamps:
+            last = self._last_index()
+            if timestamp <= self._timestamps[last]:
+                return False
+            self._update_statistics(
+                timestamp - self._timestamps[last],
+                self._latitudes[last],
+                self._longitudes[last],
+                self._accuracies[last],
+                timestamp,
+                latitude,
+                longitude,
+                accuracy,
+                day.toordinal(),
+            )
+        else:
+            self._day = day.toordinal()
+
+        if len(self._timestamps) < self._capacity:
+            self._timestamps.append(timestamp)
+            self._latitudes.append(latitude)
+            self._longitudes.append(longitude)
+            self._accuracies.append(accuracy)
+        else:
+            self._timestamps[self._start] = timestamp
+            self._latitudes[self._start] = latitude
+            self._longitudes[self._start] = longitude
+            self._accuracies[self._start] = accuracy
+            self._start = (self._start + 1) % self._capacity
+        return True
+
+    def _update_statistics(
+        self,
+        elapsed: float,
+        last_latitude: float,
+        last_longitude: float,
+        last_accuracy: float,
+        timestamp: float,
+        latitude: float,
+        longitude: float,
+        accuracy: float,
+        day: int,
+    ) -> None:
+        """Update the movement statistics with a new location."""
+        if day != self._day:
+            self._day = day
+            self.distance_today = 0.0
+
+        distance = haversine_distance(
+            last_latitude, last_longitude, latitude, longitude
+        )
+        # Movement within the accuracy of both fixes is GPS jitter
+        if distance > max(last_accuracy, accuracy):
+            self.speed = distance / elapsed * 3.6
+            self.heading = initial_bearing(
+                last_latitude, last_longitude, latitude, longitude
+            )
+            self.distance_today += distance
+            if self.trip_started_at is None:
+                self.trip_started_at = timestamp - elapsed
+                self.trip_distance = 0.0
+            self.trip_distance += distance
+            self._last_moved_at = timestamp
+            return
+
+        self.speed = 0.0
+        if (
+            self.trip_started_at is not None
+            and timestamp - (self._last_moved_at or timestamp) >= TRIP_END_IDLE
+        ):
+            self.trip_started_at = None
+
+    def __iter__(self) -> Iterator[tuple[float, float, float, float]]:
+        """Iterate over the locations from oldest to newest."""
+        size = len(self._timestamps)
+        for offset in range(size):
+            index = (self._start + offset) % size
+            yield (
+                self._timestamps[index],
+                self._latitudes[index],
+                self._longitudes[index],
+                self._accuracies[index],
+            )
+
+    def between(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[tuple[float, float, float, float]]:
+        """Iterate over the locations reported within a range of timestamps."""
+        for location in self:
+            timestamp = location[0]
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp > end:
+                break
+            yield location
+
+    def copy(self) -> LocationHistory:
+        """Return a copy, to read while this history changes."""
+        history = LocationHistory(self._capacity)
+        history._timestamps = self._ordered(self._timestamps)
+        history._latitudes = self._ordered(self._latitudes)
+        history._longitudes = self._ordered(self._longitudes)
+        history._accuracies = self._ordered(self._accuracies)
+        history.speed = self.speed
+        history.heading = self.heading
+        history.distance_today = self.distance_today
+        history.trip_started_at = self.trip_started_at
+        history.trip_distance = self.trip_distance
+        history._day = self._day
+        history._last_moved_at = self._last_moved_at
+        return history
+
+    def _ordered(self, values: array) -> array:
+        """Return a column from the oldest to the newest location."""
+        return values[self._start:] + values[:self._start]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the history in a compact form for storage."""
+        return {
+            STORAGE_TIMESTAMPS: _encode(self._ordered(self._timestamps)),
+            STORAGE_LATITUDES: _encode(self._ordered(self._latitudes)),
+            STORAGE_LONGITUDES: _encode(self._ordered(self._longitudes)),
+            STORAGE_ACCURACIES: _encode(self._ordered(self._accuracies)),
+            STORAGE_SPEED: self.speed,
+            STORAGE_HEADING: self.heading,
+            STORAGE_DISTANCE_TODAY: self.distance_today,
+            STORAGE_TRIP_STARTED_AT: self.trip_started_at,
+            STORAGE_TRIP_DISTANCE: self.trip_distance,
+            STORAGE_DAY: self._day,
+            STORAGE_LAST_MOVED_AT: self._last_moved_at,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], capacity: int = HISTORY_CAPACITY
+    ) -> LocationHistory:
+        """Restore a history saved by `to_dict`."""
+        history = cls(capacity)
+        history._timestamps = _decode("d", data[STORAGE_TIMESTAMPS])[-capacity:]
+        history._latitudes = _decode("d", data[STORAGE_LATITUDES])[-capacity:]
+        history._longitudes = _decode("d", data[STORAGE_LONGITUDES])[-capacity:]
+        history._accuracies = _decode("f", data[STORAGE_ACCURACIES])[-capacity:]
+        if not (
+            len(history._timestamps)
+            == len(history._latitudes)
+            == len(history._longitudes)
+            == len(history._accuracies)
+        ):
+            raise ValueError("Location history columns differ in length")
+        history.speed = data[STORAGE_SPEED]
+        history.heading = data[STORAGE_HEADING]
+        history.distance_today = data[STORAGE_DISTANCE_TODAY]
+        history.trip_started_at = data[STORAGE_TRIP_STARTED_AT]
+        history.trip_distance = data[STORAGE_TRIP_DISTANCE]
+        history._day = data[STORAGE_DAY]
+        history._last_moved_at = data[STORAGE_LAST_MOVED_AT]
+        return history
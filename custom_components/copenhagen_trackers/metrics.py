@@ -0,0 +1,120 @@
+"""Runtime metrics for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from array import array
+from math import ceil, log
+from typing import Any
+
+# Histogram buckets grow by this ratio from the smallest one, in seconds
+BUCKET_MIN = 0.0001
+BUCKET_RATIO = 1.25
+BUCKET_COUNT = 64
+
+class Histogram:
+    """Histogram of durations in exponentially growing buckets.
+
+    Recording is constant time and the memory is fixed, at the cost of
+    percentiles being accurate to within one bucket.
+    """
+
+    __slots__ = ("_counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._counts = array("L", bytes(BUCKET_COUNT * array("L").itemsize))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Record a duration in seconds."""
+        if value <= BUCKET_MIN:
+            index = 0
+        else:
+            index = min(
+                ceil(log(value / BUCKET_MIN, BUCKET_RATIO)), BUCKET_COUNT - 1
+            )
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the upper bound of the bucket holding a percentile."""
+        if not self.count:
+            return None
+        rank = self.count * percentile / 100
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(BUCKET_MIN * BUCKET_RATIO ** index, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary in milliseconds."""
+
+        def _ms(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean": _ms(self.mean),
+            "p50": _ms(self.percentile(50)),
+            "p90": _ms(self.percentile(90)),
+            "p99": _ms(self.percentile(99)),
+            "max": _ms(self.max if self.count else None),
+        }
+
+class Metrics:
+    """Counters and histograms of one account."""
+
+    __slots__ = (
+        "logins",
+        "requests",
+        "request_failures",
+        "update_failures",
+        "payload_bytes",
+        "payload_bytes_total",
+        "request_latency",
+        "decode_time",
+        "parse_time",
+        "refresh_duration",
+        "fan_out_time",
+    )
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.logins = 0
+        self.requests = 0
+        self.request_failures = 0
+        self.update_failures = 0
+        self.payload_bytes: int | None = None
+        self.payload_bytes_total = 0
+        self.request_latency = Histogram()
+        self.decode_time = Histogram()
+        self.parse_time = Histogram()
+        self.refresh_duration = Histogram()
+        self.fan_out_time = Histogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics."""
+        return {
+            "logins": self.logins,
+            "requests": self.requests,
+            "request_failures": self.request_failures,
+            "update_failures": self.update_failures,
+            "payload_bytes": self.payload_bytes,
+            "payload_bytes_total": self.payload_bytes_total,
+            "request_latency_ms": self.request_latency.as_dict(),
+            "decode_time_ms": self.decode_time.as_dict(),
+            "parse_time_ms": self.parse_time.as_dict(),
+            "refresh_duration_ms": self.refresh_duration.as_dict(),
+            "fan_out_time_ms": self.fan_out_time.as_dict(),
+        }
@@ -0,0 +1,260 @@
+"""Data models for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+import sys
+from typing import Any
+
+from .const import (
+    ATTR_DATA,
+    ATTR_DESCRIPTION,
+    ATTR_ID,
+)
+
+# API response keys
+ATTR_ACCURACY = "acc"
+ATTR_BATTERY_PERCENTAGE = "battery_percentage"
+ATTR_CAN_UPDATE = "can_update"
+ATTR_CITY = "city"
+ATTR_COUNTRY = "country"
+ATTR_DETAILS = "details"
+ATTR_DEVICE_INFO = "device_info"
+ATTR_DEVICE_TYPE = "device_type"
+ATTR_FIRMWARE_VERSION = "firmware_version"
+ATTR_FIX_TIME = "fixt"
+ATTR_LATITUDE = "lat"
+ATTR_LOCATION = "location"
+ATTR_LONGITUDE = "lon"
+ATTR_NAME = "name"
+ATTR_NUM_SATS = "num_sats"
+ATTR_PROFILE = "profile"
+ATTR_ROAD = "road"
+ATTR_SHOULD_UPDATE = "should_update"
+ATTR_SIGNAL = "signal"
+ATTR_SIG_STRENGTH = "sig_strength"
+ATTR_TRANS = "trans"
+ATTR_TIME_TO_FIX = "ttf"
+ATTR_UPDATED_AT = "updated_at"
+
+# Accuracy radius in meters, if the tracker does not report one
+DEFAULT_ACCURACY = 20
+
+def _intern(value: Any) -> Any:
+    """Intern a string that is likely repeated across devices.
+
+    Interned strings are never freed, so only values with few distinct
+    values across a fleet and over time may be interned.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _to_float(value: Any) -> float | None:
+    """Convert an API value to a float."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value: Any) -> int | None:
+    """Convert an API value to an int, treating falsy values as missing."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_datetime(value: Any) -> datetime | None:
+    """Convert an ISO 8601 API timestamp to a datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+def _to_dbm(value: Any) -> int | None:
+    """Convert a cellular signal value to dBm."""
+    if (signal := _to_int(value)) is None:
+        return None
+    return -113 + (2 * signal)
+
+def _without_none(data: dict[str, Any]) -> dict[str, Any]:
+    """Return an API object without the missing values."""
+    return {key: value for key, value in data.items() if value is not None}
+
+@dataclass(frozen=True, slots=True)
+class TrackerProfile:
+    """Profile assigned to a tracker."""
+
+    name: str | None
+    description: str | None
+    updated_at: str | None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TrackerProfile:
+        """Create a profile from an API response."""
+        return cls(
+            name=_intern(data.get(ATTR_NAME)),
+            description=_intern(data.get(ATTR_DESCRIPTION)),
+            updated_at=data.get(ATTR_UPDATED_AT),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the profile in the shape of an API response."""
+        return _without_none(
+            {
+                ATTR_NAME: self.name,
+                ATTR_DESCRIPTION: self.description,
+                ATTR_UPDATED_AT: self.updated_at,
+            }
+        )
+
+@dataclass(frozen=True, slots=True)
+class TrackerLocation:
+    """Last reported location of a tracker."""
+
+    latitude: float | None
+    longitude: float | None
+    accuracy: float | None
+    road: str | None
+    city: str | None
+    country: str | None
+    gps_signal: int | None
+    cellular_signal: int | None
+    time_to_fix: int | None
+    fix_time: int | None
+    satellites: int | None
+
+    @property
+    def accuracy_meters(self) -> float:
+        """Return the accuracy radius in meters."""
+        return self.accuracy * 10 if self.accuracy else DEFAULT_ACCURACY
+
+    @property
+    def name(self) -> str | None:
+        """Return the address of the location."""
+        parts = [part for part in (self.road, self.city, self.country) if part]
+        return ", ".join(parts) or None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TrackerLocation:
+        """Create a location from an API response."""
+        details = data.get(ATTR_DETAILS) or {}
+        device_info = data.get(ATTR_DEVICE_INFO) or {}
+        return cls(
+            latitude=_to_float(details.get(ATTR_LATITUDE)),
+            longitude=_to_float(details.get(ATTR_LONGITUDE)),
+            accuracy=_to_float(details.get(ATTR_ACCURACY)),
+            # Roads change as trackers move, so only the others are interned
+            road=data.get(ATTR_ROAD),
+            city=_intern(data.get(ATTR_CITY)),
+            country=_intern(data.get(ATTR_COUNTRY)),
+            gps_signal=data.get(ATTR_SIGNAL),
+            # Cobblestone reports sig_strength, Gemstone reports trans
+            cellular_signal=_to_dbm(
+                device_info.get(ATTR_SIG_STRENGTH) or device_info.get(ATTR_TRANS)
+            ),
+            time_to_fix=_to_int(device_info.get(ATTR_TIME_TO_FIX)),
+            fix_time=_to_int(device_info.get(ATTR_FIX_TIME)),
+            satellites=_to_int(device_info.get(ATTR_NUM_SATS)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the location in the shape of an API response."""
+        location = _without_none(
+            {
+                ATTR_ROAD: self.road,
+                ATTR_CITY: self.city,
+                ATTR_COUNTRY: self.country,
+                ATTR_SIGNAL: self.gps_signal,
+            }
+        )
+        location[ATTR_DETAILS] = _without_none(
+            {
+                ATTR_LATITUDE: self.latitude,
+                ATTR_LONGITUDE: self.longitude,
+                ATTR_ACCURACY: self.accuracy,
+            }
+        )
+        location[ATTR_DEVICE_INFO] = _without_none(
+            {
+                ATTR_SIG_STRENGTH: (
+                    None
+                    if self.cellular_signal is None
+                    else (self.cellular_signal + 113) // 2
+                ),
+                ATTR_TIME_TO_FIX: self.time_to_fix,
+                ATTR_FIX_TIME: self.fix_time,
+                ATTR_NUM_SATS: self.satellites,
+            }
+        )
+        return location
+
+@dataclass(frozen=True, slots=True)
+class TrackerDevice:
+    """A tracker as reported by the `/devices` endpoint."""
+
+    id: str
+    name: str
+    device_type: int | None
+    firmware_version: str | None
+    battery_percentage: int | None
+    updated_at: datetime | None
+    can_update: bool
+    should_update: bool
+    profile: TrackerProfile | None
+    location: TrackerLocation | None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TrackerDevice:
+        """Create a device from an API response."""
+        profile = data.get(ATTR_PROFILE)
+        location = data.get(ATTR_LOCATION)
+        return cls(
+            id=data[ATTR_ID],
+            name=data[ATTR_NAME],
+            device_type=data.get(ATTR_DEVICE_TYPE),
+            firmware_version=_intern(data.get(ATTR_FIRMWARE_VERSION)),
+            battery_percentage=data.get(ATTR_BATTERY_PERCENTAGE),
+            updated_at=_to_datetime(data.get(ATTR_UPDATED_AT)),
+            can_update=bool(data.get(ATTR_CAN_UPDATE, False)),
+            should_update=bool(data.get(ATTR_SHOULD_UPDATE, False)),
+            profile=TrackerProfile.from_dict(profile) if profile else None,
+            location=TrackerLocation.from_dict(location) if location else None,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the device in the shape of a `/devices` entry.
+
+        The entry parses back into an equal device, so the snapshot can be
+        saved from the devices instead of keeping the response around.
+        """
+        device = _without_none(
+            {
+                ATTR_ID: self.id,
+                ATTR_NAME: self.name,
+                ATTR_DEVICE_TYPE: self.device_type,
+                ATTR_FIRMWARE_VERSION: self.firmware_version,
+                ATTR_BATTERY_PERCENTAGE: self.battery_percentage,
+                ATTR_UPDATED_AT: (
+                    None
+                    if self.updated_at is None
+                    else self.updated_at.isoformat()
+                ),
+                ATTR_CAN_UPDATE: self.can_update,
+                ATTR_SHOULD_UPDATE: self.should_update,
+            }
+        )
+        if self.profile is not None:
+            device[ATTR_PROFILE] = self.profile.to_dict()
+        if self.location is not None:
+            device[ATTR_LOCATION] = self.location.to_dict()
+        return device
+
+def parse_devices(payload: dict[str, Any]) -> dict[str, TrackerDevice]:
+    """Parse a `/devices` response into devices keyed by id."""
+    return {
+        device[ATTR_ID]: TrackerDevice.from_dict(device)
+        for device in payload[ATTR_DATA]
+    }
@@ -0,0 +1,42 @@
+"""Rate limiting for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import time
+
+class TokenBucket:
+    """Allow bursts of requests while limiting their long term rate."""
+
+    def __init__(self, capacity: float, refill_interval: float) -> None:
+        """Initialize with one token added every `refill_interval` seconds."""
+        self._capacity = capacity
+        self._refill_interval = refill_interval
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity,
+            self._tokens + (now - self._updated_at) / self._refill_interval,
+        )
+        self._updated_at = now
+
+    @property
+    def tokens(self) -> float:
+        """Return the number of available tokens."""
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def time_until_available(self) -> float:
+        """Return the seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self._tokens) * self._refill_interval)
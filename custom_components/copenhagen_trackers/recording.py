@@ -0,0 +1,213 @@
+"""Recording and replay of API responses for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+import gzip
+import json
+import logging
+import os
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_ACCESS_TOKEN
+from .transport import CircuitBreaker
+
+_LOGGER = logging.getLogger(__name__)
+
+# Size of a recording at which recording stops, in bytes
+MAX_RECORDING_SIZE = 50 * 1024 * 1024
+
+# Record keys
+RECORD_BODY = "body"
+RECORD_ELAPSED = "elapsed"
+RECORD_ETAG = "etag"
+RECORD_LAST_MODIFIED = "last_modified"
+RECORD_STATUS = "status"
+RECORD_TIME = "time"
+
+class ResponseRecorder:
+    """Append `/devices` responses to a gzip compressed NDJSON file.
+
+    Successful responses are recorded with the devices, and not modified
+    responses without a body, never credentials or access tokens.
+    Every write opens a new gzip member, which readers see as one stream.
+    Recording stops once the file reaches `max_size` bytes.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, max_size: int = MAX_RECORDING_SIZE
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.path = path
+        self.max_size = max_size
+        self.full = False
+        self._lock = asyncio.Lock()
+
+    async def async_record(
+        self,
+        status: int,
+        elapsed: float,
+        headers: Any,
+        body: bytes | None,
+    ) -> None:
+        """Append a response received after the given seconds."""
+        if self.full:
+            return
+        line = json.dumps(
+            {
+                RECORD_TIME: datetime.now(timezone.utc).isoformat(),
+                RECORD_ELAPSED: round(elapsed, 4),
+                RECORD_STATUS: status,
+                RECORD_ETAG: headers.get(aiohttp.hdrs.ETAG),
+                RECORD_LAST_MODIFIED: headers.get(aiohttp.hdrs.LAST_MODIFIED),
+                RECORD_BODY: None if body is None else body.decode(),
+            },
+            separators=(",", ":"),
+        )
+        async with self._lock:
+            if self.full or await self.hass.async_add_executor_job(
+                self._append, line
+            ):
+                return
+        self.full = True
+        _LOGGER.warning(
+            "Stopped recording responses, as %s reached %d bytes",
+            self.path,
+            self.max_size,
+        )
+
+    def _append(self, line: str) -> bool:
+        """Append a line to the recording, unless it is full.
+
+        Returns if the line was appended.
+        """
+        try:
+            if os.path.getsize(self.path) >= self.max_size:
+                return False
+        except FileNotFoundError:
+            pass
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.write(line + "\n")
+        return True
+
+def load_recording(path: str) -> list[dict[str, Any]]:
+    """Return the responses of a recording, oldest first."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+class RecordedResponse:
+    """Stand-in for the parts of a client response the API uses."""
+
+    def __init__(
+        self, status: int, headers: dict[str, str], body: bytes | None
+    ) -> None:
+        """Initialize."""
+        self.status = status
+        self.headers = {
+            key: value for key, value in headers.items() if value is not None
+        }
+        self._body = body or b""
+
+    def raise_for_status(self) -> None:
+        """Do nothing, as failed responses are not recorded."""
+
+    def release(self) -> None:
+        """Release the response."""
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+    async def json(self) -> Any:
+        """Return the decoded body."""
+        return json.loads(self._body)
+
+class ReplayTransport:
+    """Transport answering requests from a recording instead of the network.
+
+    Logins always succeed, and each `/devices` request is answered with the
+    next recorded response, delayed by its recorded latency divided by the
+    speed. A speed of zero replays without delays.
+    """
+
+    def __init__(self, records: list[dict[str, Any]], speed: float = 1) -> None:
+        """Initialize."""
+        self.records = records
+        self.breaker = CircuitBreaker()
+        self._speed = speed
+        # Not modified responses cannot be replayed before any devices
+        self._position = next(
+            (
+                index
+                for index, record in enumerate(records)
+                if record[RECORD_BODY] is not None
+            ),
+            len(records),
+        )
+        self._last_body: bytes | None = None
+
+    def _delay(self, seconds: float) -> float:
+        """Return a recorded delay scaled to the replay speed."""
+        return seconds / self._speed if self._speed > 0 else 0
+
+    async def async_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> RecordedResponse:
+        """Answer a request from the recording."""
+        if url.endswith("/login"):
+            return RecordedResponse(
+                200, {}, json.dumps({CONF_ACCESS_TOKEN: "replay"}).encode()
+            )
+
+        if self._position >= len(self.records):
+            raise aiohttp.ClientConnectionError("Recording exhausted")
+        record = self.records[self._position]
+        self._position += 1
+        await asyncio.sleep(self._delay(record[RECORD_ELAPSED]))
+
+        headers = {
+            aiohttp.hdrs.ETAG: record[RECORD_ETAG],
+            aiohttp.hdrs.LAST_MODIFIED: record[RECORD_LAST_MODIFIED],
+        }
+        status = record[RECORD_STATUS]
+        body = record[RECORD_BODY]
+        if body is not None:
+            self._last_body = body.encode()
+        request_headers = kwargs.get("headers") or {}
+        if status == 304 and not (
+            aiohttp.hdrs.IF_NONE_MATCH in request_headers
+            or aiohttp.hdrs.IF_MODIFIED_SINCE in request_headers
+        ):
+            # Nothing is cached on this side yet, so send the devices
+            status = 200
+        return RecordedResponse(
+            status, headers, self._last_body if status == 200 else None
+        )
+
+    async def async_replay(
+        self, refresh: Callable[[], Awaitable[None]]
+    ) -> list[float]:
+        """Refresh once per recorded response, spaced as they were recorded.
+
+        Returns the duration of each refresh in seconds.
+        """
+        durations = []
+        loop = asyncio.get_running_loop()
+        previous: datetime | None = None
+        for record in self.records[self._position:]:
+            time = datetime.fromisoformat(record[RECORD_TIME])
+            if previous is not None:
+                await asyncio.sleep(
+                    self._delay((time - previous).total_seconds())
+                )
+            previous = time
+            start = loop.time()
+            await refresh()
+            durations.append(loop.time() - start)
+        return durations
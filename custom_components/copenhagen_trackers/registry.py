@@ -0,0 +1,509 @@
+"""Shared API clients for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import asyncio
+from datetime import datetime, timezone
+import hashlib
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import CopenhagenTrackersAPI
+from .const import (
+    ATTR_DATA,
+    BATTERY_SAVE_DELAY,
+    CONF_ACCESS_TOKEN,
+    CONF_REQUEST_BUDGET,
+    DATA_REGISTRY,
+    DEFAULT_REQUEST_BUDGET,
+    DOMAIN,
+    HISTORY_SAVE_DELAY,
+    MAX_CONCURRENT_REQUESTS,
+    MISSING_DEVICE_SYNCS,
+    REFRESH_COALESCE_WINDOW,
+    REQUEST_BUDGET_WINDOW,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .battery import BatteryModel
+from .budget import PRIORITY_INTERACTIVE, RequestBudget, request_priority
+from .history import LocationHistory
+from .metrics import Metrics
+from .models import TrackerDevice, parse_devices
+
+_LOGGER = logging.getLogger(__name__)
+
+# Storage keys
+STORAGE_LAST_SYNC_TIME = "last_sync_time"
+STORAGE_PAYLOAD = "payload"
+
+def get_account_id(email: str) -> str:
+    """Return a stable, anonymous id for an account."""
+    return hashlib.sha256(email.casefold().encode()).hexdigest()[:16]
+
+def get_account_store(hass: HomeAssistant, account_id: str) -> Store:
+    """Return the store holding the snapshot of an account."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{account_id}")
+
+def get_history_store(hass: HomeAssistant, account_id: str) -> Store:
+    """Return the store holding the location history of an account."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{account_id}.history")
+
+def get_battery_store(hass: HomeAssistant, account_id: str) -> Store:
+    """Return the store holding the battery models of an account."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{account_id}.battery")
+
+def _encode_histories(
+    histories: dict[str, LocationHistory],
+) -> dict[str, dict[str, Any]]:
+    """Encode location histories for storage."""
+    return {
+        device_id: history.to_dict()
+        for device_id, history in histories.items()
+    }
+
+class CopenhagenTrackersAccount:
+    """Devices of one account, shared by all config entries using it.
+
+    Every change of the devices bumps a revision, so each consumer can tell
+    whether the devices changed since it last looked.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data: dict[str, Any],
+        request_limit: asyncio.Semaphore,
+        budget: RequestBudget,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.account_id = get_account_id(data[CONF_EMAIL])
+        self.metrics = Metrics()
+        self.budget = budget
+        self.api = CopenhagenTrackersAPI(
+            async_get_clientsession(hass),
+            data[CONF_EMAIL],
+            data[CONF_PASSWORD],
+            data.get(CONF_ACCESS_TOKEN),
+            self.async_save_access_token,
+            request_limit,
+            self.metrics,
+            budget,
+        )
+        self.entry_ids: set[str] = set()
+        self.histories: dict[str, LocationHistory] = {}
+        self.batteries: dict[str, BatteryModel] = {}
+        self._store = get_account_store(hass, self.account_id)
+        self._history_store = get_history_store(hass, self.account_id)
+        self._battery_store = get_battery_store(hass, self.account_id)
+        self._devices: dict[str, TrackerDevice] | None = None
+        self._revision = 0
+        self._fetched_at: float | None = None
+        self._last_sync_time: datetime | None = None
+        self._last_push_time: datetime | None = None
+        self._request: asyncio.Task | None = None
+        self._history_save_unsub: CALLBACK_TYPE | None = None
+        # Consecutive syncs that known devices were missing from
+        self._missing_syncs: dict[str, int] = {}
+        self._history_final_write_unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_save_access_token(self, access_token: str) -> None:
+        """Persist a new access token so restarts can skip the login."""
+        for entry_id in self.entry_ids:
+            if entry := self.hass.config_entries.async_get_entry(entry_id):
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, CONF_ACCESS_TOKEN: access_token}
+                )
+
+    async def async_load_snapshot(
+        self,
+    ) -> tuple[int, dict[str, TrackerDevice], datetime] | None:
+        """Return the revision, devices and sync time of the saved snapshot."""
+        if self._devices is None:
+            await self._async_load_histories()
+            await self._async_load_batteries()
+            if not (snapshot := await self._store.async_load()):
+                return None
+            try:
+                devices = self._parse_devices(snapshot[STORAGE_PAYLOAD])
+                self._last_sync_time = datetime.fromisoformat(
+                    snapshot[STORAGE_LAST_SYNC_TIME]
+                )
+            except (KeyError, TypeError, ValueError) as error:
+                _LOGGER.warning("Ignoring invalid snapshot: %s", error)
+                return None
+            self._devices = devices
+            self._revision += 1
+        return self._revision, self._devices, self._last_sync_time
+
+    async def async_get_devices(
+        self, force: bool = False
+    ) -> tuple[int, dict[str, TrackerDevice]]:
+        """Return the revision and devices, fetching them if needed.
+
+        Concurrent callers share a single request, and callers within the
+        coalesce window of the last request share its result, unless they
+        force a new request or are interactive. Interactive callers raise
+        the priority of a shared request that waits for the budget.
+        """
+        interactive = force or request_priority.get() == PRIORITY_INTERACTIVE
+        if self._request is None and (
+            interactive
+            or self._devices is None
+            or self._fetched_at is None
+            or time.monotonic() - self._fetched_at >= REFRESH_COALESCE_WINDOW
+        ):
+            self._request = self.hass.async_create_background_task(
+                self._async_fetch_devices(), f"{DOMAIN} fetch devices"
+            )
+        elif interactive and self._request is not None:
+            self.budget.prioritize(self._request, PRIORITY_INTERACTIVE)
+        if request := self._request:
+            await asyncio.shield(request)
+        return self._revision, self._devices
+
+    async def _async_fetch_devices(self) -> None:
+        """Fetch the devices and bump the revision if they changed."""
+        previous = self.devices
+        try:
+            payload = await self.api.async_get_devices_with_auth(
+                conditional=self._devices is not None
+            )
+        finally:
+            self._request = None
+        self._fetched_at = time.monotonic()
+        self._last_sync_time = datetime.now(timezone.utc)
+        if payload is None:
+            self._async_count_missing_devices(previous)
+            return
+
+        self._devices = self._parse_devices(payload)
+        self._revision += 1
+        _LOGGER.debug(
+            "Fetched %d devices in %d bytes",
+            len(self._devices),
+            self.metrics.payload_bytes,
+        )
+        self._async_count_missing_devices(previous)
+        self._async_update_histories()
+        self._async_update_batteries()
+        self._async_save_snapshot()
+
+    @callback
+    def async_push_devices(self, payload: dict[str, Any]) -> int:
+        """Merge pushed devices into the devices, returning how many changed.
+
+        Pushed devices are shaped like `/devices` entries and replace the
+        known ones by id, unless they are older.
+        """
+        pushed = self._parse_devices(payload)
+        self._last_push_time = datetime.now(timezone.utc)
+        devices = dict(self.devices)
+        changed = 0
+        for device in pushed.values():
+            if (known := devices.get(device.id)) is not None and (
+                known == device
+                or (
+                    known.updated_at is not None
+                    and (
+                        device.updated_at is None
+                        or device.updated_at < known.updated_at
+                    )
+                )
+            ):
+                continue
+            devices[device.id] = device
+            changed += 1
+
+        if changed:
+            self._devices = devices
+            self._revision += 1
+            self._async_update_histories()
+            self._async_update_batteries()
+            self._async_save_snapshot()
+        return changed
+
+    @callback
+    def _async_count_missing_devices(
+        self, previous: dict[str, TrackerDevice]
+    ) -> None:
+        """Count the consecutive syncs known devices were missing from.
+
+        A partial response must not wipe a device, so it is only gone once
+        missing from several syncs in a row, and its history is dropped then.
+        """
+        devices = self.devices
+        known = (
+            previous.keys()
+            | self._missing_syncs.keys()
+            | self.histories.keys()
+            | self.batteries.keys()
+        )
+        for device_id in self._missing_syncs.keys() & devices.keys():
+            del self._missing_syncs[device_id]
+
+        gone = False
+        for device_id in known - devices.keys():
+            missing = self._missing_syncs.get(device_id, 0) + 1
+            self._missing_syncs[device_id] = missing
+            if missing == MISSING_DEVICE_SYNCS:
+                _LOGGER.debug("Device %s is gone", device_id)
+                gone |= self.histories.pop(device_id, None) is not None
+                gone |= self.batteries.pop(device_id, None) is not None
+        if gone:
+            self._async_schedule_history_save()
+            self._async_save_batteries()
+
+    def is_gone(self, device_id: str) -> bool:
+        """Return if a device was missing from enough syncs to be removed."""
+        return self._missing_syncs.get(device_id, 0) >= MISSING_DEVICE_SYNCS
+
+    @callback
+    def _async_save_snapshot(self) -> None:
+        """Save the devices and sync time after a delay."""
+        if self._last_sync_time is None:
+            # Pushed devices alone are no sync to restore from
+            return
+        devices = self._devices
+        last_sync_time = self._last_sync_time
+        # Rebuilt from the devices, so the response need not be kept around
+        self._store.async_delay_save(
+            lambda: {
+                STORAGE_PAYLOAD: {
+                    ATTR_DATA: [
+                        device.to_dict() for device in devices.values()
+                    ]
+                },
+                STORAGE_LAST_SYNC_TIME: last_sync_time.isoformat(),
+            },
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    def _parse_devices(
+        self, payload: dict[str, Any]
+    ) -> dict[str, TrackerDevice]:
+        """Parse a `/devices` response, timing it."""
+        start = time.perf_counter()
+        devices = parse_devices(payload)
+        self.metrics.parse_time.record(time.perf_counter() - start)
+        return devices
+
+    async def _async_load_histories(self) -> None:
+        """Restore the saved location histories."""
+        if not (data := await self._history_store.async_load()):
+            return
+        try:
+            self.histories = {
+                device_id: LocationHistory.from_dict(history)
+                for device_id, history in data.items()
+            }
+        except (KeyError, TypeError, ValueError) as error:
+            _LOGGER.warning("Ignoring invalid location history: %s", error)
+
+    @callback
+    def _async_update_histories(self) -> None:
+        """Append the latest location of each device to its history."""
+        changed = False
+        for device_id, device in self._devices.items():
+            location = device.location
+            if (
+                device.updated_at is None
+                or location is None
+                or location.latitude is None
+                or location.longitude is None
+            ):
+                continue
+            if (history := self.histories.get(device_id)) is None:
+                history = self.histories[device_id] = LocationHistory()
+            changed |= history.append(
+                device.updated_at.timestamp(),
+                location.latitude,
+                location.longitude,
+                location.accuracy_meters,
+                dt_util.as_local(device.updated_at).date(),
+            )
+
+        if changed:
+            self._async_schedule_history_save()
+
+    @callback
+    def _async_schedule_history_save(self) -> None:
+        """Save the location histories after a delay, or when stopping."""
+        if self._history_save_unsub is not None:
+            return
+        self._history_save_unsub = async_call_later(
+            self.hass, HISTORY_SAVE_DELAY, self._async_save_histories_later
+        )
+        self._history_final_write_unsub = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_save_histories_on_stop
+        )
+
+    async def _async_save_histories_later(self, _now: datetime) -> None:
+        """Save the location histories once the delay passed."""
+        self._history_save_unsub = None
+        if self._history_final_write_unsub is not None:
+            self._history_final_write_unsub()
+            self._history_final_write_unsub = None
+        await self._async_save_histories()
+
+    async def _async_save_histories_on_stop(self, _event: Event) -> None:
+        """Save the pending location histories before Home Assistant stops."""
+        self._history_final_write_unsub = None
+        if self._history_save_unsub is not None:
+            self._history_save_unsub()
+            self._history_save_unsub = None
+        await self._async_save_histories()
+
+    async def _async_save_histories(self) -> None:
+        """Save the location histories, encoding them off the event loop.
+
+        Copying the columns is cheap, while encoding all of them would stall
+        the event loop for large fleets.
+        """
+        histories = {
+            device_id: history.copy()
+            for device_id, history in self.histories.items()
+        }
+        data = await self.hass.async_add_executor_job(
+            _encode_histories, histories
+        )
+        await self._history_store.async_save(data)
+
+    async def _async_load_batteries(self) -> None:
+        """Restore the saved battery models."""
+        if not (data := await self._battery_store.async_load()):
+            return
+        try:
+            self.batteries = {
+                device_id: BatteryModel.from_dict(model)
+                for device_id, model in data.items()
+            }
+        except (KeyError, TypeError, ValueError) as error:
+            _LOGGER.warning("Ignoring invalid battery models: %s", error)
+
+    @callback
+    def _async_update_batteries(self) -> None:
+        """Add the latest battery level of each device to its model."""
+        changed = False
+        for device_id, device in self._devices.items():
+            battery = device.battery_percentage
+            if device.updated_at is None or not isinstance(battery, (int, float)):
+                continue
+            if (model := self.batteries.get(device_id)) is None:
+                model = self.batteries[device_id] = BatteryModel()
+            changed |= model.update(device.updated_at.timestamp(), battery)
+
+        if changed:
+            self._async_save_batteries()
+
+    @callback
+    def _async_save_batteries(self) -> None:
+        """Save the battery models after a delay."""
+        self._battery_store.async_delay_save(
+            lambda: {
+                device_id: model.to_dict()
+                for device_id, model in self.batteries.items()
+            },
+            BATTERY_SAVE_DELAY,
+        )
+
+    @property
+    def devices(self) -> dict[str, TrackerDevice]:
+        """Return all devices of the account, including ignored ones."""
+        return self._devices or {}
+
+    @property
+    def revision(self) -> int:
+        """Return the revision of the devices."""
+        return self._revision
+
+    @property
+    def last_sync_time(self) -> datetime | None:
+        """Return the timestamp of the last successful request."""
+        return self._last_sync_time
+
+    @property
+    def last_push_time(self) -> datetime | None:
+        """Return the timestamp of the last pushed devices."""
+        return self._last_push_time
+
+class CopenhagenTrackersRegistry:
+    """Registry sharing one client per account across config entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._accounts: dict[str, CopenhagenTrackersAccount] = {}
+        # Caps the concurrent requests to the API host across all accounts
+        self._request_limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Caps the requests per window across all accounts and config flows
+        self.budget = RequestBudget(DEFAULT_REQUEST_BUDGET, REQUEST_BUDGET_WINDOW)
+        self._budget_limits: dict[str, int] = {}
+
+    @staticmethod
+    def _get_key(email: str, password: str) -> str:
+        """Return the key of a set of credentials."""
+        return hashlib.sha256(
+            f"{email.casefold()}\0{password}".encode()
+        ).hexdigest()
+
+    @callback
+    def async_acquire(self, entry: ConfigEntry) -> CopenhagenTrackersAccount:
+        """Return the account of a config entry, creating it if needed."""
+        key = self._get_key(entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD])
+        if (account := self._accounts.get(key)) is None:
+            account = self._accounts[key] = CopenhagenTrackersAccount(
+                self.hass, entry.data, self._request_limit, self.budget
+            )
+        account.entry_ids.add(entry.entry_id)
+        self.async_set_budget_limit(entry)
+        return account
+
+    @callback
+    def async_set_budget_limit(self, entry: ConfigEntry) -> None:
+        """Apply the request budget of a config entry.
+
+        The budget is shared, so the smallest one of all entries applies.
+        """
+        self._budget_limits[entry.entry_id] = int(
+            entry.options.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET)
+        )
+        self._update_budget_limit()
+
+    def _update_budget_limit(self) -> None:
+        """Apply the smallest request budget of the config entries."""
+        limit = min(self._budget_limits.values(), default=DEFAULT_REQUEST_BUDGET)
+        if limit != self.budget.limit:
+            self.budget.limit = limit
+
+    @callback
+    def async_release(self, entry: ConfigEntry) -> None:
+        """Release the account of a config entry, if no one else uses it."""
+        if self._budget_limits.pop(entry.entry_id, None) is not None:
+            self._update_budget_limit()
+        for key, account in list(self._accounts.items()):
+            account.entry_ids.discard(entry.entry_id)
+            if not account.entry_ids:
+                del self._accounts[key]
+
+@callback
+def async_get_registry(hass: HomeAssistant) -> CopenhagenTrackersRegistry:
+    """Return the registry of the integration."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if (registry := domain_data.get(DATA_REGISTRY)) is None:
+        registry = domain_data[DATA_REGISTRY] = CopenhagenTrackersRegistry(hass)
+    return registry
@@ -0,0 +1,118 @@
+"""Adaptive poll scheduling for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from datetime import datetime, timedelta
+import random
+
+from .const import (
+    DEFAULT_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    SCAN_INTERVAL_JITTER,
+)
+from .geo import haversine_distance
+from .models import TrackerDevice
+
+# Tuning
+LOW_BATTERY_FACTOR = 2
+LOW_BATTERY_PERCENTAGE = 20
+MOTION_THRESHOLD_M = 50
+NIGHT_FACTOR = 2
+NIGHT_HOURS = range(0, 6)
+
+class AdaptivePollScheduler:
+    """Pick the next poll interval from the observed state of the fleet.
+
+    The `/devices` endpoint returns the whole fleet, so every device gets a
+    desired interval and the fleet is polled at the most demanding one.
+    """
+
+    def __init__(
+        self,
+        min_interval: timedelta = MIN_SCAN_INTERVAL,
+        max_interval: timedelta = DEFAULT_SCAN_INTERVAL,
+        jitter: float = SCAN_INTERVAL_JITTER,
+    ) -> None:
+        """Initialize."""
+        self._min_seconds = min_interval.total_seconds()
+        self._max_seconds = max_interval.total_seconds()
+        self._jitter = jitter
+        self._positions: dict[str, tuple[float, float]] = {}
+
+    @property
+    def bounds(self) -> tuple[timedelta, timedelta]:
+        """Return the shortest and longest poll interval."""
+        return (
+            timedelta(seconds=self._min_seconds),
+            timedelta(seconds=self._max_seconds),
+        )
+
+    @property
+    def max_interval(self) -> timedelta:
+        """Return the longest poll interval."""
+        return timedelta(seconds=self._max_seconds)
+
+    def set_bounds(self, min_interval: timedelta, max_interval: timedelta) -> None:
+        """Change the bounds of the poll interval."""
+        self._min_seconds = min_interval.total_seconds()
+        self._max_seconds = max(max_interval, min_interval).total_seconds()
+
+    def next_interval(self, devices: dict[str, TrackerDevice], now: datetime) -> timedelta:
+        """Return the interval until the next poll, given a fresh sync."""
+        positions = {}
+        seconds = self._max_seconds
+        for device_id, device in devices.items():
+            position = self._get_position(device)
+            if position:
+                positions[device_id] = position
+            seconds = min(
+                seconds,
+                self._device_interval(
+                    device, position, self._positions.get(device_id), now
+                ),
+            )
+        self._positions = positions
+
+        if self._jitter:
+            seconds *= random.uniform(1 - self._jitter, 1 + self._jitter)
+        return timedelta(seconds=self._clamp(seconds))
+
+    def _device_interval(
+        self,
+        device: TrackerDevice,
+        position: tuple[float, float] | None,
+        previous: tuple[float, float] | None,
+        now: datetime,
+    ) -> float:
+        """Return the desired poll interval of a single device in seconds."""
+        if (
+            position
+            and previous
+            and haversine_distance(*previous, *position) >= MOTION_THRESHOLD_M
+        ):
+            return self._min_seconds
+
+        # A device that reported recently is likely to report again soon
+        seconds = self._max_seconds
+        if device.updated_at:
+            seconds = self._clamp((now - device.updated_at).total_seconds())
+
+        battery = device.battery_percentage
+        if isinstance(battery, (int, float)) and battery <= LOW_BATTERY_PERCENTAGE:
+            seconds *= LOW_BATTERY_FACTOR
+        if now.hour in NIGHT_HOURS:
+            seconds *= NIGHT_FACTOR
+        return seconds
+
+    def _clamp(self, seconds: float) -> float:
+        """Clamp an interval to the configured bounds."""
+        return min(self._max_seconds, max(self._min_seconds, seconds))
+
+    @staticmethod
+    def _get_position(device: TrackerDevice) -> tuple[float, float] | None:
+        """Return the reported position of a device."""
+        if (location := device.location) and None not in (
+            location.latitude,
+            location.longitude,
+        ):
+            return location.latitude, location.longitude
+        return None
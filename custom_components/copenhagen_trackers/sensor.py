@@ -1,246 +1,645 @@
 """Sensor platform for Copenhagen Trackers integration."""
 
 from __future__ import annotations
-import datetime
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorEntity,
+    SensorEntityDescription,
     SensorDeviceClass,
     SensorStateClass,
 )
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import (
+    DEGREE,
+    PERCENTAGE,
+    UnitOfInformation,
+    UnitOfLength,
+    UnitOfSpeed,
+    UnitOfTime,
+)
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
-    ATTR_DATA,
-    ATTR_ID
+    ENTITY_GROUP_CELLULAR_SIGNAL,
+    ENTITY_GROUP_GPS_SIGNAL,
+    ENTITY_GROUP_MOVEMENT,
+    ENTITY_GROUP_PROFILE,
+)
+from .battery import BatteryModel
+from .budget import RequestBudget
+from .entity import (
+    CopenhagenTrackersEntity,
+    CopenhagenTrackersEntityDescription,
+    CopenhagenTrackersHistoryEntity,
+    CopenhagenTrackersHubEntity,
 )
-from .entity import CopenhagenTrackersEntity
+from .history import LocationHistory
+from .metrics import Histogram, Metrics
+from .models import TrackerDevice
  
 # API response keys
 ATTR_BATTERY_PERCENTAGE = "battery_percentage"
 ATTR_DESCRIPTION = "description"
-ATTR_DEVICE_INFO = "device_info"
-ATTR_NAME = "name"
 ATTR_PROFILE = "profile"
 ATTR_UPDATED_AT = "updated_at"
 
+# State attributes
+ATTR_AGE = "age"
+ATTR_CHARGED_AT = "charged_at"
+ATTR_CIRCUIT_BREAKER = "circuit_breaker"
+ATTR_COUNT = "count"
+ATTR_DEFERRED = "deferred"
+ATTR_FIX_TIME = "fix_time"
+ATTR_LIMIT = "limit"
+ATTR_MAX = "max"
+ATTR_P90 = "p90"
+ATTR_P99 = "p99"
+ATTR_SATELLITES = "satellites"
+ATTR_STALE = "stale"
+ATTR_SUPPRESSED_WRITES = "suppressed_writes"
+ATTR_TIME_TO_FIX = "time_to_fix"
+ATTR_TOTAL = "total"
+
 # Entity IDs
 SUFFIX_BATTERY_PERCENTAGE = ATTR_BATTERY_PERCENTAGE
+SUFFIX_BATTERY_DISCHARGE_RATE = "battery_discharge_rate"
+SUFFIX_BATTERY_EMPTY_AT = "battery_empty_at"
 SUFFIX_LAST_SEEN_AT = "last_seen_at"
 SUFFIX_PROFILE = ATTR_PROFILE
 SUFFIX_SERVER_SYNC_AT = "server_sync_at"
 SUFFIX_CELLULAR_SIGNAL = "cellular_signal"
 SUFFIX_GPS_SIGNAL = "gps_signal"
+SUFFIX_SPEED = "speed"
+SUFFIX_HEADING = "heading"
+SUFFIX_DISTANCE_TODAY = "distance_today"
+SUFFIX_REQUEST_LATENCY = "request_latency"
+SUFFIX_DECODE_TIME = "decode_time"
+SUFFIX_PARSE_TIME = "parse_time"
+SUFFIX_REFRESH_DURATION = "refresh_duration"
+SUFFIX_FAN_OUT_TIME = "fan_out_time"
+SUFFIX_LOGINS = "logins"
+SUFFIX_PAYLOAD_SIZE = "payload_size"
+SUFFIX_REQUEST_FAILURES = "request_failures"
+SUFFIX_UPDATE_FAILURES = "update_failures"
+SUFFIX_REQUEST_BUDGET = "request_budget"
+SUFFIX_REQUEST_QUEUE = "request_queue"
 
 TRANSLATION_KEY_BATTERY_PERCENTAGE = ATTR_BATTERY_PERCENTAGE
+TRANSLATION_KEY_BATTERY_DISCHARGE_RATE = SUFFIX_BATTERY_DISCHARGE_RATE
+TRANSLATION_KEY_BATTERY_EMPTY_AT = SUFFIX_BATTERY_EMPTY_AT
 TRANSLATION_KEY_LAST_SEEN_AT = SUFFIX_LAST_SEEN_AT
 TRANSLATION_KEY_PROFILE = ATTR_PROFILE
 TRANSLATION_KEY_SERVER_SYNC_AT = SUFFIX_SERVER_SYNC_AT
 TRANSLATION_KEY_CELLULAR_SIGNAL = SUFFIX_CELLULAR_SIGNAL
 TRANSLATION_KEY_GPS_SIGNAL = SUFFIX_GPS_SIGNAL
+TRANSLATION_KEY_SPEED = SUFFIX_SPEED
+TRANSLATION_KEY_HEADING = SUFFIX_HEADING
+TRANSLATION_KEY_DISTANCE_TODAY = SUFFIX_DISTANCE_TODAY
+TRANSLATION_KEY_REQUEST_LATENCY = SUFFIX_REQUEST_LATENCY
+TRANSLATION_KEY_DECODE_TIME = SUFFIX_DECODE_TIME
+TRANSLATION_KEY_PARSE_TIME = SUFFIX_PARSE_TIME
+TRANSLATION_KEY_REFRESH_DURATION = SUFFIX_REFRESH_DURATION
+TRANSLATION_KEY_FAN_OUT_TIME = SUFFIX_FAN_OUT_TIME
+TRANSLATION_KEY_LOGINS = SUFFIX_LOGINS
+TRANSLATION_KEY_PAYLOAD_SIZE = SUFFIX_PAYLOAD_SIZE
+TRANSLATION_KEY_REQUEST_FAILURES = SUFFIX_REQUEST_FAILURES
+TRANSLATION_KEY_UPDATE_FAILURES = SUFFIX_UPDATE_FAILURES
+TRANSLATION_KEY_REQUEST_BUDGET = SUFFIX_REQUEST_BUDGET
+TRANSLATION_KEY_REQUEST_QUEUE = SUFFIX_REQUEST_QUEUE
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Copenhagen Trackers sensors based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
     
-    entities = []
-    for device in coordinator.data[ATTR_DATA]:
-        entities.extend((
-            ServerSyncAtSensor(coordinator, device[ATTR_ID]),
-            LastSeenAtSensor(coordinator, device[ATTR_ID]),
-            BatteryPercentageSensor(coordinator, device[ATTR_ID]),
-            GPSSignalSensor(coordinator, device[ATTR_ID]),
-            ProfileNameSensor(coordinator, device[ATTR_ID])
-        ))
-        # Only add cellular signal sensor if the API provided cellular info
-        location = device.get("location") or {}
-        device_info = location.get("device_info") or {}
-        if device_info.get("sig_strength") or device_info.get("trans"):
-            entities.append(CellularSignalSensor(coordinator, device[ATTR_ID]))
-    
-    async_add_entities(entities)
+    async_add_entities([
+        *(
+            HistogramSensor(coordinator, description)
+            for description in HISTOGRAM_SENSORS
+        ),
+        *(HubSensor(coordinator, description) for description in HUB_SENSORS),
+        *(
+            BudgetSensor(coordinator, description)
+            for description in BUDGET_SENSORS
+        ),
+    ])
 
-class LastSeenAtSensor(CopenhagenTrackersEntity, SensorEntity):
-    """Sensor for when the device was last seen."""
+    @callback
+    def _async_add_devices(
+        device_ids: set[str], groups: set[str | None]
+    ) -> None:
+        entities = []
+        for device_id in device_ids:
+            device = coordinator.get_device(device_id)
+            if SERVER_SYNC_AT_SENSOR.group in groups:
+                entities.append(
+                    ServerSyncAtSensor(coordinator, device_id, SERVER_SYNC_AT_SENSOR)
+                )
+            entities.extend(
+                CopenhagenTrackersSensor(coordinator, device_id, description)
+                for description in SENSORS
+                if description.group in groups and description.exists_fn(device)
+            )
+            entities.extend(
+                HistorySensor(coordinator, device_id, description)
+                for description in HISTORY_SENSORS
+                if description.group in groups
+            )
+            entities.extend(
+                BatterySensor(coordinator, device_id, description)
+                for description in BATTERY_SENSORS
+                if description.group in groups
+            )
+        async_add_entities(entities)
 
-    _attr_device_class = SensorDeviceClass.TIMESTAMP
-    _attr_icon = "mdi:broadcast"
-    _attr_translation_key = TRANSLATION_KEY_LAST_SEEN_AT
-    SUFFIX = SUFFIX_LAST_SEEN_AT
+    entry.async_on_unload(
+        coordinator.async_add_devices_listener(_async_add_devices)
+    )
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        last_seen_at = self.device_data.get(ATTR_UPDATED_AT)
-        if last_seen_at:
-            return datetime.datetime.fromisoformat(last_seen_at.replace("Z", "+00:00"))
-        return None
+@dataclass(frozen=True, kw_only=True)
+class CopenhagenTrackersSensorEntityDescription(
+    CopenhagenTrackersEntityDescription, SensorEntityDescription
+):
+    """Describes a Copenhagen Trackers sensor."""
 
-class BatteryPercentageSensor(CopenhagenTrackersEntity, SensorEntity):
-    """Sensor for device battery percentage."""
+@dataclass(frozen=True, kw_only=True)
+class DeviceSensorEntityDescription(CopenhagenTrackersSensorEntityDescription):
+    """Describes a sensor reading a value of the device."""
 
-    _attr_device_class = SensorDeviceClass.BATTERY
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_native_precision = 0
-    _attr_translation_key = TRANSLATION_KEY_BATTERY_PERCENTAGE
-    SUFFIX = SUFFIX_BATTERY_PERCENTAGE
+    value_fn: Callable[[TrackerDevice], StateType | datetime]
+    attributes_fn: Callable[[TrackerDevice], dict[str, Any] | None] | None = None
+    icon_fn: Callable[[StateType], str] | None = None
+    # Only devices reporting the value get the sensor
+    exists_fn: Callable[[TrackerDevice], bool] = lambda device: True
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.device_data.get(ATTR_BATTERY_PERCENTAGE)
+@dataclass(frozen=True, kw_only=True)
+class HistorySensorEntityDescription(CopenhagenTrackersSensorEntityDescription):
+    """Describes a sensor reading a value of the location history."""
 
-class CellularSignalSensor(CopenhagenTrackersEntity, SensorEntity):
-    """Sensor for device cellular signal strength."""
+    value_fn: Callable[[LocationHistory], float | None]
 
-    _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
-    _attr_native_unit_of_measurement = "dBm"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_native_precision = 0
-    _attr_translation_key = TRANSLATION_KEY_CELLULAR_SIGNAL
-    SUFFIX = SUFFIX_CELLULAR_SIGNAL
+@dataclass(frozen=True, kw_only=True)
+class BatterySensorEntityDescription(CopenhagenTrackersSensorEntityDescription):
+    """Describes a sensor reading a value of the battery model."""
 
-    @staticmethod
-    def _convert_to_dbm(value: int | str) -> int:
-        """Convert signal value to dBm."""
-        return -113 + (2 * int(value))
+    value_fn: Callable[[BatteryModel], StateType | datetime]
 
-    @property
-    def native_value(self) -> int | None:
-        """Return the cellular signal strength."""
-        location = self.get_location()
-        if not location or not location.get(ATTR_DEVICE_INFO):
-            return None
-            
-        device_info = location[ATTR_DEVICE_INFO]
-        # For Cobblestone devices
-        if sig_strength := device_info.get("sig_strength"):
-            return self._convert_to_dbm(sig_strength)
-        # For Gemstone devices
-        if trans := device_info.get("trans"):
-            return self._convert_to_dbm(trans)
+@dataclass(frozen=True, kw_only=True)
+class HubSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading the metrics of the account."""
+
+    value_fn: Callable[[Metrics], StateType]
+    attributes_fn: Callable[[Metrics], dict[str, Any]] | None = None
+
+@dataclass(frozen=True, kw_only=True)
+class BudgetSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading the request budget shared by all accounts."""
+
+    value_fn: Callable[[RequestBudget], StateType]
+
+@dataclass(frozen=True, kw_only=True)
+class HistogramSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor for the histogram of the metrics named by the key."""
+
+    device_class: SensorDeviceClass | None = SensorDeviceClass.DURATION
+    native_unit_of_measurement: str | None = UnitOfTime.MILLISECONDS
+    state_class: SensorStateClass | str | None = SensorStateClass.MEASUREMENT
+    suggested_display_precision: int | None = 1
+
+def _get_cellular_signal(device: TrackerDevice) -> int | None:
+    """Return the cellular signal strength."""
+    if location := device.location:
+        return location.cellular_signal
+    return None
+
+def _get_cellular_signal_icon(value: StateType) -> str:
+    """Return an icon representing the cellular signal strength."""
+    if value is None or value < -100:
+        return "mdi:sim-off"
+    
+    if value >= -70:
+        return "mdi:signal-cellular-3"
+    
+    if value >= -80:
+        return "mdi:signal-cellular-2"
+    
+    if value >= -90:
+        return "mdi:signal-cellular-1"
+    
+    return "mdi:signal-cellular-outline"
+
+def _get_gps_signal(device: TrackerDevice) -> int | None:
+    """Return the GPS signal quality (0-4)."""
+    if location := device.location:
+        return location.gps_signal
+    return None
+
+def _get_gps_signal_attributes(device: TrackerDevice) -> dict[str, Any] | None:
+    """Return the GPS signal quality attributes."""
+    if not (location := device.location):
         return None
 
-    @property
-    def icon(self) -> str:
-        """Return an icon representing the cellular signal strength."""
-        
-        value = self.native_value
-        
-        if value is None or value < -100:
-            return "mdi:sim-off"
-        
-        if value >= -70:
-            return "mdi:signal-cellular-3"
-        
-        if value >= -80:
-            return "mdi:signal-cellular-2"
-        
-        if value >= -90:
-            return "mdi:signal-cellular-1"
+    attributes = {}
+    
+    # For Gemstone
+    if location.time_to_fix is not None:
+        attributes[ATTR_TIME_TO_FIX] = location.time_to_fix
+    # For Cobblestone
+    if location.fix_time is not None:
+        attributes[ATTR_FIX_TIME] = location.fix_time
+    if location.satellites is not None:
+        attributes[ATTR_SATELLITES] = location.satellites
         
-        return "mdi:signal-cellular-outline"
+    return attributes if attributes else None
 
-class GPSSignalSensor(CopenhagenTrackersEntity, SensorEntity):
-    """Sensor for GPS signal quality."""
+def _get_gps_signal_icon(value: StateType) -> str:
+    """Return an icon representing the GPS signal quality (bars)."""
+    if value is None or value <= 0:
+        return "mdi:crosshairs-off"
+
+    if value >= 4:
+        return "mdi:signal-cellular-3"
+    
+    if value == 3:
+        return "mdi:signal-cellular-2"
+    
+    if value == 2:
+        return "mdi:signal-cellular-1"
+    
+    return "mdi:signal-cellular-outline"
+
+def _get_profile_attributes(device: TrackerDevice) -> dict[str, Any] | None:
+    """Return the description and update time of the profile."""
+    if profile := device.profile:
+        return {
+            ATTR_DESCRIPTION: profile.description,
+            ATTR_UPDATED_AT: profile.updated_at,
+        }
+    return None
+
+SENSORS: tuple[DeviceSensorEntityDescription, ...] = (
+    DeviceSensorEntityDescription(
+        key=SUFFIX_LAST_SEEN_AT,
+        translation_key=TRANSLATION_KEY_LAST_SEEN_AT,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:broadcast",
+        value_fn=lambda device: device.updated_at,
+    ),
+    DeviceSensorEntityDescription(
+        key=SUFFIX_BATTERY_PERCENTAGE,
+        translation_key=TRANSLATION_KEY_BATTERY_PERCENTAGE,
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda device: device.battery_percentage,
+    ),
+    DeviceSensorEntityDescription(
+        key=SUFFIX_GPS_SIGNAL,
+        translation_key=TRANSLATION_KEY_GPS_SIGNAL,
+        native_unit_of_measurement="bars",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        group=ENTITY_GROUP_GPS_SIGNAL,
+        value_fn=_get_gps_signal,
+        attributes_fn=_get_gps_signal_attributes,
+        icon_fn=_get_gps_signal_icon,
+    ),
+    DeviceSensorEntityDescription(
+        key=SUFFIX_PROFILE,
+        translation_key=TRANSLATION_KEY_PROFILE,
+        icon="mdi:card-account-details-outline",
+        group=ENTITY_GROUP_PROFILE,
+        value_fn=lambda device: device.profile.name if device.profile else None,
+        attributes_fn=_get_profile_attributes,
+    ),
+    DeviceSensorEntityDescription(
+        key=SUFFIX_CELLULAR_SIGNAL,
+        translation_key=TRANSLATION_KEY_CELLULAR_SIGNAL,
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        native_unit_of_measurement="dBm",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        group=ENTITY_GROUP_CELLULAR_SIGNAL,
+        value_fn=_get_cellular_signal,
+        icon_fn=_get_cellular_signal_icon,
+        # Only add cellular signal sensor if the API provided cellular info
+        exists_fn=lambda device: _get_cellular_signal(device) is not None,
+    ),
+)
+
+HISTORY_SENSORS: tuple[HistorySensorEntityDescription, ...] = (
+    HistorySensorEntityDescription(
+        key=SUFFIX_SPEED,
+        translation_key=TRANSLATION_KEY_SPEED,
+        device_class=SensorDeviceClass.SPEED,
+        native_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        group=ENTITY_GROUP_MOVEMENT,
+        value_fn=lambda history: history.speed,
+    ),
+    HistorySensorEntityDescription(
+        key=SUFFIX_HEADING,
+        translation_key=TRANSLATION_KEY_HEADING,
+        icon="mdi:compass-outline",
+        native_unit_of_measurement=DEGREE,
+        suggested_display_precision=0,
+        group=ENTITY_GROUP_MOVEMENT,
+        value_fn=lambda history: history.heading,
+    ),
+    HistorySensorEntityDescription(
+        key=SUFFIX_DISTANCE_TODAY,
+        translation_key=TRANSLATION_KEY_DISTANCE_TODAY,
+        device_class=SensorDeviceClass.DISTANCE,
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        group=ENTITY_GROUP_MOVEMENT,
+        value_fn=lambda history: (
+            history.get_distance_on(dt_util.now().date()) / 1000
+        ),
+    ),
+)
+
+BATTERY_SENSORS: tuple[BatterySensorEntityDescription, ...] = (
+    BatterySensorEntityDescription(
+        key=SUFFIX_BATTERY_DISCHARGE_RATE,
+        translation_key=TRANSLATION_KEY_BATTERY_DISCHARGE_RATE,
+        icon="mdi:battery-arrow-down-outline",
+        native_unit_of_measurement=f"{PERCENTAGE}/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda model: model.rate,
+    ),
+    BatterySensorEntityDescription(
+        key=SUFFIX_BATTERY_EMPTY_AT,
+        translation_key=TRANSLATION_KEY_BATTERY_EMPTY_AT,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:battery-clock-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda model: (
+            None
+            if (empty_at := model.empty_at) is None
+            else dt_util.utc_from_timestamp(empty_at)
+        ),
+    ),
+)
+
+SERVER_SYNC_AT_SENSOR = CopenhagenTrackersSensorEntityDescription(
+    key=SUFFIX_SERVER_SYNC_AT,
+    translation_key=TRANSLATION_KEY_SERVER_SYNC_AT,
+    device_class=SensorDeviceClass.TIMESTAMP,
+    icon="mdi:cloud-sync",
+    entity_category=EntityCategory.DIAGNOSTIC,
+    update_on_every_refresh=True,
+)
+
+HISTOGRAM_SENSORS: tuple[HistogramSensorEntityDescription, ...] = (
+    HistogramSensorEntityDescription(
+        key=SUFFIX_REQUEST_LATENCY,
+        translation_key=TRANSLATION_KEY_REQUEST_LATENCY,
+        icon="mdi:timer-outline",
+    ),
+    HistogramSensorEntityDescription(
+        key=SUFFIX_DECODE_TIME,
+        translation_key=TRANSLATION_KEY_DECODE_TIME,
+        icon="mdi:code-json",
+    ),
+    HistogramSensorEntityDescription(
+        key=SUFFIX_PARSE_TIME,
+        translation_key=TRANSLATION_KEY_PARSE_TIME,
+        icon="mdi:file-tree",
+    ),
+    HistogramSensorEntityDescription(
+        key=SUFFIX_REFRESH_DURATION,
+        translation_key=TRANSLATION_KEY_REFRESH_DURATION,
+        icon="mdi:refresh",
+    ),
+    HistogramSensorEntityDescription(
+        key=SUFFIX_FAN_OUT_TIME,
+        translation_key=TRANSLATION_KEY_FAN_OUT_TIME,
+        icon="mdi:call-split",
+    ),
+)
+
+HUB_SENSORS: tuple[HubSensorEntityDescription, ...] = (
+    HubSensorEntityDescription(
+        key=SUFFIX_LOGINS,
+        translation_key=TRANSLATION_KEY_LOGINS,
+        icon="mdi:login",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.logins,
+    ),
+    HubSensorEntityDescription(
+        key=SUFFIX_PAYLOAD_SIZE,
+        translation_key=TRANSLATION_KEY_PAYLOAD_SIZE,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.payload_bytes,
+        attributes_fn=lambda metrics: {ATTR_TOTAL: metrics.payload_bytes_total},
+    ),
+    HubSensorEntityDescription(
+        key=SUFFIX_REQUEST_FAILURES,
+        translation_key=TRANSLATION_KEY_REQUEST_FAILURES,
+        icon="mdi:cloud-alert",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.request_failures,
+    ),
+    HubSensorEntityDescription(
+        key=SUFFIX_UPDATE_FAILURES,
+        translation_key=TRANSLATION_KEY_UPDATE_FAILURES,
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.update_failures,
+    ),
+)
+
+BUDGET_SENSORS: tuple[BudgetSensorEntityDescription, ...] = (
+    BudgetSensorEntityDescription(
+        key=SUFFIX_REQUEST_BUDGET,
+        translation_key=TRANSLATION_KEY_REQUEST_BUDGET,
+        icon="mdi:gauge",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda budget: budget.remaining,
+    ),
+    BudgetSensorEntityDescription(
+        key=SUFFIX_REQUEST_QUEUE,
+        translation_key=TRANSLATION_KEY_REQUEST_QUEUE,
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda budget: budget.queue_depth,
+    ),
+)
 
-    _attr_device_class = None
-    _attr_native_unit_of_measurement = "bars"
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    _attr_translation_key = TRANSLATION_KEY_GPS_SIGNAL
-    SUFFIX = SUFFIX_GPS_SIGNAL
-    _attr_native_max_value = 4
-    _attr_native_min_value = 0
-    _attr_native_step = 1
+class CopenhagenTrackersSensor(CopenhagenTrackersEntity, SensorEntity):
+    """Sensor for a value of the device."""
+
+    entity_description: DeviceSensorEntityDescription
 
     @property
-    def native_value(self) -> int | None:
-        """Return the GPS signal quality (0-4)."""
-        location = self.get_location()
-        if not location:
+    def native_value(self) -> StateType | datetime:
+        """Return the state of the sensor."""
+        if (device := self.device) is None:
             return None
-        return location.get("signal")
+        return self.entity_description.value_fn(device)
 
     @property
-    def extra_state_attributes(self) -> dict | None:
-        """Return the GPS signal quality attributes."""
-        location = self.get_location()
-        if not location or not location.get(ATTR_DEVICE_INFO):
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes."""
+        attributes_fn = self.entity_description.attributes_fn
+        if attributes_fn is None or (device := self.device) is None:
             return None
-            
-        device_info = location[ATTR_DEVICE_INFO]
-        attributes = {}
-        
-        # For Gemstone
-        if ttf := device_info.get("ttf"):
-            attributes["time_to_fix"] = int(ttf)
-        # For Cobblestone
-        if fixt := device_info.get("fixt"):
-            attributes["fix_time"] = int(fixt)
-        if num_sats := device_info.get("num_sats"):
-            attributes["satellites"] = int(num_sats)
-            
-        return attributes if attributes else None
+        return attributes_fn(device)
 
     @property
-    def icon(self) -> str:
-        """Return an icon representing the GPS signal quality (bars)."""
-        value = self.native_value
-        
-        if value is None or value <= 0:
-            return "mdi:crosshairs-off"
+    def icon(self) -> str | None:
+        """Return an icon representing the value, if it depends on it."""
+        if (icon_fn := self.entity_description.icon_fn) is None:
+            return super().icon
+        return icon_fn(self.native_value)
 
-        if value >= 4:
-            return "mdi:signal-cellular-3"
-        
-        if value == 3:
-            return "mdi:signal-cellular-2"
-        
-        if value == 2:
-            return "mdi:signal-cellular-1"
-        
-        return "mdi:signal-cellular-outline"
+class HistorySensor(CopenhagenTrackersHistoryEntity, SensorEntity):
+    """Sensor for a value of the location history of the device."""
 
-class ProfileNameSensor(CopenhagenTrackersEntity, SensorEntity):
-    """Sensor for device profile name."""
+    entity_description: HistorySensorEntityDescription
 
-    _attr_icon = "mdi:card-account-details-outline"
-    _attr_translation_key = TRANSLATION_KEY_PROFILE
-    SUFFIX = SUFFIX_PROFILE
+    @property
+    def native_value(self) -> float | None:
+        """Return the state of the sensor."""
+        if history := self.history:
+            return self.entity_description.value_fn(history)
+        return None
+
+class BatterySensor(CopenhagenTrackersEntity, SensorEntity):
+    """Sensor for a forecast of the battery model of the device."""
+
+    entity_description: BatterySensorEntityDescription
 
     @property
-    def native_value(self):
+    def native_value(self) -> StateType | datetime:
         """Return the state of the sensor."""
-        if profile := self.device_data.get(ATTR_PROFILE):
-            return profile.get(ATTR_NAME)
+        if model := self.coordinator.get_battery(self._device_id):
+            return self.entity_description.value_fn(model)
         return None
 
     @property
-    def extra_state_attributes(self):
+    def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the state attributes."""
-        if profile := self.device_data.get(ATTR_PROFILE):
-            return {
-                ATTR_DESCRIPTION: profile.get(ATTR_DESCRIPTION),
-                ATTR_UPDATED_AT: profile.get(ATTR_UPDATED_AT),
-            }
-        return None
+        model = self.coordinator.get_battery(self._device_id)
+        if model is None or model.charged_at is None:
+            return None
+        return {
+            ATTR_CHARGED_AT: dt_util.utc_from_timestamp(
+                model.charged_at
+            ).isoformat(),
+        }
 
 class ServerSyncAtSensor(CopenhagenTrackersEntity, SensorEntity):
     """Sensor for when the data was last synchronized with the server."""
 
-    _attr_device_class = SensorDeviceClass.TIMESTAMP
-    _attr_icon = "mdi:cloud-sync"
-    _attr_entity_category = EntityCategory.DIAGNOSTIC
-    SUFFIX = SUFFIX_SERVER_SYNC_AT
-    _attr_translation_key = TRANSLATION_KEY_SERVER_SYNC_AT
+    _unrecorded_attributes = frozenset({ATTR_AGE, ATTR_SUPPRESSED_WRITES})
     
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return self.coordinator.last_sync_time
\ No newline at end of file
+        return self.coordinator.last_sync_time
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            ATTR_AGE: round(self.coordinator.age.total_seconds()),
+            ATTR_CIRCUIT_BREAKER: self.coordinator.api.circuit_state,
+            ATTR_STALE: self.coordinator.is_stale,
+            ATTR_SUPPRESSED_WRITES: self.coordinator.suppressed_writes,
+        }
+
+class HistogramSensor(CopenhagenTrackersHubEntity, SensorEntity):
+    """Sensor for the median of a histogram of durations."""
+
+    _unrecorded_attributes = frozenset(
+        {ATTR_COUNT, ATTR_MAX, ATTR_P90, ATTR_P99}
+    )
+
+    @property
+    def histogram(self) -> Histogram:
+        """Return the histogram of the sensor."""
+        return getattr(
+            self.coordinator.account.metrics, self.entity_description.key
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the median duration in milliseconds."""
+        if (value := self.histogram.percentile(50)) is None:
+            return None
+        return value * 1000
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        summary = self.histogram.as_dict()
+        return {
+            ATTR_P90: summary[ATTR_P90],
+            ATTR_P99: summary[ATTR_P99],
+            ATTR_MAX: summary[ATTR_MAX],
+            ATTR_COUNT: summary[ATTR_COUNT],
+        }
+
+class HubSensor(CopenhagenTrackersHubEntity, SensorEntity):
+    """Sensor for a counter or size in the metrics of the account."""
+
+    entity_description: HubSensorEntityDescription
+
+    _unrecorded_attributes = frozenset({ATTR_TOTAL})
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator.account.metrics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the state attributes."""
+        if (attributes_fn := self.entity_description.attributes_fn) is None:
+            return None
+        return attributes_fn(self.coordinator.account.metrics)
+
+class BudgetSensor(CopenhagenTrackersHubEntity, SensorEntity):
+    """Sensor for the request budget shared by all accounts."""
+
+    entity_description: BudgetSensorEntityDescription
+
+    _unrecorded_attributes = frozenset({ATTR_DEFERRED, ATTR_LIMIT})
+
+    async def async_added_to_hass(self) -> None:
+        """Write state whenever the budget changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.account.budget.add_listener(
+                self.async_write_ha_state
+            )
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator.account.budget)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        budget = self.coordinator.account.budget
+        return {
+            ATTR_LIMIT: budget.limit,
+            ATTR_DEFERRED: budget.deferred,
+        }
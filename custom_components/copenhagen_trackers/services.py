@@ -0,0 +1,137 @@
+"""Services for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import logging
+import os
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .export import (
+    FORMAT_GEOJSON,
+    FORMAT_GPX,
+    FORMATS,
+    Track,
+    count_points,
+    export_tracks,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Service data
+ATTR_END = "end"
+ATTR_FILENAME = "filename"
+ATTR_FORMAT = "format"
+ATTR_START = "start"
+
+# Directory of the exported files, within the configuration directory
+EXPORT_DIRECTORY = f"{DOMAIN}_exports"
+
+SERVICE_EXPORT_TRACK = "export_track"
+
+def _filename(value: str) -> str:
+    """Validate a file name without a directory."""
+    value = cv.string(value)
+    if os.path.basename(value) != value or value.startswith("."):
+        raise vol.Invalid("Expected a file name without a directory")
+    return value
+
+def _filename_matches_format(data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the extension of the file name against the format."""
+    filename = data.get(ATTR_FILENAME)
+    if filename is not None and not filename.lower().endswith(
+        f".{data[ATTR_FORMAT]}"
+    ):
+        raise vol.Invalid(
+            f"Expected a file name ending in .{data[ATTR_FORMAT]}",
+            path=[ATTR_FILENAME],
+        )
+    return data
+
+EXPORT_TRACK_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_FORMAT, default=FORMAT_GPX): vol.In(FORMATS),
+            vol.Optional(ATTR_FILENAME): _filename,
+        }
+    ),
+    _filename_matches_format,
+)
+
+def _get_tracks(hass: HomeAssistant, device_ids: list[str]) -> list[Track]:
+    """Return copies of the location histories of devices."""
+    device_registry = dr.async_get(hass)
+    coordinators = hass.data.get(DOMAIN, {})
+    tracks = []
+    for device_id in device_ids:
+        if (device := device_registry.async_get(device_id)) is None:
+            raise ServiceValidationError(f"Unknown device {device_id}")
+        track = next(
+            (
+                Track(tracker_id, device.name_by_user or device.name, history.copy())
+                for domain, tracker_id in device.identifiers
+                if domain == DOMAIN
+                for entry_id in device.config_entries
+                if (coordinator := coordinators.get(entry_id)) is not None
+                and (history := coordinator.get_history(tracker_id)) is not None
+            ),
+            None,
+        )
+        if track is None:
+            raise ServiceValidationError(
+                f"No location history for device {device.name}"
+            )
+        tracks.append(track)
+    return tracks
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def _async_export_track(call: ServiceCall) -> None:
+        """Export the location history of trackers to a file."""
+        file_format = call.data[ATTR_FORMAT]
+        filename = call.data.get(
+            ATTR_FILENAME,
+            f"{DOMAIN}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.{file_format}",
+        )
+        path = hass.config.path(EXPORT_DIRECTORY, filename)
+        start = end = None
+        if ATTR_START in call.data:
+            start = dt_util.as_utc(call.data[ATTR_START]).timestamp()
+        if ATTR_END in call.data:
+            end = dt_util.as_utc(call.data[ATTR_END]).timestamp()
+
+        # Copied on the event loop, and written to the file off it
+        tracks = _get_tracks(hass, call.data[ATTR_DEVICE_ID])
+        # A GeoJSON LineString needs at least two positions
+        minimum = 2 if file_format == FORMAT_GEOJSON else 1
+        for track in tracks:
+            if count_points(track, start, end, minimum) < minimum:
+                raise ServiceValidationError(
+                    f"Too few locations of {track.name} to export, only the "
+                    "most recent locations are kept"
+                )
+        points = await hass.async_add_executor_job(
+            export_tracks, path, file_format, tracks, start, end
+        )
+        _LOGGER.info("Exported %d locations to %s", points, path)
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_EXPORT_TRACK,
+        _async_export_track,
+        schema=EXPORT_TRACK_SCHEMA,
+    )
@@ -1,14 +1,19 @@
 """Switch platform for Copenhagen Trackers integration."""
 
-from homeassistant.components.switch import SwitchEntity
+from dataclasses import dataclass
+
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
+from homeassistant.core import callback
 from homeassistant.helpers.entity import EntityCategory
 
-from .const import (
-    DOMAIN,
-    ATTR_DATA,
-    ATTR_ID
+from .const import DOMAIN, ENTITY_GROUP_FORCE_REFRESH
+from .entity import (
+    CopenhagenTrackersEntity,
+    CopenhagenTrackersEntityDescription,
 )
-from .entity import CopenhagenTrackersEntity
+
+# State attributes
+ATTR_COALESCED_REQUESTS = "coalesced_requests"
 
 # Entity IDs
 SUFFIX_FORCE_REFRESH = "force_refresh"
@@ -18,19 +23,38 @@ async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Copenhagen Trackers switches based on a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
     
-    entities = []
-    for device in coordinator.data[ATTR_DATA]:
-        entities.append(ForceRefreshSwitch(coordinator, device[ATTR_ID]))
-    
-    async_add_entities(entities)
+    @callback
+    def _async_add_devices(
+        device_ids: set[str], groups: set[str | None]
+    ) -> None:
+        if FORCE_REFRESH_SWITCH.group in groups:
+            async_add_entities(
+                ForceRefreshSwitch(coordinator, device_id, FORCE_REFRESH_SWITCH)
+                for device_id in device_ids
+            )
+
+    entry.async_on_unload(
+        coordinator.async_add_devices_listener(_async_add_devices)
+    )
+
+@dataclass(frozen=True, kw_only=True)
+class CopenhagenTrackersSwitchEntityDescription(
+    CopenhagenTrackersEntityDescription, SwitchEntityDescription
+):
+    """Describes a Copenhagen Trackers switch."""
+
+FORCE_REFRESH_SWITCH = CopenhagenTrackersSwitchEntityDescription(
+    key=SUFFIX_FORCE_REFRESH,
+    translation_key=TRANSLATION_KEY_FORCE_REFRESH,
+    entity_category=EntityCategory.CONFIG,
+    icon="mdi:refresh",
+    group=ENTITY_GROUP_FORCE_REFRESH,
+)
 
 class ForceRefreshSwitch(CopenhagenTrackersEntity, SwitchEntity):
     """Switch to force a refresh from the servers."""
 
-    _attr_entity_category = EntityCategory.CONFIG
-    _attr_icon = "mdi:refresh"
-    _attr_translation_key = TRANSLATION_KEY_FORCE_REFRESH
-    SUFFIX = SUFFIX_FORCE_REFRESH
+    _unrecorded_attributes = frozenset({ATTR_COALESCED_REQUESTS})
 
     @property
     def is_on(self):
@@ -38,11 +62,19 @@ class ForceRefreshSwitch(CopenhagenTrackersEntity, SwitchEntity):
         # This is a momentary switch, so it's always off
         return False
 
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {
+            ATTR_COALESCED_REQUESTS: self.coordinator.coalesced_refreshes,
+        }
+
     async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        # Trigger a immediate refresh
-        await self.coordinator.async_request_refresh()
+        # Request a refresh, merged with other requests in the same window
+        await self.coordinator.async_request_device_refresh(self._device_id)
         # The switch will automatically return to off state
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
@@ -0,0 +1,195 @@
+"""Resilient HTTP transport for the Copenhagen Trackers API."""
+
+from __future__ import annotations
+import asyncio
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from .budget import RequestBudget
+
+# Retry tuning
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Circuit breaker tuning
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 300
+
+class CircuitOpenError(Exception):
+    """Error to indicate the circuit breaker is rejecting requests."""
+
+class CircuitBreaker:
+    """Fail fast while the API is known to be down."""
+
+    STATE_CLOSED = "closed"
+    STATE_HALF_OPEN = "half_open"
+    STATE_OPEN = "open"
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return the state of the circuit breaker."""
+        if self._open_until is None:
+            return self.STATE_CLOSED
+        if time.monotonic() < self._open_until:
+            return self.STATE_OPEN
+        return self.STATE_HALF_OPEN
+
+    @property
+    def failures(self) -> int:
+        """Return the number of consecutive failed requests."""
+        return self._failures
+
+    def before_request(self) -> None:
+        """Reject the request, unless the circuit lets it through."""
+        state = self.state
+        if state == self.STATE_OPEN or (
+            state == self.STATE_HALF_OPEN and self._probing
+        ):
+            raise CircuitOpenError("Copenhagen Trackers API is unavailable")
+        if state == self.STATE_HALF_OPEN:
+            # Let a single probe through to see if the API has recovered
+            self._probing = True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self._failures = 0
+        self._open_until = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the circuit if needed."""
+        self._failures += 1
+        if self._probing or self._failures >= self._failure_threshold:
+            self.open_for(self._reset_timeout)
+
+    def release_probe(self) -> None:
+        """Allow a new probe after one was aborted without a result."""
+        self._probing = False
+
+    def open_for(self, seconds: float) -> None:
+        """Reject requests for the given number of seconds."""
+        self._open_until = time.monotonic() + seconds
+        self._probing = False
+
+class CopenhagenTrackersTransport:
+    """Send requests with timeouts, retries and a circuit breaker.
+
+    With a budget, every attempt waits for its turn in the budget before
+    it takes one of the concurrent request slots of `request_limit`. The
+    slot is held while the response is read and freed between retries.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        max_retries: int = MAX_RETRIES,
+        timeout: float = REQUEST_TIMEOUT,
+        breaker: CircuitBreaker | None = None,
+        budget: RequestBudget | None = None,
+        request_limit: AbstractAsyncContextManager | None = None,
+    ) -> None:
+        """Initialize."""
+        self._session = session
+        self._budget = budget
+        self._request_limit = request_limit or nullcontext()
+        self._max_retries = max_retries
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self.breaker = breaker or CircuitBreaker()
+
+    async def async_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        """Send a request, retrying transient errors.
+
+        Responses with a non-retryable status are returned as is, so callers
+        still decide how to handle them.
+        """
+        self.breaker.before_request()
+        try:
+            return await self._async_request(method, url, **kwargs)
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+
+    async def _async_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        """Send a request, retrying transient errors."""
+        for attempt in range(self._max_retries + 1):
+            last_attempt = attempt == self._max_retries
+            if self._budget is not None:
+                await self._budget.async_acquire()
+            try:
+                async with self._request_limit:
+                    response = await self._session.request(
+                        method, url, timeout=self._timeout, **kwargs
+                    )
+                    # Read before the slot is freed, the body is kept
+                    await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+
+                retry_after = self._retry_after(response)
+                if retry_after is not None and retry_after > BACKOFF_MAX:
+                    # Too long to wait within this request, stay away instead
+                    self.breaker.open_for(retry_after)
+                    return response
+                if last_attempt:
+                    self.breaker.record_failure()
+                    return response
+                response.release()
+                delay = (
+                    self._backoff(attempt) if retry_after is None else retry_after
+                )
+
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Return an exponential backoff delay with full jitter."""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: aiohttp.ClientResponse) -> float | None:
+        """Return the delay requested by a Retry-After header in seconds."""
+        if not (value := response.headers.get(aiohttp.hdrs.RETRY_AFTER)):
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,88 @@
+"""Webhook receiving pushed devices for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from functools import partial
+from http import HTTPStatus
+import logging
+from typing import Any
+
+from aiohttp import hdrs, web
+
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    ATTR_DATA,
+    BRAND,
+    CONF_PUSH_UPDATES,
+    DEFAULT_PUSH_UPDATES,
+    DOMAIN,
+)
+from .coordinator import CopenhagenTrackersDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+def _get_payload(data: Any) -> dict[str, Any]:
+    """Return a `/devices` response from a device, a list or a response."""
+    if isinstance(data, dict) and ATTR_DATA in data:
+        data = data[ATTR_DATA]
+    elif isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(
+        isinstance(device, dict) for device in data
+    ):
+        raise ValueError("Expected a device, a list of devices or a response")
+    return {ATTR_DATA: data}
+
+async def _async_handle_webhook(
+    coordinator: CopenhagenTrackersDataUpdateCoordinator,
+    hass: HomeAssistant,
+    webhook_id: str,
+    request: web.Request,
+) -> web.Response:
+    """Apply the devices of a push request."""
+    try:
+        changed = coordinator.async_push_devices(
+            _get_payload(await request.json())
+        )
+    except (KeyError, TypeError, ValueError) as error:
+        _LOGGER.warning("Ignoring invalid pushed devices: %s", error)
+        return web.Response(status=HTTPStatus.BAD_REQUEST)
+    return web.json_response({"changed": changed})
+
+@callback
+def async_update_webhook(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: CopenhagenTrackersDataUpdateCoordinator,
+) -> None:
+    """Register or unregister the webhook to match the options."""
+    webhook_id = None
+    if entry.options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES):
+        webhook_id = entry.options.get(CONF_WEBHOOK_ID)
+    if webhook_id == coordinator.webhook_id:
+        return
+
+    if coordinator.webhook_id is not None:
+        webhook.async_unregister(hass, coordinator.webhook_id)
+    coordinator.webhook_id = webhook_id
+    if webhook_id is not None:
+        webhook.async_register(
+            hass,
+            DOMAIN,
+            f"{BRAND} ({entry.title})",
+            webhook_id,
+            partial(_async_handle_webhook, coordinator),
+            allowed_methods=[hdrs.METH_POST],
+        )
+
+@callback
+def async_unregister_webhook(
+    hass: HomeAssistant, coordinator: CopenhagenTrackersDataUpdateCoordinator
+) -> None:
+    """Unregister the webhook, if registered."""
+    if coordinator.webhook_id is not None:
+        webhook.async_unregister(hass, coordinator.webhook_id)
+        coordinator.webhook_id = None
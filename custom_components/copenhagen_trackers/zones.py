@@ -0,0 +1,90 @@
+"""Spatial index of zones for the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from collections.abc import Iterable
+from dataclasses import dataclass
+from math import cos, floor, radians
+
+from .geo import haversine_distance
+
+# Tuning
+CELL_SIZE = 0.01
+LARGE_ZONE_RADIUS = 5000
+METERS_PER_DEGREE = 111320.0
+
+@dataclass(frozen=True, slots=True)
+class Zone:
+    """A circular zone."""
+
+    entity_id: str
+    latitude: float
+    longitude: float
+    radius: float
+
+def _cell(value: float) -> int:
+    """Return the grid cell of a coordinate."""
+    return floor(value / CELL_SIZE)
+
+def _cells(
+    latitude: float, longitude: float, radius: float
+) -> Iterable[tuple[int, int]]:
+    """Return the grid cells overlapping a circle."""
+    lat_delta = radius / METERS_PER_DEGREE
+    # Guard against the meridians converging at the poles
+    lon_delta = radius / (METERS_PER_DEGREE * max(cos(radians(latitude)), 0.01))
+    lon_cells = range(
+        _cell(longitude - lon_delta), _cell(longitude + lon_delta) + 1
+    )
+    for lat_cell in range(
+        _cell(latitude - lat_delta), _cell(latitude + lat_delta) + 1
+    ):
+        for lon_cell in lon_cells:
+            yield lat_cell, lon_cell
+
+class ZoneIndex:
+    """Grid of zones bucketed by the cells they overlap.
+
+    A lookup only measures the distance to zones sharing a cell with the
+    location, instead of every zone. Zones too large to bucket cheaply are
+    always measured.
+    """
+
+    __slots__ = ("_grid", "_large_zones", "_size")
+
+    def __init__(self, zones: Iterable[Zone] = ()) -> None:
+        """Initialize."""
+        self._grid: dict[tuple[int, int], list[Zone]] = {}
+        self._large_zones: list[Zone] = []
+        self._size = 0
+        for zone in zones:
+            self.add(zone)
+
+    def __len__(self) -> int:
+        """Return the number of zones."""
+        return self._size
+
+    def add(self, zone: Zone) -> None:
+        """Add a zone to the index."""
+        self._size += 1
+        if zone.radius > LARGE_ZONE_RADIUS:
+            self._large_zones.append(zone)
+            return
+        for cell in _cells(zone.latitude, zone.longitude, zone.radius):
+            self._grid.setdefault(cell, []).append(zone)
+
+    def lookup(
+        self, latitude: float, longitude: float, accuracy: float = 0
+    ) -> frozenset[str]:
+        """Return the zones containing a location with an accuracy radius."""
+        candidates = set(self._large_zones)
+        for cell in _cells(latitude, longitude, accuracy):
+            candidates.update(self._grid.get(cell, ()))
+        return frozenset(
+            zone.entity_id
+            for zone in candidates
+            if haversine_distance(
+                latitude, longitude, zone.latitude, zone.longitude
+            )
+            - accuracy
+            < zone.radius
+        )
@@ -0,0 +1 @@
+"""Tests for the Copenhagen Trackers integration."""
@@ -0,0 +1,81 @@
+"""Fixtures for the Copenhagen Trackers tests."""
+
+from __future__ import annotations
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import AbstractContextManager
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet, start_server
+from custom_components.copenhagen_trackers import api as api_module
+from custom_components.copenhagen_trackers.const import DOMAIN
+from custom_components.copenhagen_trackers.coordinator import (
+    CopenhagenTrackersDataUpdateCoordinator,
+)
+
+@pytest.fixture
+def fleet() -> FakeFleet:
+    """Return the fleet served by the fake API."""
+    return FakeFleet(3)
+
+@pytest.fixture
+async def api(
+    fleet: FakeFleet, socket_enabled: None
+) -> AsyncGenerator[dict[str, int]]:
+    """Serve the fleet from the fake API, yielding its request counts."""
+    runner, endpoint = await start_server(fleet)
+    with patch(
+        "custom_components.copenhagen_trackers.api.API_ENDPOINT", endpoint
+    ):
+        yield runner.app["stats"]
+    await runner.cleanup()
+
+@pytest.fixture
+def api_down(
+    api: dict[str, int],
+) -> Callable[[], AbstractContextManager[Any]]:
+    """Return a factory taking the API down, as every request gets a 404."""
+
+    def _api_down() -> AbstractContextManager[Any]:
+        return patch.object(
+            api_module, "API_ENDPOINT", f"{api_module.API_ENDPOINT}/down"
+        )
+
+    return _api_down
+
+@pytest.fixture
+def no_coalesce() -> Generator[None]:
+    """Send every refresh to the API."""
+    with patch(
+        "custom_components.copenhagen_trackers.registry.REFRESH_COALESCE_WINDOW",
+        0,
+    ):
+        yield
+
+@pytest.fixture
+def config_entry(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> MockConfigEntry:
+    """Return a config entry added to Home Assistant."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_EMAIL: "test@example.com", CONF_PASSWORD: "test"},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: MockConfigEntry, **options: Any
+) -> CopenhagenTrackersDataUpdateCoordinator:
+    """Set up a config entry, returning its coordinator."""
+    if options:
+        hass.config_entries.async_update_entry(entry, options=options)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][entry.entry_id]
@@ -0,0 +1,228 @@
+"""Tests for the API client of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import asyncio
+import base64
+import json
+import time
+from typing import Any
+
+import pytest
+from yarl import URL
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+    AiohttpClientMockResponse,
+)
+
+from benchmarks.fake_api import FakeFleet
+
+from custom_components.copenhagen_trackers.api import (
+    TOKEN_REFRESH_MARGIN,
+    CopenhagenTrackersAPI,
+    NotModifiedError,
+)
+from custom_components.copenhagen_trackers.const import (
+    API_ENDPOINT,
+    CONF_ACCESS_TOKEN,
+)
+
+from .conftest import async_setup_entry
+
+DEVICES_URL = f"{API_ENDPOINT}/devices"
+LOGIN_URL = f"{API_ENDPOINT}/login"
+PAYLOAD = {"data": [{"id": "tracker", "name": "Bike"}]}
+ETAG = '"etag"'
+
+@pytest.fixture
+def client(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> CopenhagenTrackersAPI:
+    """Return an API client that is logged in."""
+    aioclient_mock.post(LOGIN_URL, json={"access_token": "token"})
+    return CopenhagenTrackersAPI(
+        async_get_clientsession(hass), "test@example.com", "test"
+    )
+
+def _mock_devices(
+    aioclient_mock: AiohttpClientMocker,
+    status: int = 200,
+    payload: dict | None = None,
+    headers: dict[str, str] | None = None,
+) -> None:
+    """Answer requests for the devices."""
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(LOGIN_URL, json={"access_token": "token"})
+    aioclient_mock.get(
+        DEVICES_URL,
+        status=status,
+        text=None if payload is None else json.dumps(payload),
+        headers=headers,
+    )
+
+def _devices_headers(aioclient_mock: AiohttpClientMocker) -> dict[str, str]:
+    """Return the headers of the last request for the devices."""
+    return next(
+        headers
+        for _, url, _, headers in reversed(aioclient_mock.mock_calls)
+        if str(url) == DEVICES_URL
+    )
+
+async def test_conditional_request(
+    client: CopenhagenTrackersAPI, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the devices are requested with the validators of the last ones."""
+    _mock_devices(aioclient_mock, payload=PAYLOAD, headers={"ETag": ETAG})
+    assert await client.async_get_devices_with_auth() == PAYLOAD
+    assert "If-None-Match" not in _devices_headers(aioclient_mock)
+
+    _mock_devices(aioclient_mock, status=304)
+    assert await client.async_get_devices_with_auth(conditional=True) is None
+    assert _devices_headers(aioclient_mock)["If-None-Match"] == ETAG
+    assert client.metrics.request_failures == 0
+
+async def test_identical_body_not_modified(
+    client: CopenhagenTrackersAPI, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test an identical body counts as not modified if validators are ignored."""
+    _mock_devices(aioclient_mock, payload=PAYLOAD)
+    assert await client.async_get_devices_with_auth() == PAYLOAD
+    assert await client.async_get_devices_with_auth(conditional=True) is None
+
+    changed = {"data": [{"id": "tracker", "name": "Scooter"}]}
+    _mock_devices(aioclient_mock, payload=changed)
+    assert await client.async_get_devices_with_auth(conditional=True) == changed
+
+async def test_not_modified_without_validators(
+    client: CopenhagenTrackersAPI, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a not modified response keeps the cached devices."""
+    _mock_devices(aioclient_mock, status=304)
+    assert await client.async_get_devices_with_auth(conditional=True) is None
+    assert "If-None-Match" not in _devices_headers(aioclient_mock)
+
+async def test_not_modified_without_cache(
+    client: CopenhagenTrackersAPI, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a not modified response fails if no devices are cached."""
+    _mock_devices(aioclient_mock, status=304)
+    with pytest.raises(NotModifiedError):
+        await client.async_get_devices_with_auth()
+    assert client.metrics.request_failures == 1
+
+def _token(expires_in: float) -> str:
+    """Return an unsigned JWT expiring in the given seconds."""
+    claims = json.dumps({"exp": int(time.time() + expires_in)}).encode()
+    return f"e30.{base64.urlsafe_b64encode(claims).decode().rstrip('=')}.sig"
+
+def _mock_login(aioclient_mock: AiohttpClientMocker, tokens: list[str]) -> None:
+    """Answer logins with the given tokens, in order."""
+
+    async def _login(method: str, url: URL, data: Any) -> AiohttpClientMockResponse:
+        # Yield, so concurrent callers can pile up behind the login
+        await asyncio.sleep(0)
+        return AiohttpClientMockResponse(
+            method, url, json={"access_token": tokens.pop(0)}
+        )
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(LOGIN_URL, side_effect=_login)
+
+def _logins(aioclient_mock: AiohttpClientMocker) -> int:
+    """Return the number of logins."""
+    return sum(str(url) == LOGIN_URL for _, url, _, _ in aioclient_mock.mock_calls)
+
+async def test_concurrent_callers_log_in_once(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test concurrent callers share a single login."""
+    _mock_login(aioclient_mock, [_token(3600)])
+    aioclient_mock.get(DEVICES_URL, json=PAYLOAD)
+    api = CopenhagenTrackersAPI(
+        async_get_clientsession(hass), "test@example.com", "test"
+    )
+
+    results = await asyncio.gather(
+        *(api.async_get_devices_with_auth() for _ in range(5))
+    )
+    assert results == [PAYLOAD] * 5
+    assert _logins(aioclient_mock) == 1
+    assert api.metrics.logins == 1
+
+async def test_persisted_token_skips_login(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a persisted token that is still valid is used without a login."""
+    token = _token(3600)
+    _mock_login(aioclient_mock, [])
+    aioclient_mock.get(DEVICES_URL, json=PAYLOAD)
+    api = CopenhagenTrackersAPI(
+        async_get_clientsession(hass), "test@example.com", "test", token
+    )
+
+    assert await api.async_get_devices_with_auth() == PAYLOAD
+    assert _logins(aioclient_mock) == 0
+    assert _devices_headers(aioclient_mock)["Authorization"] == f"Bearer {token}"
+
+async def test_expiring_token_refreshed(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a token about to expire is replaced before a request."""
+    token = _token(3600)
+    _mock_login(aioclient_mock, [token])
+    aioclient_mock.get(DEVICES_URL, json=PAYLOAD)
+    tokens = []
+    api = CopenhagenTrackersAPI(
+        async_get_clientsession(hass),
+        "test@example.com",
+        "test",
+        _token(TOKEN_REFRESH_MARGIN / 2),
+        tokens.append,
+    )
+
+    assert await api.async_get_devices_with_auth() == PAYLOAD
+    assert _logins(aioclient_mock) == 1
+    assert tokens == [token]
+    assert _devices_headers(aioclient_mock)["Authorization"] == f"Bearer {token}"
+
+async def test_rejected_token_replaced(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a rejected token is replaced and the request retried once."""
+    token = _token(3600)
+    _mock_login(aioclient_mock, [token])
+    statuses = [401, 200]
+
+    async def _devices(
+        method: str, url: URL, data: Any
+    ) -> AiohttpClientMockResponse:
+        return AiohttpClientMockResponse(
+            method, url, status=statuses.pop(0), json=PAYLOAD
+        )
+
+    aioclient_mock.get(DEVICES_URL, side_effect=_devices)
+    api = CopenhagenTrackersAPI(
+        async_get_clientsession(hass), "test@example.com", "test", _token(3600)
+    )
+
+    assert await api.async_get_devices_with_auth() == PAYLOAD
+    assert _logins(aioclient_mock) == 1
+    assert api.access_token == token
+
+async def test_token_persisted_in_entry(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test the token is saved in the config entry for the next start."""
+    await async_setup_entry(hass, config_entry)
+    assert config_entry.data[CONF_ACCESS_TOKEN]
+    assert api["login"] == 1
+
+    await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert api["login"] == 1
@@ -0,0 +1,75 @@
+"""Tests for the battery model of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.copenhagen_trackers.battery import (
+    RATE_SMOOTHING,
+    BatteryModel,
+)
+
+HOUR = 3600.0
+
+def test_rate_from_drops() -> None:
+    """Test the discharge rate is measured between drops of the level."""
+    model = BatteryModel()
+    model.update(0, 100)
+    assert model.rate is None
+    assert model.empty_at is None
+
+    model.update(HOUR, 99)
+    assert model.rate == pytest.approx(1.0)
+    assert model.empty_at == pytest.approx(HOUR + 99 * HOUR)
+
+def test_rate_smoothing() -> None:
+    """Test new slopes are smoothed into the rate."""
+    model = BatteryModel()
+    model.update(0, 100)
+    model.update(HOUR, 99)
+    model.update(2 * HOUR, 96)
+    assert model.rate == pytest.approx(1.0 + RATE_SMOOTHING * (3.0 - 1.0))
+
+def test_rounding_noise_keeps_anchor() -> None:
+    """Test a small rise does not restart the slope."""
+    model = BatteryModel()
+    model.update(0, 100)
+    model.update(HOUR, 99)
+    model.update(2 * HOUR, 100)
+    model.update(3 * HOUR, 98)
+    assert model.charged_at is None
+    assert model.rate == pytest.approx(1.0 + RATE_SMOOTHING * (0.5 - 1.0))
+
+def test_charge_resets_rate() -> None:
+    """Test a charge starts a new estimate."""
+    model = BatteryModel()
+    model.update(0, 50)
+    model.update(HOUR, 49)
+    model.update(2 * HOUR, 80)
+    assert model.rate is None
+    assert model.charged_at == 2 * HOUR
+    assert model.percentage == 80
+
+    model.update(4 * HOUR, 78)
+    assert model.rate == pytest.approx(1.0)
+
+def test_older_level_ignored() -> None:
+    """Test levels not newer than the last one are ignored."""
+    model = BatteryModel()
+    model.update(HOUR, 50)
+    assert not model.update(HOUR, 40)
+    assert model.percentage == 50
+
+def test_persistence() -> None:
+    """Test a restored model continues the same estimate."""
+    model = BatteryModel()
+    model.update(0, 100)
+    model.update(HOUR, 99)
+    model.update(2 * HOUR, 100)
+
+    restored = BatteryModel.from_dict(model.to_dict())
+    assert restored.to_dict() == model.to_dict()
+    model.update(3 * HOUR, 97)
+    restored.update(3 * HOUR, 97)
+    assert restored.rate == model.rate
+    assert restored.empty_at == model.empty_at
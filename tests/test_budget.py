@@ -0,0 +1,114 @@
+"""Tests for the request budget of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import asyncio
+
+from custom_components.copenhagen_trackers.budget import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RequestBudget,
+    request_priority,
+)
+
+WINDOW = 0.05
+
+async def _async_fill(budget: RequestBudget, requests: int) -> None:
+    """Use up requests of the budget at background priority."""
+    for _ in range(requests):
+        await budget.async_acquire(PRIORITY_BACKGROUND)
+
+async def test_admits_within_limit() -> None:
+    """Test requests within the limit are admitted at once."""
+    budget = RequestBudget(5, 60)
+    await _async_fill(budget, 2)
+    assert budget.remaining == 3
+    assert budget.queue_depth == 0
+    assert budget.deferred == 0
+
+async def test_background_leaves_reserve() -> None:
+    """Test background requests leave a reserve to interactive ones."""
+    budget = RequestBudget(5, 60)
+    await _async_fill(budget, 4)
+
+    background = asyncio.create_task(budget.async_acquire(PRIORITY_BACKGROUND))
+    await asyncio.sleep(0)
+    assert not background.done()
+    assert budget.queue_depth == 1
+    assert budget.deferred == 1
+
+    await asyncio.wait_for(budget.async_acquire(PRIORITY_INTERACTIVE), 1)
+    assert budget.remaining == 0
+    background.cancel()
+
+async def test_priority_from_context() -> None:
+    """Test the priority defaults to the one of the context."""
+    budget = RequestBudget(5, 60)
+    await _async_fill(budget, 4)
+
+    token = request_priority.set(PRIORITY_INTERACTIVE)
+    try:
+        await asyncio.wait_for(budget.async_acquire(), 1)
+    finally:
+        request_priority.reset(token)
+
+async def test_waiters_admitted_by_priority() -> None:
+    """Test queued requests are admitted by priority once the window moves."""
+    budget = RequestBudget(2, WINDOW)
+    await _async_fill(budget, 1)
+    await budget.async_acquire(PRIORITY_INTERACTIVE)
+    order = []
+
+    async def _async_request(name: str, priority: int) -> None:
+        await budget.async_acquire(priority)
+        order.append(name)
+
+    await asyncio.gather(
+        _async_request("background", PRIORITY_BACKGROUND),
+        _async_request("interactive", PRIORITY_INTERACTIVE),
+    )
+    assert order == ["interactive", "background"]
+
+async def test_cancelled_waiter_does_not_block() -> None:
+    """Test a cancelled request does not hold up the ones behind it."""
+    budget = RequestBudget(1, WINDOW)
+    await budget.async_acquire(PRIORITY_INTERACTIVE)
+
+    cancelled = asyncio.create_task(budget.async_acquire(PRIORITY_INTERACTIVE))
+    waiting = asyncio.create_task(budget.async_acquire(PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.wait_for(waiting, 1)
+    assert budget.queue_depth == 0
+
+async def test_raising_limit_admits_waiters() -> None:
+    """Test raising the limit admits the queued requests."""
+    budget = RequestBudget(1, 60)
+    await budget.async_acquire(PRIORITY_INTERACTIVE)
+
+    waiting = asyncio.create_task(budget.async_acquire(PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    budget.limit = 2
+    await asyncio.wait_for(waiting, 1)
+
+async def test_prioritize_queued_request() -> None:
+    """Test raising the priority of a task admits its queued request."""
+    budget = RequestBudget(5, 60)
+    await _async_fill(budget, 4)
+
+    waiting = asyncio.create_task(budget.async_acquire(PRIORITY_BACKGROUND))
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    budget.prioritize(waiting, PRIORITY_INTERACTIVE)
+    await asyncio.wait_for(waiting, 1)
+
+async def test_listeners() -> None:
+    """Test listeners are called when the budget changes."""
+    budget = RequestBudget(5, 60)
+    calls = []
+    remove = budget.add_listener(lambda: calls.append(budget.remaining))
+
+    await _async_fill(budget, 1)
+    remove()
+    await _async_fill(budget, 1)
+    assert calls == [4]
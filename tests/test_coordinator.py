@@ -0,0 +1,61 @@
+"""Tests for the coordinator of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import MISSING_DEVICE_SYNCS
+
+from .conftest import async_setup_entry
+
+BATTERY = "sensor.cphtrackers_bike_0_battery_percentage"
+LAST_SEEN = "sensor.cphtrackers_bike_0_last_seen_at"
+
+async def test_missing_device_unavailable(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test a device missing from a sync is unavailable until it returns."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    assert hass.states.get(BATTERY).state != STATE_UNAVAILABLE
+
+    device = fleet.devices.pop(0)
+    fleet.move(0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(BATTERY).state == STATE_UNAVAILABLE
+    assert hass.states.get(LAST_SEEN).state == STATE_UNAVAILABLE
+
+    fleet.devices.insert(0, device)
+    fleet.move(0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(BATTERY).state == str(device["battery_percentage"])
+
+async def test_gone_device_removed(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test a device missing from several syncs is removed."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    fleet.devices.pop(0)
+    for _ in range(MISSING_DEVICE_SYNCS - 1):
+        fleet.move(0)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert hass.states.get(BATTERY).state == STATE_UNAVAILABLE
+
+    fleet.move(0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(BATTERY) is None
+    assert hass.states.get("sensor.cphtrackers_bike_1_battery_percentage")
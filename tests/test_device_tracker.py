@@ -0,0 +1,83 @@
+"""Tests for the device trackers of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+
+from homeassistant.components.device_tracker import ATTR_SOURCE_TYPE
+from homeassistant.const import ATTR_LATITUDE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import CONF_JITTER_FILTER
+from custom_components.copenhagen_trackers.coordinator import (
+    CopenhagenTrackersDataUpdateCoordinator,
+)
+
+from .conftest import async_setup_entry
+
+TRACKER = "device_tracker.cphtrackers_bike_0_location"
+
+def _move(fleet: FakeFleet, latitude: float) -> None:
+    """Report a new latitude for the first tracker."""
+    fleet.devices[0]["location"]["details"]["lat"] = str(latitude)
+    fleet.move(0)
+
+async def _async_setup(
+    hass: HomeAssistant,
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    **options: bool,
+) -> CopenhagenTrackersDataUpdateCoordinator:
+    """Set up the integration, the first tracker at 55° within 100 m."""
+    fleet.devices[0]["location"]["details"]["acc"] = "10"
+    _move(fleet, 55.0)
+    coordinator = await async_setup_entry(hass, config_entry, **options)
+    assert hass.states.get(TRACKER).attributes[ATTR_LATITUDE] == 55.0
+    return coordinator
+
+async def _async_refresh(
+    hass: HomeAssistant, coordinator: CopenhagenTrackersDataUpdateCoordinator
+) -> None:
+    """Refresh the devices."""
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+async def test_jitter_ignored(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test movement within the accuracy radius keeps the location."""
+    coordinator = await _async_setup(hass, fleet, config_entry)
+    last_updated = hass.states.get(TRACKER).last_updated
+
+    # About 55 meters
+    _move(fleet, 55.0005)
+    await _async_refresh(hass, coordinator)
+    state = hass.states.get(TRACKER)
+    assert state.attributes[ATTR_LATITUDE] == 55.0
+    assert state.last_updated == last_updated
+
+    # Still measured from the first location, about 110 meters
+    _move(fleet, 55.001)
+    await _async_refresh(hass, coordinator)
+    assert hass.states.get(TRACKER).attributes[ATTR_LATITUDE] == 55.001
+
+async def test_jitter_filter_disabled(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test every location is reported with the jitter filter disabled."""
+    coordinator = await _async_setup(
+        hass, fleet, config_entry, **{CONF_JITTER_FILTER: False}
+    )
+    _move(fleet, 55.0005)
+    await _async_refresh(hass, coordinator)
+    state = hass.states.get(TRACKER)
+    assert state.attributes[ATTR_LATITUDE] == 55.0005
+    assert state.attributes[ATTR_SOURCE_TYPE] == "gps"
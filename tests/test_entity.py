@@ -0,0 +1,44 @@
+"""Tests for the entities of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet
+
+from .conftest import async_setup_entry
+
+SERVER_SYNC_AT = "sensor.cphtrackers_bike_0_server_sync_at"
+
+async def test_unchanged_devices_not_written(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test only the entities of changed devices write state."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    changed = "sensor.cphtrackers_bike_0_battery_percentage"
+    unchanged = "sensor.cphtrackers_bike_1_battery_percentage"
+    changed_updated = hass.states.get(changed).last_updated
+    unchanged_updated = hass.states.get(unchanged).last_updated
+    assert hass.states.get(SERVER_SYNC_AT).attributes["suppressed_writes"] == 0
+
+    fleet.devices[0]["battery_percentage"] += 1
+    fleet.move(0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(changed).last_updated > changed_updated
+    assert hass.states.get(unchanged).last_updated == unchanged_updated
+    assert coordinator.suppressed_writes > 0
+
+    # Nothing changed, so the entities are not even called
+    changed_updated = hass.states.get(changed).last_updated
+    suppressed = coordinator.suppressed_writes
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert api["not_modified"] == 1
+    assert hass.states.get(changed).last_updated == changed_updated
+    assert coordinator.suppressed_writes == suppressed
@@ -0,0 +1,105 @@
+"""Tests for the location history of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from datetime import date
+
+import pytest
+
+from custom_components.copenhagen_trackers.history import (
+    TRIP_END_IDLE,
+    LocationHistory,
+)
+
+DAY = date(2024, 5, 1)
+
+# About 111 meters of latitude
+STEP = 0.001
+
+def _history(locations: int, capacity: int = 3) -> LocationHistory:
+    """Return a history of a tracker moving north once a minute."""
+    history = LocationHistory(capacity)
+    for index in range(locations):
+        history.append(60.0 * index, 55.0 + STEP * index, 12.0, 10.0, DAY)
+    return history
+
+def test_wraparound() -> None:
+    """Test the oldest locations are replaced once the history is full."""
+    history = _history(5)
+    assert len(history) == 3
+    assert [location[0] for location in history] == [120.0, 180.0, 240.0]
+    assert [location[0] for location in history.between(150, 200)] == [180.0]
+
+def test_older_location_ignored() -> None:
+    """Test locations not newer than the last one are ignored."""
+    history = _history(2)
+    assert not history.append(60.0, 56.0, 12.0, 10.0, DAY)
+    assert len(history) == 2
+
+def test_statistics() -> None:
+    """Test the movement statistics follow the locations."""
+    history = _history(3)
+    assert history.moving
+    assert history.trip_started_at == 0.0
+    assert history.speed == pytest.approx(111.2 / 60 * 3.6, rel=0.01)
+    assert history.heading == pytest.approx(0.0, abs=0.1)
+    assert history.get_distance_on(DAY) == pytest.approx(222.4, rel=0.01)
+    assert history.get_distance_on(date(2024, 5, 2)) == 0.0
+
+def test_new_day_resets_distance() -> None:
+    """Test the distance of a day starts over on the next day."""
+    history = _history(2)
+    next_day = date(2024, 5, 2)
+    history.append(120.0, 55.0 + 2 * STEP, 12.0, 10.0, next_day)
+    assert history.get_distance_on(DAY) == 0.0
+    assert history.get_distance_on(next_day) == pytest.approx(111.2, rel=0.01)
+
+def test_jitter_is_not_movement() -> None:
+    """Test movement within the accuracy does not start a trip."""
+    history = LocationHistory()
+    history.append(0.0, 55.0, 12.0, 50.0, DAY)
+    history.append(60.0, 55.0001, 12.0, 50.0, DAY)
+    assert not history.moving
+    assert history.speed == 0.0
+
+def test_expire() -> None:
+    """Test a trip ends once the tracker has not moved for a while."""
+    history = _history(2)
+    expires_at = history.movement_expires_at
+    assert expires_at == 60.0 + TRIP_END_IDLE
+    assert not history.expire(expires_at - 1)
+    assert history.expire(expires_at)
+    assert not history.moving
+    assert history.speed == 0.0
+    assert history.movement_expires_at is None
+
+def test_persistence_after_wraparound() -> None:
+    """Test a wrapped history is restored in order with its statistics."""
+    history = _history(5)
+    restored = LocationHistory.from_dict(history.to_dict(), capacity=3)
+    assert list(restored) == list(history)
+    assert restored.to_dict() == history.to_dict()
+
+    # Appending continues from the newest location
+    assert restored.append(300.0, 55.0 + STEP * 5, 12.0, 10.0, DAY)
+    assert [location[0] for location in restored] == [180.0, 240.0, 300.0]
+
+def test_persistence_smaller_capacity() -> None:
+    """Test a restored history keeps the newest locations that fit."""
+    history = _history(5)
+    restored = LocationHistory.from_dict(history.to_dict(), capacity=2)
+    assert [location[0] for location in restored] == [180.0, 240.0]
+
+def test_persistence_invalid() -> None:
+    """Test columns of different lengths are rejected."""
+    data = _history(3).to_dict()
+    data["latitudes"] = _history(2).to_dict()["latitudes"]
+    with pytest.raises(ValueError):
+        LocationHistory.from_dict(data)
+
+def test_copy() -> None:
+    """Test a copy does not change with the history."""
+    history = _history(5)
+    copy = history.copy()
+    history.append(300.0, 55.0 + STEP * 5, 12.0, 10.0, DAY)
+    assert [location[0] for location in copy] == [120.0, 180.0, 240.0]
+    assert copy.trip_distance < history.trip_distance
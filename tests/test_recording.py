@@ -0,0 +1,57 @@
+"""Tests for the response recording of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import CONF_RECORD_RESPONSES
+from custom_components.copenhagen_trackers.recording import (
+    RECORD_BODY,
+    RECORD_STATUS,
+    ResponseRecorder,
+    load_recording,
+)
+
+from .conftest import async_setup_entry
+
+async def test_record_responses(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+    tmp_path: Path,
+) -> None:
+    """Test the devices and not modified responses are recorded."""
+    hass.config.config_dir = str(tmp_path)
+    coordinator = await async_setup_entry(
+        hass, config_entry, **{CONF_RECORD_RESPONSES: True}
+    )
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    (path,) = tmp_path.glob("*.ndjson.gz")
+    records = await hass.async_add_executor_job(load_recording, str(path))
+    assert [record[RECORD_STATUS] for record in records] == [200, 304]
+    assert records[0][RECORD_BODY] == fleet.body.decode()
+    assert records[1][RECORD_BODY] is None
+    assert "test@example.com" not in path.read_bytes().decode("latin-1")
+
+async def test_recording_stops_at_max_size(
+    hass: HomeAssistant, tmp_path: Path
+) -> None:
+    """Test recording stops once the file reaches its maximum size."""
+    path = str(tmp_path / "recording.ndjson.gz")
+    recorder = ResponseRecorder(hass, path, max_size=1)
+
+    await recorder.async_record(200, 0.1, {}, b'{"data":[]}')
+    assert not recorder.full
+    await recorder.async_record(304, 0.1, {}, None)
+    assert recorder.full
+    await recorder.async_record(304, 0.1, {}, None)
+
+    records = await hass.async_add_executor_job(load_recording, path)
+    assert len(records) == 1
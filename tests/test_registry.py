@@ -0,0 +1,75 @@
+"""Tests for the accounts shared across Copenhagen Trackers config entries."""
+
+from __future__ import annotations
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import DOMAIN
+
+from .conftest import async_setup_entry
+
+def _add_entry(hass: HomeAssistant, email: str) -> MockConfigEntry:
+    """Return another config entry added to Home Assistant."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_EMAIL: email, CONF_PASSWORD: "test"}
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+async def test_shared_account(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test entries of one account share its login and requests."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    other = await async_setup_entry(
+        hass, _add_entry(hass, "Test@Example.com")
+    )
+    assert other.account is coordinator.account
+    assert api["login"] == 1
+    assert api["devices"] == 1
+
+    # Both refreshes fall within the coalesce window of the first request
+    fleet.move(1)
+    await coordinator.async_refresh()
+    await other.async_refresh()
+    assert api["devices"] == 1
+
+async def test_separate_accounts(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test entries of different accounts log in separately."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    other = await async_setup_entry(
+        hass, _add_entry(hass, "other@example.com")
+    )
+    assert other.account is not coordinator.account
+    assert api["login"] == 2
+    assert api["devices"] == 2
+
+async def test_release_account(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test the account is kept until the last entry using it is unloaded."""
+    await async_setup_entry(hass, config_entry)
+    other_entry = _add_entry(hass, "test@example.com")
+    other = await async_setup_entry(hass, other_entry)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await other.async_refresh()
+    assert other.last_update_success
+    assert api["devices"] == 2
+
+    assert await hass.config_entries.async_unload(other_entry.entry_id)
+    coordinator = await async_setup_entry(hass, config_entry)
+    assert coordinator.account is not other.account
@@ -0,0 +1,136 @@
+"""Tests for the poll scheduler of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+import random
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet, make_device
+from custom_components.copenhagen_trackers.const import (
+    MIN_SCAN_INTERVAL,
+    SCAN_INTERVAL_JITTER,
+)
+from custom_components.copenhagen_trackers.models import TrackerDevice
+from custom_components.copenhagen_trackers.scheduler import (
+    LOW_BATTERY_FACTOR,
+    NIGHT_FACTOR,
+    AdaptivePollScheduler,
+)
+
+from .conftest import async_setup_entry
+
+MIN_INTERVAL = timedelta(minutes=1)
+MAX_INTERVAL = timedelta(hours=1)
+NOON = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+NIGHT = datetime(2024, 5, 1, 3, tzinfo=timezone.utc)
+
+def _device(
+    updated_at: datetime,
+    latitude: float = 55.0,
+    battery_percentage: int = 80,
+) -> dict[str, TrackerDevice]:
+    """Return a single device reported at a time and place."""
+    data = make_device(0, random.Random(0), updated_at)
+    data["battery_percentage"] = battery_percentage
+    data["location"]["details"]["lat"] = str(latitude)
+    device = TrackerDevice.from_dict(data)
+    return {device.id: device}
+
+def _scheduler() -> AdaptivePollScheduler:
+    """Return a scheduler without jitter."""
+    return AdaptivePollScheduler(MIN_INTERVAL, MAX_INTERVAL, jitter=0)
+
+def test_recent_report_polls_sooner() -> None:
+    """Test a device that reported recently is polled again soon."""
+    scheduler = _scheduler()
+    devices = _device(NOON - timedelta(minutes=10))
+    assert scheduler.next_interval(devices, NOON) == timedelta(minutes=10)
+
+    devices = _device(NOON - timedelta(days=1))
+    assert scheduler.next_interval(devices, NOON) == MAX_INTERVAL
+
+def test_moving_device_polls_fastest() -> None:
+    """Test a device that moved since the last poll is polled at the minimum."""
+    scheduler = _scheduler()
+    updated_at = NOON - timedelta(minutes=30)
+    scheduler.next_interval(_device(updated_at), NOON)
+    assert scheduler.next_interval(
+        _device(updated_at, latitude=55.01), NOON
+    ) == MIN_INTERVAL
+
+    # Movement within the threshold is not motion
+    assert scheduler.next_interval(
+        _device(updated_at, latitude=55.0101), NOON
+    ) == timedelta(minutes=30)
+
+def test_low_battery_and_night_poll_slower() -> None:
+    """Test low batteries and nights stretch the interval."""
+    scheduler = _scheduler()
+    updated_at = NOON - timedelta(minutes=10)
+    assert scheduler.next_interval(
+        _device(updated_at, battery_percentage=10), NOON
+    ) == timedelta(minutes=10 * LOW_BATTERY_FACTOR)
+
+    updated_at = NIGHT - timedelta(minutes=10)
+    assert scheduler.next_interval(_device(updated_at), NIGHT) == timedelta(
+        minutes=10 * NIGHT_FACTOR
+    )
+
+    # Stretched intervals stay within the bounds
+    updated_at = NIGHT - timedelta(minutes=50)
+    assert scheduler.next_interval(
+        _device(updated_at, battery_percentage=10), NIGHT
+    ) == MAX_INTERVAL
+
+def test_most_demanding_device_wins() -> None:
+    """Test the fleet is polled at the shortest interval of its devices."""
+    scheduler = _scheduler()
+    devices = {
+        **_device(NOON - timedelta(days=1)),
+        **{
+            "other": TrackerDevice.from_dict(
+                {
+                    **make_device(1, random.Random(1), NOON),
+                    "id": "other",
+                    "updated_at": "2024-05-01T11:55:00.000Z",
+                }
+            )
+        },
+    }
+    assert scheduler.next_interval(devices, NOON) == timedelta(minutes=5)
+
+def test_jitter() -> None:
+    """Test the interval is jittered within its bounds."""
+    scheduler = AdaptivePollScheduler(MIN_INTERVAL, MAX_INTERVAL, jitter=0.1)
+    devices = _device(NOON - timedelta(minutes=10))
+    for _ in range(20):
+        interval = scheduler.next_interval(devices, NOON)
+        assert timedelta(minutes=9) <= interval <= timedelta(minutes=11)
+
+async def test_coordinator_follows_moving_fleet(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test the coordinator polls at the minimum while a tracker moves."""
+    for device in fleet.devices:
+        device["updated_at"] = "2024-05-01T00:00:00.000Z"
+    fleet.move(0)
+    coordinator = await async_setup_entry(hass, config_entry)
+    assert coordinator.update_interval > MIN_SCAN_INTERVAL * (
+        1 + SCAN_INTERVAL_JITTER
+    )
+
+    details = fleet.devices[0]["location"]["details"]
+    details["lat"] = str(float(details["lat"]) + 0.01)
+    fleet.move(0)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.update_interval <= MIN_SCAN_INTERVAL * (
+        1 + SCAN_INTERVAL_JITTER
+    )
@@ -0,0 +1,152 @@
+"""Tests for the services of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+from collections.abc import Generator
+from datetime import timedelta
+import json
+from pathlib import Path
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.auth.models import User
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import ServiceValidationError, Unauthorized
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import DOMAIN
+from custom_components.copenhagen_trackers.services import (
+    EXPORT_DIRECTORY,
+    SERVICE_EXPORT_TRACK,
+)
+
+from .conftest import async_setup_entry
+
+@pytest.fixture(autouse=True)
+def config_dir(hass: HomeAssistant, tmp_path: Path) -> Generator[Path]:
+    """Export into a temporary configuration directory."""
+    config_dir = hass.config.config_dir
+    hass.config.config_dir = str(tmp_path)
+    yield tmp_path
+    hass.config.config_dir = config_dir
+
+@pytest.fixture
+async def device_id(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> str:
+    """Set up the integration with two locations per tracker."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    fleet.move(1)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    device = dr.async_get(hass).async_get_device({(DOMAIN, "bench00000")})
+    return device.id
+
+async def test_export_gpx(
+    hass: HomeAssistant, device_id: str, config_dir: Path
+) -> None:
+    """Test a track is exported to the export directory."""
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_TRACK,
+        {"device_id": device_id, "filename": "bike.gpx"},
+        blocking=True,
+    )
+    gpx = (config_dir / EXPORT_DIRECTORY / "bike.gpx").read_text()
+    assert gpx.count("<trkpt ") == 2
+    assert "<name>Bike 0 Tracker</name>" in gpx
+
+async def test_export_geojson(
+    hass: HomeAssistant, device_id: str, config_dir: Path
+) -> None:
+    """Test a track is exported as a GeoJSON LineString."""
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_TRACK,
+        {"device_id": device_id, "format": "geojson", "filename": "bike.geojson"},
+        blocking=True,
+    )
+    data = json.loads((config_dir / EXPORT_DIRECTORY / "bike.geojson").read_text())
+    (feature,) = data["features"]
+    assert feature["geometry"]["type"] == "LineString"
+    assert len(feature["geometry"]["coordinates"]) == 2
+    assert feature["properties"]["tracker_id"] == "bench00000"
+    assert len(feature["properties"]["coordinateProperties"]["times"]) == 2
+
+@pytest.mark.parametrize(
+    ("file_format", "filename"),
+    [
+        ("gpx", "configuration.yaml"),
+        ("gpx", "secrets.yaml"),
+        ("gpx", "bike.geojson"),
+        ("geojson", "bike.gpx"),
+        ("gpx", "../bike.gpx"),
+        ("gpx", ".gpx"),
+    ],
+)
+async def test_export_invalid_filename(
+    hass: HomeAssistant,
+    device_id: str,
+    config_dir: Path,
+    file_format: str,
+    filename: str,
+) -> None:
+    """Test file names outside the format or directory are rejected."""
+    (config_dir / "configuration.yaml").write_text("homeassistant:\n")
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_TRACK,
+            {"device_id": device_id, "format": file_format, "filename": filename},
+            blocking=True,
+        )
+    assert (config_dir / "configuration.yaml").read_text() == "homeassistant:\n"
+    assert not (config_dir / EXPORT_DIRECTORY).exists()
+
+async def test_export_empty_range(
+    hass: HomeAssistant, device_id: str, config_dir: Path
+) -> None:
+    """Test a time range without locations is rejected."""
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_TRACK,
+            {
+                "device_id": device_id,
+                "format": "geojson",
+                "end": dt_util.now() - timedelta(days=1),
+            },
+            blocking=True,
+        )
+    assert not (config_dir / EXPORT_DIRECTORY).exists()
+
+async def test_export_unknown_device(hass: HomeAssistant, device_id: str) -> None:
+    """Test an unknown device is rejected."""
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_EXPORT_TRACK, {"device_id": "unknown"}, blocking=True
+        )
+
+async def test_export_requires_admin(
+    hass: HomeAssistant,
+    device_id: str,
+    config_dir: Path,
+    hass_read_only_user: User,
+) -> None:
+    """Test only administrators may export tracks."""
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_TRACK,
+            {"device_id": device_id},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+    assert not (config_dir / EXPORT_DIRECTORY).exists()
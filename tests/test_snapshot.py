@@ -0,0 +1,86 @@
+"""Tests for the snapshot of the devices of an account."""
+
+from __future__ import annotations
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import timedelta
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import (
+    DOMAIN,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from custom_components.copenhagen_trackers.registry import get_account_id
+
+from .conftest import async_setup_entry
+
+BATTERY = "sensor.cphtrackers_bike_0_battery_percentage"
+SERVER_SYNC_AT = "sensor.cphtrackers_bike_0_server_sync_at"
+STORAGE_KEY = f"{DOMAIN}.{get_account_id('test@example.com')}"
+
+async def test_snapshot_saved(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test the devices are saved shortly after a sync."""
+    await async_setup_entry(hass, config_entry)
+    assert STORAGE_KEY not in hass_storage
+
+    freezer.tick(timedelta(seconds=SNAPSHOT_SAVE_DELAY))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    snapshot = hass_storage[STORAGE_KEY]["data"]
+    assert [device["id"] for device in snapshot["payload"]["data"]] == [
+        device["id"] for device in fleet.devices
+    ]
+    assert dt_util.parse_datetime(snapshot["last_sync_time"])
+
+async def test_warm_start(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    api_down: Callable[[], AbstractContextManager[Any]],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test entities are restored from the snapshot while the API fails."""
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "key": STORAGE_KEY,
+        "data": {
+            "payload": {"data": fleet.devices},
+            "last_sync_time": dt_util.utcnow().isoformat(),
+        },
+    }
+    with api_down():
+        await async_setup_entry(hass, config_entry)
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert hass.states.get(BATTERY).state == str(
+        fleet.devices[0]["battery_percentage"]
+    )
+    assert hass.states.get(SERVER_SYNC_AT).attributes["stale"]
+
+async def test_cold_start_fails(
+    hass: HomeAssistant,
+    api_down: Callable[[], AbstractContextManager[Any]],
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test setting up without a snapshot needs the API."""
+    with api_down():
+        assert not await hass.config_entries.async_setup(config_entry.entry_id)
+    assert config_entry.state is ConfigEntryState.SETUP_RETRY
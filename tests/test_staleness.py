@@ -0,0 +1,79 @@
+"""Tests for serving stale devices while the API fails."""
+
+from __future__ import annotations
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import timedelta
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.copenhagen_trackers.const import (
+    CONF_STALENESS_BUDGET,
+    STALE_RETRY_INTERVAL,
+)
+from custom_components.copenhagen_trackers.coordinator import (
+    CopenhagenTrackersDataUpdateCoordinator,
+)
+
+from .conftest import async_setup_entry
+
+BATTERY = "sensor.cphtrackers_bike_0_battery_percentage"
+SERVER_SYNC_AT = "sensor.cphtrackers_bike_0_server_sync_at"
+
+async def _async_refresh(
+    hass: HomeAssistant, coordinator: CopenhagenTrackersDataUpdateCoordinator
+) -> None:
+    """Refresh the devices."""
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+async def test_stale_within_budget(
+    hass: HomeAssistant,
+    api_down: Callable[[], AbstractContextManager[Any]],
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test entities keep their state while the API fails."""
+    coordinator = await async_setup_entry(hass, config_entry)
+    battery = hass.states.get(BATTERY).state
+    assert not hass.states.get(SERVER_SYNC_AT).attributes["stale"]
+
+    with api_down():
+        await _async_refresh(hass, coordinator)
+        assert coordinator.last_update_success
+        assert coordinator.update_interval == STALE_RETRY_INTERVAL
+        await _async_refresh(hass, coordinator)
+        # Retries back off
+        assert coordinator.update_interval == STALE_RETRY_INTERVAL * 2
+    assert hass.states.get(BATTERY).state == battery
+    assert hass.states.get(SERVER_SYNC_AT).attributes["stale"]
+
+    await _async_refresh(hass, coordinator)
+    assert not hass.states.get(SERVER_SYNC_AT).attributes["stale"]
+
+async def test_stale_beyond_budget(
+    hass: HomeAssistant,
+    api_down: Callable[[], AbstractContextManager[Any]],
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test entities become unavailable once the staleness budget runs out."""
+    coordinator = await async_setup_entry(
+        hass, config_entry, **{CONF_STALENESS_BUDGET: 10}
+    )
+
+    with api_down():
+        freezer.tick(timedelta(minutes=9))
+        await _async_refresh(hass, coordinator)
+        assert hass.states.get(BATTERY).state != STATE_UNAVAILABLE
+
+        freezer.tick(timedelta(minutes=2))
+        await _async_refresh(hass, coordinator)
+        assert not coordinator.last_update_success
+        assert hass.states.get(BATTERY).state == STATE_UNAVAILABLE
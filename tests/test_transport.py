@@ -0,0 +1,194 @@
+"""Tests for the transport of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from custom_components.copenhagen_trackers.budget import RequestBudget
+from custom_components.copenhagen_trackers.transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CopenhagenTrackersTransport,
+)
+
+class FakeResponse:
+    """Response with a status and headers."""
+
+    def __init__(self, status: int, headers: dict[str, str] | None = None):
+        """Initialize."""
+        self.status = status
+        self.headers = headers or {}
+        self.released = False
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return b"{}"
+
+    def release(self) -> None:
+        """Release the connection."""
+        self.released = True
+
+class FakeSession:
+    """Session answering requests with queued responses or errors."""
+
+    def __init__(self, *results: FakeResponse | Exception) -> None:
+        """Initialize."""
+        self.results = list(results)
+        self.requests = 0
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> FakeResponse:
+        """Answer a request with the next result, repeating the last one."""
+        self.requests += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    """Retry without waiting."""
+    with patch.object(CopenhagenTrackersTransport, "_backoff", return_value=0):
+        yield
+
+def test_breaker_opens_after_threshold() -> None:
+    """Test the circuit opens after consecutive failures."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_CLOSED
+    breaker.before_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+def test_breaker_lets_one_probe_through() -> None:
+    """Test a half open circuit lets a single probe through."""
+    breaker = CircuitBreaker()
+    breaker.open_for(0)
+    assert breaker.state == CircuitBreaker.STATE_HALF_OPEN
+
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.STATE_CLOSED
+    assert breaker.failures == 0
+
+def test_breaker_failed_probe_reopens() -> None:
+    """Test a failed probe opens the circuit again."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.open_for(0)
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+
+def test_breaker_released_probe() -> None:
+    """Test an aborted probe allows a new one."""
+    breaker = CircuitBreaker()
+    breaker.open_for(0)
+    breaker.before_request()
+    breaker.release_probe()
+    breaker.before_request()
+
+def test_retry_after() -> None:
+    """Test Retry-After headers in seconds and as dates."""
+    retry_after = CopenhagenTrackersTransport._retry_after
+    assert retry_after(FakeResponse(429)) is None
+    assert retry_after(FakeResponse(429, {"Retry-After": "12"})) == 12
+    assert retry_after(FakeResponse(429, {"Retry-After": "soon"})) is None
+    retry_at = datetime.now(timezone.utc) + timedelta(minutes=2)
+    delay = retry_after(
+        FakeResponse(429, {"Retry-After": format_datetime(retry_at, usegmt=True)})
+    )
+    assert 100 < delay <= 120
+
+async def test_retries_transient_status() -> None:
+    """Test a transient status is retried."""
+    session = FakeSession(FakeResponse(503), FakeResponse(200))
+    transport = CopenhagenTrackersTransport(session)
+
+    response = await transport.async_request("GET", "https://example.com")
+    assert response.status == 200
+    assert session.requests == 2
+    assert transport.breaker.failures == 0
+
+async def test_returns_other_statuses() -> None:
+    """Test a non-retryable status is returned as is."""
+    session = FakeSession(FakeResponse(401))
+    transport = CopenhagenTrackersTransport(session)
+
+    response = await transport.async_request("GET", "https://example.com")
+    assert response.status == 401
+    assert session.requests == 1
+
+async def test_gives_up_after_max_retries() -> None:
+    """Test errors are raised once the retries are used up."""
+    session = FakeSession(aiohttp.ClientConnectionError())
+    transport = CopenhagenTrackersTransport(session, max_retries=2)
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await transport.async_request("GET", "https://example.com")
+    assert session.requests == 3
+    assert transport.breaker.failures == 1
+
+async def test_long_retry_after_opens_breaker() -> None:
+    """Test a Retry-After beyond the backoff opens the circuit instead."""
+    session = FakeSession(FakeResponse(429, {"Retry-After": "3600"}))
+    transport = CopenhagenTrackersTransport(session)
+
+    response = await transport.async_request("GET", "https://example.com")
+    assert response.status == 429
+    assert session.requests == 1
+    assert transport.breaker.state == CircuitBreaker.STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        await transport.async_request("GET", "https://example.com")
+
+async def test_open_breaker_skips_requests() -> None:
+    """Test no request is sent while the circuit is open."""
+    session = FakeSession(FakeResponse(200))
+    transport = CopenhagenTrackersTransport(session)
+    transport.breaker.open_for(60)
+
+    with pytest.raises(CircuitOpenError):
+        await transport.async_request("GET", "https://example.com")
+    assert session.requests == 0
+
+async def test_every_attempt_uses_budget() -> None:
+    """Test every attempt counts against the budget."""
+    budget = RequestBudget(10, 60)
+    session = FakeSession(FakeResponse(503), FakeResponse(200))
+    transport = CopenhagenTrackersTransport(session, budget=budget)
+
+    await transport.async_request("GET", "https://example.com")
+    assert budget.remaining == 8
+
+async def test_request_slot_freed_between_retries() -> None:
+    """Test other requests may use the slot while a request backs off."""
+    request_limit = asyncio.Semaphore(1)
+    session = FakeSession(
+        FakeResponse(503, {"Retry-After": "0.05"}), FakeResponse(200)
+    )
+    transport = CopenhagenTrackersTransport(
+        session, request_limit=request_limit
+    )
+    order = []
+
+    async def _async_other_request() -> None:
+        await asyncio.sleep(0.01)
+        async with request_limit:
+            order.append("other")
+
+    async def _async_request() -> None:
+        await transport.async_request("GET", "https://example.com")
+        order.append("request")
+
+    await asyncio.gather(_async_request(), _async_other_request())
+    assert order == ["other", "request"]
@@ -0,0 +1,121 @@
+"""Tests for the devices pushed to the Copenhagen Trackers webhook."""
+
+from __future__ import annotations
+from copy import deepcopy
+from http import HTTPStatus
+from typing import Any
+
+import pytest
+
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import (
+    CONF_PUSH_UPDATES,
+    PUSH_SCAN_INTERVAL,
+)
+
+from .conftest import async_setup_entry
+
+BATTERY = "sensor.cphtrackers_bike_0_battery_percentage"
+WEBHOOK_ID = "test_webhook"
+URL = f"/api/webhook/{WEBHOOK_ID}"
+
+@pytest.fixture
+async def push_entry(
+    hass: HomeAssistant, api: dict[str, int], config_entry: MockConfigEntry
+) -> MockConfigEntry:
+    """Return a config entry set up to receive pushed devices."""
+    coordinator = await async_setup_entry(
+        hass,
+        config_entry,
+        **{CONF_PUSH_UPDATES: True, CONF_WEBHOOK_ID: WEBHOOK_ID},
+    )
+    assert coordinator.update_interval >= PUSH_SCAN_INTERVAL
+    return config_entry
+
+def _pushed_device(
+    fleet: FakeFleet, updated_at: str, battery: int
+) -> dict[str, Any]:
+    """Return the first device of the fleet as pushed later or earlier."""
+    device = deepcopy(fleet.devices[0])
+    device["updated_at"] = updated_at
+    device["battery_percentage"] = battery
+    return device
+
+@pytest.mark.parametrize(
+    "wrap",
+    [
+        lambda device: device,
+        lambda device: [device],
+        lambda device: {"data": [device]},
+    ],
+    ids=["device", "list", "response"],
+)
+async def test_push_newer(
+    hass: HomeAssistant,
+    hass_client_no_auth: ClientSessionGenerator,
+    fleet: FakeFleet,
+    push_entry: MockConfigEntry,
+    wrap: Any,
+) -> None:
+    """Test a newer pushed device replaces the known one."""
+    client = await hass_client_no_auth()
+    device = _pushed_device(fleet, "2100-01-01T00:00:00.000Z", 7)
+    response = await client.post(URL, json=wrap(device))
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == {"changed": 1}
+    await hass.async_block_till_done()
+    assert hass.states.get(BATTERY).state == "7"
+
+    # Pushing it again changes nothing
+    response = await client.post(URL, json=wrap(device))
+    assert await response.json() == {"changed": 0}
+
+async def test_push_older(
+    hass: HomeAssistant,
+    hass_client_no_auth: ClientSessionGenerator,
+    fleet: FakeFleet,
+    push_entry: MockConfigEntry,
+) -> None:
+    """Test a pushed device older than the known one is ignored."""
+    battery = hass.states.get(BATTERY).state
+    client = await hass_client_no_auth()
+    response = await client.post(
+        URL, json=_pushed_device(fleet, "2000-01-01T00:00:00.000Z", 7)
+    )
+    assert await response.json() == {"changed": 0}
+    await hass.async_block_till_done()
+    assert hass.states.get(BATTERY).state == battery
+
+async def test_push_invalid(
+    hass: HomeAssistant,
+    hass_client_no_auth: ClientSessionGenerator,
+    push_entry: MockConfigEntry,
+) -> None:
+    """Test invalid pushed devices are rejected."""
+    client = await hass_client_no_auth()
+    response = await client.post(URL, json=["not a device"])
+    assert response.status == HTTPStatus.BAD_REQUEST
+
+async def test_push_disabled(
+    hass: HomeAssistant,
+    hass_client_no_auth: ClientSessionGenerator,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test the webhook is only registered with pushed updates enabled."""
+    await async_setup_entry(
+        hass, config_entry, **{CONF_WEBHOOK_ID: WEBHOOK_ID}
+    )
+    battery = hass.states.get(BATTERY).state
+    client = await hass_client_no_auth()
+    await client.post(
+        URL, json=_pushed_device(fleet, "2100-01-01T00:00:00.000Z", 7)
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(BATTERY).state == battery
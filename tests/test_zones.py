@@ -0,0 +1,128 @@
+"""Tests for the zone events of the Copenhagen Trackers integration."""
+
+from __future__ import annotations
+
+from homeassistant.components.zone.const import ATTR_RADIUS
+from homeassistant.const import (
+    ATTR_LATITUDE,
+    ATTR_LONGITUDE,
+    ATTR_NAME,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from benchmarks.fake_api import FakeFleet
+from custom_components.copenhagen_trackers.const import (
+    EVENT_ZONE_ENTER,
+    EVENT_ZONE_EXIT,
+)
+from custom_components.copenhagen_trackers.coordinator import (
+    ATTR_TRACKER_ID,
+    ATTR_ZONE,
+    CopenhagenTrackersDataUpdateCoordinator,
+)
+
+from .conftest import async_setup_entry
+
+BATTERY = "sensor.cphtrackers_bike_0_battery_percentage"
+ZONE = "zone.workshop"
+
+def _move(fleet: FakeFleet, latitude: float, longitude: float) -> None:
+    """Report a new location for the first tracker."""
+    details = fleet.devices[0]["location"]["details"]
+    details.update(lat=str(latitude), lon=str(longitude), acc="1.5")
+    fleet.move(0)
+
+async def _async_refresh(
+    hass: HomeAssistant, coordinator: CopenhagenTrackersDataUpdateCoordinator
+) -> None:
+    """Refresh the devices."""
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+async def test_zone_events(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test entering and leaving a zone fires events."""
+    hass.states.async_set(
+        ZONE,
+        "0",
+        {ATTR_LATITUDE: 56.0, ATTR_LONGITUDE: 12.0, ATTR_RADIUS: 100},
+    )
+    enter_events = async_capture_events(hass, EVENT_ZONE_ENTER)
+    exit_events = async_capture_events(hass, EVENT_ZONE_EXIT)
+    _move(fleet, 55.0, 12.0)
+    coordinator = await async_setup_entry(hass, config_entry)
+    assert not enter_events
+
+    _move(fleet, 56.0, 12.0)
+    await _async_refresh(hass, coordinator)
+    assert [event.data for event in enter_events] == [
+        {ATTR_TRACKER_ID: "bench00000", ATTR_NAME: "Bike 0", ATTR_ZONE: ZONE}
+    ]
+    assert not exit_events
+
+    # Still in the zone
+    _move(fleet, 56.0001, 12.0)
+    await _async_refresh(hass, coordinator)
+    assert len(enter_events) == 1
+
+    _move(fleet, 55.0, 12.0)
+    await _async_refresh(hass, coordinator)
+    assert [event.data for event in exit_events] == [
+        {ATTR_TRACKER_ID: "bench00000", ATTR_NAME: "Bike 0", ATTR_ZONE: ZONE}
+    ]
+
+async def test_zone_changed(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test a zone added after setup is found without the devices moving."""
+    enter_events = async_capture_events(hass, EVENT_ZONE_ENTER)
+    _move(fleet, 56.0, 12.0)
+    coordinator = await async_setup_entry(hass, config_entry)
+
+    hass.states.async_set(
+        ZONE,
+        "0",
+        {ATTR_LATITUDE: 56.0, ATTR_LONGITUDE: 12.0, ATTR_RADIUS: 100},
+    )
+    await hass.async_block_till_done()
+    await _async_refresh(hass, coordinator)
+    assert [event.data[ATTR_ZONE] for event in enter_events] == [ZONE]
+
+async def test_missing_device_in_zone(
+    hass: HomeAssistant,
+    api: dict[str, int],
+    fleet: FakeFleet,
+    config_entry: MockConfigEntry,
+    no_coalesce: None,
+) -> None:
+    """Test a device missing from a sync leaves its zones alone."""
+    hass.states.async_set(
+        ZONE,
+        "0",
+        {ATTR_LATITUDE: 56.0, ATTR_LONGITUDE: 12.0, ATTR_RADIUS: 100},
+    )
+    exit_events = async_capture_events(hass, EVENT_ZONE_EXIT)
+    _move(fleet, 56.0, 12.0)
+    coordinator = await async_setup_entry(hass, config_entry)
+    # Index the home zone added while setting up
+    await _async_refresh(hass, coordinator)
+
+    fleet.devices.pop(0)
+    fleet.move(0)
+    await _async_refresh(hass, coordinator)
+    assert hass.states.get(BATTERY).state == STATE_UNAVAILABLE
+    assert not exit_events